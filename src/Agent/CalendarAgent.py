@@ -1,73 +1,388 @@
-from typing import List, Dict, Optional
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import AsyncIterator, Hashable, List, Dict, Optional, Tuple
 from datetime import datetime
-import pytz
-from langchain.agents import AgentExecutor, create_tool_calling_agent
+from langchain.agents import create_tool_calling_agent
 from langchain_core.messages import HumanMessage, AIMessage
-from ..helpers.Config import get_settings
-from ..LLMProvider.OllamaProvider import OllamaLLM
-from .tools import get_calendar_tools
+from ..helpers.Config import get_settings, get_timezone
+from ..LLMProvider.OllamaProvider import OllamaLLM, OllamaUsageCallback
+from .tools import get_calendar_provider, get_calendar_tools, TurnCalls, record_calls, use_calendar, use_handles
 from .prompts import CALENDAR_AGENT_PROMPT
+from .SessionStore import Session, SessionStore
+from .ParallelAgentExecutor import ParallelAgentExecutor
+from .HistoryCompactor import HistoryCompactor, CompactionReport
+from .IntentRouter import IntentRouter, needs_reasoning
+from .ResponseCache import ResponseCache
+from ..calenderProvider.GoogleCalendarInterface import AsyncGoogleCalendarInterface
+from ..helpers.Telemetry import TelemetryCallback, turn_span
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AgentStreamEvent:
+    """
+    One step of a streamed turn. kind is "tool_start", "tool_end", "token"
+    (a chunk of model output) or "final" (the complete answer, always last).
+    """
+    kind: str
+    text: str = ""
+    tool: Optional[str] = None
+    # Set on the "final" event, see TurnResult
+    usage: Optional[Dict[str, float]] = None
+    compaction: Optional[CompactionReport] = None
+
+
+@dataclass
+class TurnResult:
+    """
+    The answer of one turn with what it cost. usage is None when no LLM ran
+    (cached or fast path answers), compaction is None when the history was
+    not looked at.
+    """
+    output: str
+    usage: Optional[Dict[str, float]] = None
+    compaction: Optional[CompactionReport] = None
 
 
 class CalendarAgent:
-    def __init__(self, llm: Optional[OllamaLLM] = None, calendar_provider=None, verbose: bool = True, timezone: str = None):
+    DEFAULT_SESSION = "default"
+
+    def __init__(self, llm: Optional[OllamaLLM] = None, calendar_provider=None, verbose: bool = True, timezone: str = None, session_store: Optional[SessionStore] = None, compactor: Optional[HistoryCompactor] = None, fast_llm: Optional[OllamaLLM] = None, multi_user: bool = False):
         self.llm = llm if llm else OllamaLLM()
+        # Optional small model tier for simple turns, the main model handles the rest
+        self.fast_llm = fast_llm if fast_llm else OllamaLLM.fast()
 
-        self.tools = get_calendar_tools(calendar_provider)
-        print(f"\nLoaded {len(self.tools)} tools:")
-        for tool in self.tools:
-            print(f"   - {tool.name}")
-        print()
-        llm_with_tools = self.llm.get_llm().bind_tools(self.tools)
+        settings = get_settings()
+        self.timezone = timezone or settings.TIMEZONE
+        self.tz = get_timezone(self.timezone)
+        # With multi_user every turn brings its own calendar, see chat(calendar=...)
+        # A provider the agent built itself is also closed by the agent
+        self._owns_calendar = calendar_provider is None and not multi_user
+        if self._owns_calendar:
+            calendar_provider = get_calendar_provider()
+        self.calendar = calendar_provider
+        # Shared by both agent loops to run independent tool calls of one step concurrently
+        self.tool_executor = ThreadPoolExecutor(
+            max_workers=settings.TOOL_MAX_WORKERS,
+            thread_name_prefix="calendar-tool"
+        )
+        self.tools = get_calendar_tools(self.calendar, executor=self.tool_executor, per_request=multi_user)
+        logger.info("Loaded %d tools: %s", len(self.tools), ", ".join(tool.name for tool in self.tools))
+
+        self.agent_executor = self._build_executor(self.llm, verbose)
+        self.agent = self.agent_executor.agent
+        self.fast_executor = self._build_executor(self.fast_llm, verbose) if self.fast_llm else None
+
+        if session_store is None:
+            session_store = SessionStore(
+                max_sessions=settings.SESSION_MAX_SESSIONS,
+                ttl_seconds=settings.SESSION_TTL_SECONDS,
+                max_messages=settings.SESSION_MAX_MESSAGES,
+                db_path=settings.SESSION_DB_PATH or None
+            )
+        self.sessions = session_store
+
+        if compactor is None:
+            compactor = HistoryCompactor(
+                token_budget=settings.HISTORY_TOKEN_BUDGET,
+                keep_turns=settings.HISTORY_KEEP_TURNS,
+                mode=settings.HISTORY_COMPACTION_MODE,
+                llm=self.fast_llm or self.llm
+            )
+        self.compactor = compactor
 
-        self.agent = create_tool_calling_agent(
+        # Turns run concurrently on the loop and in worker threads, per-turn numbers go out with each TurnResult
+        self.usage_totals: Dict[str, int] = {"turns": 0, "llm_calls": 0, "prompt_eval_tokens": 0, "completion_tokens": 0}
+        self._usage_lock = threading.Lock()
+
+        self.router = IntentRouter(self.calendar, self.timezone) if settings.FAST_PATH_ENABLED else None
+        self.response_cache = ResponseCache(
+            max_size=settings.RESPONSE_CACHE_SIZE,
+            ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS
+        )
+        logger.info("Calendar Agent started. %s", self.llm.model)
+
+    def _build_executor(self, llm: OllamaLLM, verbose: bool) -> ParallelAgentExecutor:
+        llm_with_tools = llm.get_llm().bind_tools(self.tools)
+
+        agent = create_tool_calling_agent(
             llm=llm_with_tools,
             tools=self.tools,
             prompt=CALENDAR_AGENT_PROMPT,
         )
 
-        self.agent_executor = AgentExecutor(
-            agent=self.agent,
+        return ParallelAgentExecutor(
+            agent=agent,
             tools=self.tools,
+            tool_executor=self.tool_executor,
             verbose=verbose,
             handle_parsing_errors=True,
             max_iterations=5,
             return_intermediate_steps=False
         )
 
-        self.chat_history: List = []
-        print(f"Calendar Agent started. {self.llm.model}")
+    def _select_executor(self, user_message: str) -> ParallelAgentExecutor:
+        if self.fast_executor is not None and not needs_reasoning(user_message):
+            return self.fast_executor
+        return self.agent_executor
 
-    def chat(self, user_message: str) -> str:
+    def _callbacks(self, executor: ParallelAgentExecutor, usage: OllamaUsageCallback) -> dict:
+        model = self.fast_llm.model if executor is self.fast_executor else self.llm.model
+        return {"callbacks": [usage, TelemetryCallback(model)]}
 
-        try:
-            settings = get_settings()
-            user_tz = pytz.timezone(settings.TIMEZONE)
-            current_time = datetime.now(user_tz)
-            context_message = (
-                f"Current date and time: {current_time.strftime('%A, %B %d, %Y at %I:%M %p')}\n\n"
-                f"User's timezone: {settings.TIMEZONE}\n\n"
-                f"User request: {user_message}"
+    def _build_input(self, user_message: str, session_id: Hashable) -> Tuple[dict, CompactionReport, Session]:
+        current_time = datetime.now(self.tz)
+        context_message = (
+            f"Current date and time: {current_time.strftime('%A, %B %d, %Y at %I:%M %p')}\n"
+            f"User's timezone: {self.timezone}"
+        )
+
+        session = self.sessions.get(session_id)
+        chat_history, report = self.compactor.compact(session)
+        if report.compacted:
+            self.sessions.save(session)
+            logger.info(
+                "History compacted: %d -> %d tokens (%d messages folded)",
+                report.tokens_before, report.tokens_after, report.folded_messages
             )
 
-            result = self.agent_executor.invoke({
-                "input": context_message,
-                "chat_history": self.chat_history
-            })
-            self.chat_history.append(HumanMessage(content=user_message))
-            self.chat_history.append(AIMessage(content=result['output']))
+        agent_input = {
+            "input": user_message,
+            "context": context_message,
+            "chat_history": chat_history
+        }
+        return agent_input, report, session
+
+    def _report_usage(self, usage: OllamaUsageCallback) -> Dict[str, float]:
+        turn_usage = usage.as_dict()
+        with self._usage_lock:
+            self.usage_totals["turns"] += 1
+            for key in ("llm_calls", "prompt_eval_tokens", "completion_tokens"):
+                self.usage_totals[key] += turn_usage[key]
+        logger.info(
+            "Turn used %d prompt-eval tokens and %d completion tokens over %d LLM call(s)",
+            usage.prompt_eval_tokens, usage.completion_tokens, usage.calls
+        )
+        return turn_usage
+
+    def usage_stats(self) -> Dict[str, int]:
+        """Token usage of all turns so far"""
+        with self._usage_lock:
+            return dict(self.usage_totals)
+
+    def _record_turn(self, session_id: Hashable, user_message: str, output: str):
+        self.sessions.append(
+            session_id,
+            HumanMessage(content=user_message),
+            AIMessage(content=output)
+        )
+
+    async def _arecord_turn(self, session_id: Hashable, user_message: str, output: str):
+        await self.sessions.aappend(
+            session_id,
+            HumanMessage(content=user_message),
+            AIMessage(content=output)
+        )
+
+    def _cache_key(self, user_message: str, calendar) -> Optional[Hashable]:
+        """Response cache key of a turn, None when its answer could not be reused"""
+        if not self.response_cache.keyable(user_message) or calendar is None:
+            return None
+        try:
+            if isinstance(calendar, AsyncGoogleCalendarInterface):
+                version = calendar.run_sync(calendar.calendar_version())
+            else:
+                version = calendar.calendar_version()
+        except Exception as e:
+            logger.warning("Could not read the calendar version, not caching: %s", str(e))
+            return None
+        return self.response_cache.key(user_message, calendar, version, datetime.now(self.tz))
 
-            return result['output']
+    async def _acache_key(self, user_message: str, calendar) -> Optional[Hashable]:
+        if not self.response_cache.keyable(user_message) or calendar is None:
+            return None
+        try:
+            if isinstance(calendar, AsyncGoogleCalendarInterface):
+                version = await calendar.calendar_version()
+            else:
+                # A stale event cache syncs first, keep that off the event loop
+                version = await asyncio.to_thread(calendar.calendar_version)
         except Exception as e:
-            return f"❌ An error occurred while processing your request: {str(e)}"
+            logger.warning("Could not read the calendar version, not caching: %s", str(e))
+            return None
+        return self.response_cache.key(user_message, calendar, version, datetime.now(self.tz))
+
+    def _store_answer(self, key: Optional[Hashable], calendar, calls: TurnCalls, output: str):
+        """
+        Cache the answer of a turn whose tools read the calendar and changed
+        nothing, a turn that wrote to the calendar invalidates its answers instead
+        """
+        if calls.writes:
+            self.response_cache.invalidate(calendar)
+        elif calls.read_only:
+            self.response_cache.put(key, output)
+
+    def chat(self, user_message: str, session_id: Hashable = DEFAULT_SESSION, calendar=None) -> str:
+        """
+        Run one turn. `calendar` is the provider of the user sending the
+        message, the agent's own calendar is used when it is not given.
+        """
+        return self.chat_turn(user_message, session_id, calendar).output
+
+    def chat_turn(self, user_message: str, session_id: Hashable = DEFAULT_SESSION, calendar=None) -> TurnResult:
+        """chat() that also returns the turn's token usage and history compaction"""
+        with turn_span("agent") as span, use_calendar(calendar):
+            try:
+                match = self.router.route(user_message) if self.router else None
+                if match is not None:
+                    span["path"] = "fast_path"
+                    output = self.router.answer(match, calendar)
+                    self._record_turn(session_id, user_message, output)
+                    return TurnResult(output)
+
+                target = calendar if calendar is not None else self.calendar
+                key = self._cache_key(user_message, target)
+                output = self.response_cache.get(key)
+                if output is not None:
+                    span["path"] = "cache"
+                    self._record_turn(session_id, user_message, output)
+                    return TurnResult(output)
+
+                agent_input, compaction, session = self._build_input(user_message, session_id)
+                usage = OllamaUsageCallback()
+                executor = self._select_executor(user_message)
+                # Handles in tool results belong to this conversation only
+                with record_calls() as calls, use_handles(session.handles):
+                    result = executor.invoke(agent_input, config=self._callbacks(executor, usage))
+                self._store_answer(key, target, calls, result['output'])
+                turn_usage = self._report_usage(usage)
+                self._record_turn(session_id, user_message, result['output'])
+
+                return TurnResult(result['output'], turn_usage, compaction)
+            except Exception as e:
+                span["status"] = "error"
+                logger.exception("Turn failed")
+                return TurnResult(f"❌ An error occurred while processing your request: {str(e)}")
+
+    async def achat(self, user_message: str, session_id: Hashable = DEFAULT_SESSION, calendar=None) -> str:
+        """
+        Async version of chat: the LLM and the calendar tools are awaited, so
+        many turns can share one event loop.
+        """
+        return (await self.achat_turn(user_message, session_id, calendar)).output
+
+    async def achat_turn(self, user_message: str, session_id: Hashable = DEFAULT_SESSION, calendar=None) -> TurnResult:
+        """achat() that also returns the turn's token usage and history compaction"""
+        with turn_span("agent") as span, use_calendar(calendar):
+            try:
+                match = self.router.route(user_message) if self.router else None
+                if match is not None:
+                    span["path"] = "fast_path"
+                    output = await self.router.aanswer(match, calendar)
+                    await self._arecord_turn(session_id, user_message, output)
+                    return TurnResult(output)
+
+                target = calendar if calendar is not None else self.calendar
+                key = await self._acache_key(user_message, target)
+                output = self.response_cache.get(key)
+                if output is not None:
+                    span["path"] = "cache"
+                    await self._arecord_turn(session_id, user_message, output)
+                    return TurnResult(output)
+
+                # Compaction may call the LLM synchronously, keep it off the event loop
+                agent_input, compaction, session = await asyncio.to_thread(self._build_input, user_message, session_id)
+                usage = OllamaUsageCallback()
+                executor = self._select_executor(user_message)
+                with record_calls() as calls, use_handles(session.handles):
+                    result = await executor.ainvoke(agent_input, config=self._callbacks(executor, usage))
+                self._store_answer(key, target, calls, result['output'])
+                turn_usage = self._report_usage(usage)
+                await self._arecord_turn(session_id, user_message, result['output'])
+
+                return TurnResult(result['output'], turn_usage, compaction)
+            except Exception as e:
+                span["status"] = "error"
+                logger.exception("Turn failed")
+                return TurnResult(f"❌ An error occurred while processing your request: {str(e)}")
         
-    def clear_history(self):
-        self.chat_history = []
-        print("Chat history cleared.")
+    async def astream(self, user_message: str, session_id: Hashable = DEFAULT_SESSION, calendar=None) -> AsyncIterator[AgentStreamEvent]:
+        """
+        Run a turn and yield its progress as it happens: tool calls, model
+        output chunks and finally the full answer.
+        """
+        with turn_span("stream") as span, use_calendar(calendar):
+            try:
+                match = self.router.route(user_message) if self.router else None
+                if match is not None:
+                    span["path"] = "fast_path"
+                    output = await self.router.aanswer(match, calendar)
+                    await self._arecord_turn(session_id, user_message, output)
+                    yield AgentStreamEvent(kind="final", text=output)
+                    return
+
+                target = calendar if calendar is not None else self.calendar
+                key = await self._acache_key(user_message, target)
+                output = self.response_cache.get(key)
+                if output is not None:
+                    span["path"] = "cache"
+                    await self._arecord_turn(session_id, user_message, output)
+                    yield AgentStreamEvent(kind="final", text=output)
+                    return
+
+                agent_input, compaction, session = await asyncio.to_thread(self._build_input, user_message, session_id)
+                output = None
+                usage = OllamaUsageCallback()
+                executor = self._select_executor(user_message)
+                events = executor.astream_events(
+                    agent_input,
+                    version="v2",
+                    config=self._callbacks(executor, usage)
+                )
+                with record_calls() as calls, use_handles(session.handles):
+                    async for event in events:
+                        kind = event["event"]
+                        if kind == "on_chat_model_stream":
+                            chunk = event["data"]["chunk"].content
+                            if chunk:
+                                yield AgentStreamEvent(kind="token", text=chunk)
+                        elif kind == "on_tool_start":
+                            yield AgentStreamEvent(kind="tool_start", tool=event["name"])
+                        elif kind == "on_tool_end":
+                            yield AgentStreamEvent(kind="tool_end", tool=event["name"])
+                        elif kind == "on_chain_end" and not event.get("parent_ids"):
+                            output = event["data"]["output"]["output"]
+
+                if output is None:
+                    raise Exception("Agent finished without an answer")
+                self._store_answer(key, target, calls, output)
+                turn_usage = self._report_usage(usage)
+                await self._arecord_turn(session_id, user_message, output)
+                yield AgentStreamEvent(kind="final", text=output, usage=turn_usage, compaction=compaction)
+            except Exception as e:
+                span["status"] = "error"
+                logger.exception("Turn failed")
+                yield AgentStreamEvent(kind="final", text=f"❌ An error occurred while processing your request: {str(e)}")
+
+    def close(self):
+        self.tool_executor.shutdown(wait=False)
+        self.sessions.close()
+        # An async provider's client belongs to its event loop and is closed there
+        close = getattr(self.calendar, 'close', None) if self._owns_calendar else None
+        if close is not None and not asyncio.iscoroutinefunction(close):
+            close()
+
+    def clear_history(self, session_id: Hashable = DEFAULT_SESSION):
+        self.sessions.clear(session_id)
+        logger.info("Chat history cleared for session %s", session_id)
 
-    def get_history(self) -> List[Dict[str, str]]:
+    def get_history(self, session_id: Hashable = DEFAULT_SESSION) -> List[Dict[str, str]]:
         history = []
-        for msg in self.chat_history:
+        for msg in self.sessions.get(session_id).history:
             if isinstance(msg, HumanMessage):
                 history.append({"role": "user", "content": msg.content})
             elif isinstance(msg, AIMessage):
@@ -0,0 +1,111 @@
+import logging
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from ..LLMProvider.OllamaProvider import OllamaLLM
+from .SessionStore import Session
+
+logger = logging.getLogger(__name__)
+
+
+SUMMARY_PROMPT = (
+    "You maintain a running summary of a conversation between a user and their calendar assistant. "
+    "Merge the previous summary with the new messages into a short summary of at most a few sentences. "
+    "Keep event names, dates, times and any decisions or pending questions. Reply with the summary only."
+)
+
+
+def estimate_tokens(text: str) -> int:
+    # Roughly four characters per token for English text, close enough for budgeting
+    return len(text) // 4 + 1
+
+
+def count_message_tokens(messages: List[BaseMessage]) -> int:
+    return sum(estimate_tokens(str(msg.content)) for msg in messages)
+
+
+@dataclass
+class CompactionReport:
+    tokens_before: int
+    tokens_after: int
+    messages_before: int
+    messages_after: int
+    folded_messages: int = 0
+
+    @property
+    def compacted(self) -> bool:
+        return self.folded_messages > 0
+
+
+class HistoryCompactor:
+    """
+    Keeps the history sent with each prompt under a token budget.
+
+    The last `keep_turns` turns are always sent verbatim. Once the history goes
+    over budget, older turns are folded into the session's rolling summary
+    (mode "summarize") or discarded (mode "drop"). When the kept turns alone
+    are still over budget, all but the last turn are folded the same way.
+    Turns the session store trimmed at its message cap are always folded.
+    """
+
+    MODES = ("summarize", "drop")
+
+    def __init__(self, token_budget: int = 1500, keep_turns: int = 4, mode: str = "summarize", llm: Optional[OllamaLLM] = None):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown compaction mode: {mode}")
+        if mode == "summarize" and llm is None:
+            raise ValueError("Summarize mode requires an llm")
+
+        self.token_budget = token_budget
+        self.keep_turns = keep_turns
+        self.mode = mode
+        self.llm = llm
+
+    def _summary_message(self, session: Session) -> List[BaseMessage]:
+        if not session.summary:
+            return []
+        return [SystemMessage(content=f"Summary of the earlier conversation: {session.summary}")]
+
+    def _summarize(self, previous: str, messages: List[BaseMessage]) -> str:
+        transcript = "\n".join(f"{msg.type}: {msg.content}" for msg in messages)
+        return self.llm.chat([
+            SystemMessage(content=SUMMARY_PROMPT),
+            HumanMessage(content=f"Previous summary:\n{previous or '(none)'}\n\nNew messages:\n{transcript}")
+        ]).strip()
+
+    def compact(self, session: Session) -> Tuple[List[BaseMessage], CompactionReport]:
+        """
+        Compacts the session in place and returns the messages to send as chat history.
+        """
+        messages_before = len(session.history)
+        tokens_before = count_message_tokens(self._summary_message(session) + session.history)
+
+        fold = 0
+        if tokens_before > self.token_budget:
+            keep = self.keep_turns * 2
+            fold = max(len(session.history) - keep, 0) if keep else len(session.history)
+            # Recent turns alone can still be too large, fold whole turns too but keep the last one
+            while len(session.history) - fold > 2 and count_message_tokens(self._summary_message(session) + session.history[fold:]) > self.token_budget:
+                fold += 2
+
+        to_fold = session.trimmed + session.history[:fold]
+        folded = len(to_fold)
+        if to_fold:
+            if self.mode == "summarize":
+                try:
+                    session.summary = self._summarize(session.summary, to_fold)
+                except Exception as e:
+                    # A failed summary should not fail the turn, the old turns are dropped instead
+                    logger.warning("History summarization failed, dropping old turns: %s", str(e))
+            session.history = session.history[fold:]
+            session.trimmed = []
+
+        prompt_history = self._summary_message(session) + list(session.history)
+        report = CompactionReport(
+            tokens_before=tokens_before,
+            tokens_after=count_message_tokens(prompt_history),
+            messages_before=messages_before,
+            messages_after=len(session.history),
+            folded_messages=folded
+        )
+        return prompt_history, report
@@ -0,0 +1,213 @@
+import asyncio
+import re
+from dataclasses import dataclass
+from datetime import datetime, date, time, timedelta
+from typing import List, Optional
+import pytz
+from ..helpers.Config import get_timezone
+from ..calenderProvider.GoogleCalendarInterface import AsyncGoogleCalendarInterface, CalendarEvent, EventDateTime, EventFilters
+
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+# "schedule" is a verb unless it follows a possessive or an article, as in "my schedule"
+SCHEDULE_VERB = r"(?<!\bmy\s)(?<!\bthe\s)(?<!\byour\s)(?<!\bour\s)(?<!'s\s)schedule"
+WRITE_WORDS = (
+    rf"(add|create|{SCHEDULE_VERB}|book|set up|put|push|move|shift|reschedule|postpone|change|update|edit|rename|"
+    r"cancel|delete|remove|clear|invite)\w*"
+)
+# Requests that change the calendar
+WRITE = re.compile(rf"\b({WRITE_WORDS})")
+# Anything that changes the calendar or needs judgement goes to the agent
+MUTATING = re.compile(rf"\b({WRITE_WORDS}|free|find|when)\b")
+READ_CUE = re.compile(
+    r"\b(what'?s|what is|what do i have|what have i got|show|list|schedule|calendar|agenda|events?|meetings?|plans?|busy|anything)\b"
+)
+# Messages that read as questions, anything else ("My meeting tomorrow is at 4", "calendar: gym tomorrow")
+# is usually the start of an edit unless it is one of the LISTING phrases
+QUESTION = re.compile(r"^(what|what's|whats|which|how many|do i|am i|have i|is there|are there|is anything|any|anything)\b")
+DAY_WORDS = r"today|tonight|tomorrow|(?:this |next )?(?:" + "|".join(WEEKDAYS) + r")"
+# Complete messages that can only mean a listing: "my schedule this week", "show me tomorrow's meetings", "next meeting"
+LISTING = re.compile(
+    rf"^(?:(?:show|list)(?: me)? )?(?:(?:my|the) )?(?:(?:{DAY_WORDS})'s )?"
+    r"(?:schedule|calendar|agenda|events|meetings|appointments|plans|(?:next|upcoming) (?:meeting|event|appointment|call))"
+    rf"(?: (?:for|on))?(?: (?:{DAY_WORDS}|(?:this|next) week))?$"
+)
+NEXT_EVENT = re.compile(r"\b(next|upcoming)\s+(meeting|event|appointment|call)\b")
+WEEK = re.compile(r"\b(this|next)\s+week\b")
+DAY = re.compile(r"\b(today|tonight|tomorrow|" + "|".join(WEEKDAYS) + r")\b")
+# Turns that need planning rather than a single lookup or edit
+COMPLEX = re.compile(
+    r"\b(free|available|availability|slot|find a time|best time|fit|conflicts?|overlap|reschedule|"
+    r"every|recurring|repeat|weekly|daily|all my|each|plan|organi[sz]e|priorit)"
+)
+
+
+def resolve_day(word: str, text: str, today: date) -> date:
+    """The date a DAY word refers to, "friday" is the coming one and "next friday" never today"""
+    if word in ("today", "tonight"):
+        return today
+    if word == "tomorrow":
+        return today + timedelta(days=1)
+    ahead = (WEEKDAYS.index(word) - today.weekday()) % 7
+    if re.search(r"\bnext\s+" + word, text):
+        ahead = ahead or 7
+    return today + timedelta(days=ahead)
+
+
+def needs_reasoning(user_message: str) -> bool:
+    """
+    Decide whether a turn should go to the large reasoning model. Short,
+    single-step requests are left to the fast model tier.
+    """
+    text = user_message.lower()
+    return len(text.split()) > 40 or bool(COMPLEX.search(text))
+
+
+@dataclass
+class RouteMatch:
+    intent: str  # "day", "week" or "next"
+    label: str
+    filters: EventFilters
+
+
+class IntentRouter:
+    """
+    Answers common read-only questions ("what's on tomorrow", "my schedule
+    this week", "next meeting") straight from the calendar provider, without
+    an LLM call. Only questions and the fixed LISTING phrases qualify, and
+    anything that mentions a change goes to the agent: route() returns None
+    whenever it is not sure.
+    """
+
+    MAX_WORDS = 12
+    MAX_EVENTS = 50
+
+    def __init__(self, calendar, timezone: str = "UTC"):
+        self.calendar = calendar
+        self.tz = get_timezone(timezone)
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict:
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hit_rate}
+
+    def _day_bounds(self, day: date):
+        start = self.tz.localize(datetime.combine(day, time.min))
+        end = self.tz.localize(datetime.combine(day + timedelta(days=1), time.min))
+        return start.astimezone(pytz.utc), end.astimezone(pytz.utc)
+
+    def _match(self, text: str, is_question: bool, now: datetime) -> Optional[RouteMatch]:
+        if len(text.split()) > self.MAX_WORDS or MUTATING.search(text):
+            return None
+
+        if not is_question and not QUESTION.search(text) and not LISTING.match(text):
+            return None
+
+        if NEXT_EVENT.search(text):
+            return RouteMatch(
+                intent="next",
+                label="next event",
+                filters=EventFilters(start_date=now.astimezone(pytz.utc), max_results=1)
+            )
+
+        if not READ_CUE.search(text):
+            return None
+
+        week = WEEK.search(text)
+        if week:
+            monday = now.date() - timedelta(days=now.weekday())
+            if week.group(1) == "next":
+                start_day, label = monday + timedelta(days=7), "Next week"
+            else:
+                start_day, label = now.date(), "This week"
+            start, _ = self._day_bounds(start_day)
+            _, end = self._day_bounds(monday + timedelta(days=6 if week.group(1) == "this" else 13))
+            return RouteMatch(
+                intent="week",
+                label=label,
+                filters=EventFilters(start_date=start, end_date=end, max_results=self.MAX_EVENTS)
+            )
+
+        days = DAY.findall(text)
+        if len(set(days)) != 1:
+            return None
+        word = days[0]
+        day = resolve_day(word, text, now.date())
+        label = {"today": "Today", "tonight": "Today", "tomorrow": "Tomorrow"}.get(word, word.capitalize())
+
+        start, end = self._day_bounds(day)
+        if word == "tonight":
+            start = max(start, now.astimezone(pytz.utc))
+        return RouteMatch(
+            intent="day",
+            label=f"{label} ({day.strftime('%A, %B %d')})",
+            filters=EventFilters(start_date=start, end_date=end, max_results=self.MAX_EVENTS)
+        )
+
+    def route(self, user_message: str, now: Optional[datetime] = None) -> Optional[RouteMatch]:
+        text = " ".join(re.sub(r"[^\w\s']", " ", user_message.lower()).split())
+        is_question = user_message.rstrip().endswith("?")
+        match = self._match(text, is_question, now or datetime.now(self.tz))
+        if match is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return match
+
+    def _local(self, value: EventDateTime) -> datetime:
+        return value.aware(self.tz).astimezone(self.tz)
+
+    def _when(self, event: CalendarEvent, day_format: str = "", separator: str = ", ") -> str:
+        """Times of an event, after the day in `day_format` when one is given; "all day" for all-day events"""
+        start = self._local(event.start_time)
+        day = start.strftime(day_format) if day_format else ""
+        if event.start_time.is_all_day:
+            return f"{day}, all day" if day else "all day"
+        times = f"{start.strftime('%I:%M %p')} - {self._local(event.end_time).strftime('%I:%M %p')}"
+        return f"{day}{separator}{times}" if day else times
+
+    def format(self, match: RouteMatch, events: List[CalendarEvent]) -> str:
+        if match.intent == "next":
+            if not events:
+                return "📅 You have no upcoming events."
+            event = events[0]
+            lines = [
+                f"📅 Your next event is **{event.title}**",
+                f"🕒 {self._when(event, '%A, %B %d', separator=' at ')}"
+            ]
+            if event.location:
+                lines.append(f"📍 {event.location}")
+            return "\n".join(lines)
+
+        if not events:
+            return f"📅 {match.label}: nothing on your calendar."
+
+        lines = [f"📅 {match.label}: {len(events)} event(s)", ""]
+        for i, event in enumerate(events, 1):
+            when = self._when(event) if match.intent == "day" else self._when(event, '%a %b %d')
+            lines.append(f"{i}. **{event.title}**")
+            lines.append(f"   🕒 {when}")
+            if event.location:
+                lines.append(f"   📍 {event.location}")
+        return "\n".join(lines)
+
+    def answer(self, match: RouteMatch, calendar=None) -> str:
+        """Answer from `calendar`, the router's own calendar by default"""
+        calendar = calendar if calendar is not None else self.calendar
+        if isinstance(calendar, AsyncGoogleCalendarInterface):
+            return calendar.run_sync(self.aanswer(match, calendar))
+        return self.format(match, calendar.list_events(match.filters))
+
+    async def aanswer(self, match: RouteMatch, calendar=None) -> str:
+        calendar = calendar if calendar is not None else self.calendar
+        if isinstance(calendar, AsyncGoogleCalendarInterface):
+            events = await calendar.list_events(match.filters)
+        else:
+            events = await asyncio.to_thread(calendar.list_events, match.filters)
+        return self.format(match, events)
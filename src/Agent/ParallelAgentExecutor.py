@@ -0,0 +1,56 @@
+import contextvars
+import threading
+from concurrent.futures import Executor, Future
+from typing import Iterator, Optional, Union
+from langchain.agents import AgentExecutor
+from langchain_core.agents import AgentAction, AgentFinish, AgentStep
+
+# Set while _iter_next_step is collecting the tool calls of one step
+_deferring = threading.local()
+
+
+class ParallelAgentExecutor(AgentExecutor):
+    """
+    AgentExecutor whose synchronous loop runs the tool calls of one step
+    concurrently on `tool_executor`, returning observations in call order.
+
+    The async loop already gathers tool calls; serializing mutating calls
+    is left to the tools themselves.
+
+    This hooks into AgentExecutor's private _iter_next_step and
+    _perform_agent_action, which is why requirements.txt keeps langchain
+    below 0.4; tests/test_parallel_agent_executor.py checks the behaviour.
+    """
+
+    tool_executor: Optional[Executor] = None
+
+    def _perform_agent_action(self, name_to_tool_map, color_mapping, agent_action, run_manager=None) -> Union[AgentStep, Future]:
+        if self.tool_executor is None or not getattr(_deferring, "active", False):
+            return super()._perform_agent_action(name_to_tool_map, color_mapping, agent_action, run_manager)
+        # Copy the context so callbacks and tracing still see this run
+        context = contextvars.copy_context()
+        return self.tool_executor.submit(
+            context.run,
+            super()._perform_agent_action,
+            name_to_tool_map,
+            color_mapping,
+            agent_action,
+            run_manager
+        )
+
+    def _iter_next_step(self, name_to_tool_map, color_mapping, inputs, intermediate_steps, run_manager=None) -> Iterator[Union[AgentFinish, AgentAction, AgentStep]]:
+        pending = []
+        _deferring.active = True
+        try:
+            # The base class yields every planned action first and then runs
+            # them one by one; with deferring on, running one only submits it.
+            for step in super()._iter_next_step(name_to_tool_map, color_mapping, inputs, intermediate_steps, run_manager):
+                if isinstance(step, Future):
+                    pending.append(step)
+                else:
+                    yield step
+        finally:
+            _deferring.active = False
+
+        for future in pending:
+            yield future.result()
@@ -0,0 +1,153 @@
+import re
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Hashable, Optional, Tuple
+from .IntentRouter import DAY, WEEK, resolve_day
+
+# Words that change nothing about the answer
+FILLER = re.compile(r"\b(please|pls|hey|hi|hello|ok|okay|so|just|again|actually|thanks|thank you|the|a|an)\b")
+# Answers that depend on the time of asking, not only on the day
+TIME_SENSITIVE = re.compile(r"\b(now|right now|next|upcoming|left|later|soon|remaining|yet|still)\b")
+# Follow-ups that lean on the conversation, the same words mean something else in another chat
+REFERENCE = re.compile(r"\b(it|its|that|those|them|this one|these|he|she|they|him|her)\b")
+ISO_DATE = re.compile(r"\b(\d{4})-(\d{2})-(\d{2})\b")
+
+
+def normalize(user_message: str) -> str:
+    """Lowercase, no punctuation or filler words, single spaces"""
+    text = re.sub(r"[^\w\s'\-]", " ", user_message.lower())
+    text = FILLER.sub(" ", text)
+    return " ".join(text.split())
+
+
+class ResponseCache:
+    """
+    Remembers the agent's answers to read-only turns ("what's on
+    tomorrow?") so a repeat is answered without the LLM or Google. Whether
+    a turn was read-only is up to the caller, from the tools it actually
+    called; the cache only refuses messages whose key would not capture
+    what the answer depends on.
+
+    An answer is keyed by the normalized message, the dates it is about and
+    the calendar's version, so it goes stale as soon as the calendar changes
+    (see calendar_version()). Providers that cannot report a version fall
+    back to a generation that the agent bumps after any turn that wrote to
+    the calendar. Entries expire after `ttl_seconds` and the least recently
+    used are dropped beyond `max_size`.
+    """
+
+    MAX_WORDS = 16
+
+    def __init__(self, max_size: int = 512, ttl_seconds: float = 300):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[str, float]]" = OrderedDict()
+        # Calendars are told apart by object, never by id() which is reused after collection
+        self._namespaces = weakref.WeakKeyDictionary()
+        self._generations = weakref.WeakKeyDictionary()
+        self._next_namespace = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl_seconds > 0
+
+    def keyable(self, user_message: str) -> bool:
+        """
+        Whether the answer to the message depends only on its text, dates and
+        the calendar, not on the time of asking or on earlier turns
+        """
+        if not self.enabled:
+            return False
+        text = normalize(user_message)
+        if not text or len(text.split()) > self.MAX_WORDS:
+            return False
+        return not (TIME_SENSITIVE.search(text) or REFERENCE.search(text))
+
+    def resolve_range(self, text: str, today: date) -> Tuple[date, date]:
+        """The days a question is about, today when it names none"""
+        week = WEEK.search(text)
+        if week:
+            monday = today - timedelta(days=today.weekday())
+            if week.group(1) == "next":
+                monday += timedelta(days=7)
+            return max(monday, today), monday + timedelta(days=6)
+        days = sorted({resolve_day(word, text, today) for word in DAY.findall(text)})
+        days += sorted(date(int(y), int(m), int(d)) for y, m, d in ISO_DATE.findall(text))
+        if not days:
+            return today, today
+        return min(days), max(days)
+
+    def _namespace(self, calendar) -> Tuple[int, int]:
+        if calendar is None:
+            return 0, 0
+        namespace = self._namespaces.get(calendar)
+        if namespace is None:
+            self._next_namespace += 1
+            namespace = self._namespaces[calendar] = self._next_namespace
+        return namespace, self._generations.get(calendar, 0)
+
+    def key(self, user_message: str, calendar, version: Optional[Hashable], now: datetime) -> Optional[Hashable]:
+        """The cache key of a turn, None when its answer must not be cached"""
+        if not self.keyable(user_message):
+            return None
+        text = normalize(user_message)
+        try:
+            date_range = self.resolve_range(text, now.date())
+        except ValueError:
+            return None
+        with self._lock:
+            namespace, generation = self._namespace(calendar)
+        return namespace, generation, version, text, date_range
+
+    def get(self, key: Optional[Hashable]) -> Optional[str]:
+        if key is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Optional[Hashable], output: str):
+        # Failures are worth asking again, and a question back to the user ("Shall I move them?") waits for a reply in one conversation
+        if key is None or not output or output.startswith("❌") or output.rstrip().endswith("?"):
+            return
+        with self._lock:
+            self._entries[key] = (output, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, calendar):
+        """The calendar was written to, answers cached for it no longer hold"""
+        with self._lock:
+            if calendar is None:
+                self._entries.clear()
+                return
+            self._generations[calendar] = self._generations.get(calendar, 0) + 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions
+            }
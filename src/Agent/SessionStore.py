@@ -0,0 +1,190 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Hashable, List, Optional
+from langchain_core.messages import BaseMessage, messages_from_dict, messages_to_dict
+from .ToolOutput import EventHandles
+
+# Event handles kept per conversation, the oldest are forgotten beyond this
+SESSION_HANDLES = 512
+
+
+@dataclass
+class Session:
+    session_id: str
+    history: List[BaseMessage] = field(default_factory=list)
+    summary: str = ""
+    last_used: float = field(default_factory=time.time)
+    # The event handles (e1, e2, ...) the history refers to
+    handles: EventHandles = field(default_factory=lambda: EventHandles(SESSION_HANDLES))
+    # Turns trimmed at max_messages that the compactor has not folded into the summary yet
+    trimmed: List[BaseMessage] = field(default_factory=list)
+
+
+class SessionStore:
+    """
+    Per-chat conversation history.
+
+    Sessions live in an LRU keyed by chat id, idle sessions expire after
+    `ttl_seconds` and every history is capped at `max_messages`. Turns cut
+    off at the cap are kept in `Session.trimmed` until HistoryCompactor
+    folds them into the summary. When
+    `db_path` is set, histories and their event handles are also written
+    to SQLite so they survive restarts, and rows of expired sessions are
+    deleted as sessions are evicted. Async callers use aappend() so the disk
+    write stays off the event loop.
+    """
+
+    # Expired rows are deleted at most this often
+    PRUNE_INTERVAL_SECONDS = 60
+
+    def __init__(self, max_sessions: int = 1000, ttl_seconds: float = 3600, max_messages: int = 40, db_path: Optional[str] = None):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_messages = max_messages
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = threading.Lock()
+        # SQLite writes happen outside _lock so readers of other sessions never wait on the disk
+        self._db_lock = threading.Lock()
+        self._next_prune = 0.0
+
+        self._db: Optional[sqlite3.Connection] = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "session_id TEXT PRIMARY KEY, history TEXT NOT NULL, "
+                "summary TEXT NOT NULL DEFAULT '', updated_at REAL NOT NULL, "
+                "handles TEXT NOT NULL DEFAULT '{}', trimmed TEXT NOT NULL DEFAULT '[]')"
+            )
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(sessions)")}
+            # Databases written before these columns existed
+            for column, default in (("handles", "'{}'"), ("trimmed", "'[]'")):
+                if column not in columns:
+                    self._db.execute(f"ALTER TABLE sessions ADD COLUMN {column} TEXT NOT NULL DEFAULT {default}")
+            self._db.commit()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _is_expired(self, last_used: float, now: float) -> bool:
+        return self.ttl_seconds > 0 and now - last_used > self.ttl_seconds
+
+    def _evict(self, now: float):
+        # Oldest sessions sit at the front, so stop at the first fresh one
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if not self._is_expired(oldest.last_used, now):
+                break
+            self._sessions.popitem(last=False)
+
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+        if self._db is not None and self.ttl_seconds > 0 and now >= self._next_prune:
+            self._next_prune = now + self.PRUNE_INTERVAL_SECONDS
+            with self._db_lock:
+                self._db.execute("DELETE FROM sessions WHERE updated_at < ?", (now - self.ttl_seconds,))
+                self._db.commit()
+
+    def _load(self, session_id: str, now: float) -> Session:
+        if self._db is not None:
+            with self._db_lock:
+                row = self._db.execute(
+                    "SELECT history, summary, updated_at, handles, trimmed FROM sessions WHERE session_id = ?",
+                    (session_id,)
+                ).fetchone()
+            if row and not self._is_expired(row[2], now):
+                return Session(
+                    session_id=session_id,
+                    history=messages_from_dict(json.loads(row[0])),
+                    summary=row[1],
+                    last_used=now,
+                    handles=EventHandles.from_dict(json.loads(row[3]), SESSION_HANDLES),
+                    trimmed=messages_from_dict(json.loads(row[4]))
+                )
+        return Session(session_id=session_id, last_used=now)
+
+    def _snapshot(self, session: Session) -> Optional[tuple]:
+        """The row to write for a session, taken under _lock"""
+        if self._db is None:
+            return None
+        return (
+            session.session_id, json.dumps(messages_to_dict(session.history)), session.summary,
+            session.last_used, json.dumps(session.handles.to_dict()), json.dumps(messages_to_dict(session.trimmed))
+        )
+
+    def _persist(self, row: Optional[tuple]):
+        if row is None:
+            return
+        with self._db_lock:
+            if self._db is None:
+                return
+            self._db.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, history, summary, updated_at, handles, trimmed) VALUES (?, ?, ?, ?, ?, ?)",
+                row
+            )
+            self._db.commit()
+
+    def get(self, session_id: Hashable) -> Session:
+        key = str(session_id)
+        now = time.time()
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is not None and self._is_expired(session.last_used, now):
+                del self._sessions[key]
+                session = None
+            if session is None:
+                session = self._load(key, now)
+                self._sessions[key] = session
+            else:
+                session.last_used = now
+                self._sessions.move_to_end(key)
+            self._evict(now)
+            return session
+
+    def append(self, session_id: Hashable, *messages: BaseMessage):
+        session = self.get(session_id)
+        with self._lock:
+            session.history.extend(messages)
+            excess = len(session.history) - self.max_messages
+            if excess > 0:
+                # Trim whole user/assistant turns so history never starts mid-turn
+                cut = excess + excess % 2
+                session.trimmed.extend(session.history[:cut])
+                del session.history[:cut]
+                # Waiting for the next compaction, turns answered without the agent never compact
+                del session.trimmed[:max(len(session.trimmed) - self.max_messages, 0)]
+            row = self._snapshot(session)
+        self._persist(row)
+
+    async def aappend(self, session_id: Hashable, *messages: BaseMessage):
+        """append() for the event loop, the SQLite write runs in a worker thread"""
+        if self._db is None:
+            self.append(session_id, *messages)
+            return
+        await asyncio.to_thread(self.append, session_id, *messages)
+
+    def save(self, session: Session):
+        with self._lock:
+            row = self._snapshot(session)
+        self._persist(row)
+
+    def clear(self, session_id: Hashable):
+        key = str(session_id)
+        with self._lock:
+            self._sessions.pop(key, None)
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM sessions WHERE session_id = ?", (key,))
+                self._db.commit()
+
+    def close(self):
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
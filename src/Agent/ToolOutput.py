@@ -0,0 +1,155 @@
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+from ..helpers.Config import get_timezone
+from ..calenderProvider.GoogleCalendarInterface import CalendarEvent
+
+# Tool results go back into the prompt, so they are kept terse: one line per
+# event, short handles instead of Google's 26+ character ids, minute precision
+# times and truncated free text. User-facing rendering lives elsewhere.
+
+TITLE_LIMIT = 80
+LOCATION_LIMIT = 60
+NOTE_LIMIT = 80
+DETAIL_NOTE_LIMIT = 400
+
+HANDLE = re.compile(r"e\d+")
+
+
+class EventHandles:
+    """
+    Short, stable handles (e1, e2, ...) for event ids. The model only ever
+    sees handles, tools map them back to the real id. The etag an event had
+    when it was last shown is kept too, so an update only applies to the
+    version the model saw. Old entries are evicted once `max_size` ids have
+    been handed out.
+
+    Every conversation has its own handles, stored with its session (see
+    to_dict), so "e3" in a saved history still means the same event after a
+    restart. A handle that was never handed out is refused instead of being
+    taken as an id.
+    """
+
+    def __init__(self, max_size: int = 4096):
+        self.max_size = max_size
+        self._handles: "OrderedDict[str, str]" = OrderedDict()
+        self._ids: dict = {}
+        self._etags: dict = {}
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    def handle(self, event_id: Optional[str], etag: Optional[str] = None) -> str:
+        if not event_id:
+            return "-"
+        with self._lock:
+            if etag:
+                self._etags[event_id] = etag
+            handle = self._handles.get(event_id)
+            if handle is not None:
+                self._handles.move_to_end(event_id)
+                return handle
+            self._counter += 1
+            handle = f"e{self._counter}"
+            self._handles[event_id] = handle
+            self._ids[handle] = event_id
+            while len(self._handles) > self.max_size:
+                evicted_id, evicted = self._handles.popitem(last=False)
+                del self._ids[evicted]
+                self._etags.pop(evicted_id, None)
+            return handle
+
+    def resolve(self, handle_or_id: str) -> str:
+        """Real id for a handle, anything that does not look like a handle is taken as an id"""
+        value = handle_or_id.strip()
+        with self._lock:
+            event_id = self._ids.get(value)
+        if event_id is not None:
+            return event_id
+        if HANDLE.fullmatch(value):
+            raise ValueError(f"Unknown event handle {value}, look the event up again")
+        return value
+
+    def etag(self, event_id: str) -> Optional[str]:
+        """The etag of the version of an event that was last shown, None when unknown"""
+        with self._lock:
+            return self._etags.get(event_id)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "counter": self._counter,
+                # Least recently used first, so eviction order survives a reload
+                "handles": [[event_id, handle] for event_id, handle in self._handles.items()],
+                "etags": dict(self._etags)
+            }
+
+    @classmethod
+    def from_dict(cls, data: dict, max_size: int = 4096) -> "EventHandles":
+        handles = cls(max_size)
+        handles._counter = data.get("counter", 0)
+        for event_id, handle in data.get("handles", []):
+            handles._handles[event_id] = handle
+            handles._ids[handle] = event_id
+        handles._etags = {event_id: etag for event_id, etag in data.get("etags", {}).items() if event_id in handles._handles}
+        return handles
+
+
+def truncate(text: Optional[str], limit: int) -> str:
+    text = " ".join((text or "").split())
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+def _local(value: datetime, tz: Optional[str]) -> datetime:
+    if tz and value.tzinfo is not None:
+        return value.astimezone(get_timezone(tz))
+    return value
+
+
+def compact_span(start: datetime, end: datetime, tz: Optional[str] = None) -> str:
+    """2025-10-18T14:00/15:00, the end keeps its date only when it is on another day"""
+    start, end = _local(start, tz), _local(end, tz)
+    if end.date() == start.date():
+        return f"{start:%Y-%m-%dT%H:%M}/{end:%H:%M}"
+    return f"{start:%Y-%m-%dT%H:%M}/{end:%Y-%m-%dT%H:%M}"
+
+
+def event_span(event: CalendarEvent, tz: Optional[str] = None) -> str:
+    """compact_span for timed events; 2025-12-25/all-day, or 2025-12-24/2025-12-26/all-day through the last day, for all-day ones"""
+    start, end = event.start_time, event.end_time
+    if start.is_all_day and end.is_all_day:
+        # Google's end date is exclusive
+        last = max(end.day - timedelta(days=1), start.day)
+        return f"{start.day:%Y-%m-%d}/all-day" if last == start.day else f"{start.day:%Y-%m-%d}/{last:%Y-%m-%d}/all-day"
+    day_zone = get_timezone(tz) if tz else None
+    return compact_span(start.aware(day_zone), end.aware(day_zone), tz)
+
+
+def encode_event(event: CalendarEvent, handles: EventHandles, tz: Optional[str] = None, note_limit: int = NOTE_LIMIT) -> str:
+    fields = [
+        handles.handle(event.id, event.etag),
+        event_span(event, tz),
+        truncate(event.title, TITLE_LIMIT)
+    ]
+    if event.recurrence:
+        rules = [line.split(":", 1)[-1] for line in event.recurrence if line.upper().startswith("RRULE")]
+        fields.append(f"repeats={';'.join(rules) or 'yes'}")
+    if event.recurring_event_id:
+        fields.append(f"series={handles.handle(event.recurring_event_id)}")
+    if event.location:
+        fields.append(f"at={truncate(event.location, LOCATION_LIMIT)}")
+    if event.description:
+        fields.append(f"note={truncate(event.description, note_limit)}")
+    return "|".join(fields)
+
+
+def encode_events(events: Iterable[CalendarEvent], handles: EventHandles, tz: Optional[str] = None) -> str:
+    lines = [encode_event(event, handles, tz) for event in events]
+    if not lines:
+        return "events(0)"
+    return "\n".join([f"events({len(lines)}) handle|start/end|title|extra"] + lines)
+
+
+def encode_spans(spans: List[tuple], tz: Optional[str] = None) -> str:
+    return "\n".join(compact_span(start, end, tz) for start, end in spans)
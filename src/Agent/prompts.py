@@ -8,6 +8,7 @@ Your capabilities:
 - List and search for events
 - Answer questions about the user's schedule
 - Provide smart scheduling suggestions
+- Find free time with find_free_slots, never by listing events and working out the gaps yourself
 
 Guidelines:
 1. **Always confirm destructive actions** (delete, update) before executing them
@@ -18,6 +19,8 @@ Guidelines:
 6. When listing events, be concise but informative
 7. If you're unsure about something, ask clarifying questions
 8. after performing an action succsessfully, DO NOT send the ID back to the user unless specifically asked for it.
+9. Tool results are compact, one event per line as handle|start/end|title|extra. Refer to events by their handle (e.g. e3) in tool calls, never show handles to the user.
+10. For repeating events pass recurrence as an RRULE (e.g. FREQ=WEEKLY;BYDAY=MO;COUNT=10). An occurrence of a series shows series=eN: change or delete eN for the whole series, the occurrence's own handle for that one date only.
 
 **CRITICAL TIMEZONE RULES:**
 - The user's timezone will be provided in EVERY message
@@ -41,6 +44,8 @@ For add_calendar_event and update_calendar_event:
 - Always use the user's timezone from the context when adding/updating events
 
 """),
-    MessagesPlaceholder(variable_name="chat_history", optional=True),("human","{input}"),
+    # Everything above the history is byte-identical on every turn so Ollama can reuse
+    # its KV cache for it; per-turn values (date, time) only appear in the last message.
+    MessagesPlaceholder(variable_name="chat_history", optional=True),("human","{input}\n\n{context}"),
     MessagesPlaceholder(variable_name="agent_scratchpad")
 ])
\ No newline at end of file
@@ -1,17 +1,194 @@
-from datetime import datetime
-from typing import Optional
-from langchain_core.tools import tool
+import asyncio
+import contextvars
+import inspect
+import threading
+import weakref
+from concurrent.futures import Executor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, time, timedelta
+from typing import TYPE_CHECKING, Iterator, List, Optional, Union
+from langchain_core.tools import StructuredTool
 from pydantic import BaseModel, Field
 
-from ..calenderProvider.GoogleCalendar import GoogleCalendar
-from ..calenderProvider.GoogleCalendarInterface import CalendarEvent, EventDateTime, EventFilters
+from ..helpers.Config import get_settings, get_timezone
+from ..calenderProvider.FreeBusyIndex import FreeBusyIndex
+from ..calenderProvider.MultiCalendar import AsyncMultiCalendar, MultiCalendar
+from ..calenderProvider.GoogleCalendarInterface import AsyncGoogleCalendarInterface, BatchItemResult, CalendarEvent, EventDateTime, EventFilters, EventPatch
+from .ToolOutput import DETAIL_NOTE_LIMIT, EventHandles, encode_event, encode_events, encode_spans
 
-def get_calendar_tools(calendar_provider: Optional[GoogleCalendar] = None):
-    if calendar_provider is None:
-        calendar_provider = GoogleCalendar()
-        if not calendar_provider.is_authenticated:
-            calendar_provider.authenticate()
-    calendar = calendar_provider
+if TYPE_CHECKING:
+    from ..calenderProvider.GoogleCalendar import GoogleCalendar
+    from ..calenderProvider.AsyncGoogleCalendar import AsyncGoogleCalendar
+
+# Set while a tool runs through its synchronous entry point, sync providers are then called inline
+_inline_calls = contextvars.ContextVar("inline_calls", default=False)
+# The calendar of the user whose turn is running, overrides the tools' default calendar
+_current_calendar = contextvars.ContextVar("current_calendar", default=None)
+# Collects the provider calls of the running turn, see record_calls()
+_turn_calls = contextvars.ContextVar("turn_calls", default=None)
+# The event handles of the conversation whose turn is running, see use_handles()
+_current_handles = contextvars.ContextVar("current_handles", default=None)
+
+
+@contextmanager
+def use_calendar(calendar) -> Iterator[None]:
+    """Run the tools called inside this block against `calendar`"""
+    token = _current_calendar.set(calendar)
+    try:
+        yield
+    finally:
+        _current_calendar.reset(token)
+
+
+@contextmanager
+def use_handles(handles: EventHandles) -> Iterator[None]:
+    """Hand out and resolve event handles of one conversation inside this block"""
+    token = _current_handles.set(handles)
+    try:
+        yield
+    finally:
+        _current_handles.reset(token)
+
+
+@dataclass
+class TurnCalls:
+    """Names of the provider methods the tools called during one turn"""
+    reads: List[str] = field(default_factory=list)
+    writes: List[str] = field(default_factory=list)
+
+    @property
+    def read_only(self) -> bool:
+        """The turn looked at the calendar and changed nothing"""
+        return bool(self.reads) and not self.writes
+
+
+@contextmanager
+def record_calls() -> Iterator[TurnCalls]:
+    """Yield a TurnCalls that collects the provider calls made inside this block"""
+    calls = TurnCalls()
+    token = _turn_calls.set(calls)
+    try:
+        yield calls
+    finally:
+        _turn_calls.reset(token)
+
+
+def get_calendar_provider() -> Union["GoogleCalendar", "AsyncGoogleCalendar", MultiCalendar, AsyncMultiCalendar]:
+    settings = get_settings()
+    calendar_ids = settings.calendar_ids
+
+    # The Google client libraries are only imported when a provider is actually built
+    if settings.GOOGLE_CALENDAR_ASYNC:
+        from ..calenderProvider.AsyncGoogleCalendar import AsyncGoogleCalendar
+        # Authenticates lazily on the event loop that makes the first request
+        calendar_provider = AsyncGoogleCalendar(calendar_id=calendar_ids[0])
+        if len(calendar_ids) == 1:
+            return calendar_provider
+        return AsyncMultiCalendar([calendar_provider] + [calendar_provider.for_calendar(calendar_id) for calendar_id in calendar_ids[1:]])
+
+    from ..calenderProvider.GoogleCalendar import GoogleCalendar
+    calendar_provider = GoogleCalendar(calendar_id=calendar_ids[0])
+    if not calendar_provider.is_authenticated:
+        calendar_provider.authenticate()
+    if len(calendar_ids) == 1:
+        return calendar_provider
+    # The other calendars reuse the first one's credentials and connections
+    return MultiCalendar([calendar_provider] + [calendar_provider.for_calendar(calendar_id) for calendar_id in calendar_ids[1:]])
+
+
+# Provider methods that change the calendar, these never run concurrently on one calendar
+MUTATING_METHODS = {
+    'add_event', 'update_event', 'patch_event', 'delete_event',
+    'add_events', 'update_events', 'patch_events', 'delete_events'
+}
+
+
+def get_calendar_tools(calendar_provider: Optional[Union["GoogleCalendar", "AsyncGoogleCalendar", MultiCalendar, AsyncMultiCalendar]] = None, executor: Optional[Executor] = None, per_request: bool = False):
+    """
+    The agent's calendar tools. They use `calendar_provider` unless a turn
+    binds another calendar with use_calendar(). With per_request=True there
+    is no default and every call must run inside use_calendar().
+    """
+    if calendar_provider is None and not per_request:
+        calendar_provider = get_calendar_provider()
+    default_calendar = calendar_provider
+    settings = get_settings()
+    tz = settings.TIMEZONE
+    # For calls outside a conversation, turns bring their session's handles with use_handles()
+    default_handles = EventHandles()
+    # Writes are serialized per calendar, turns of different users never wait for each other
+    write_locks = weakref.WeakKeyDictionary()
+    write_locks_guard = threading.Lock()
+
+    def current_calendar():
+        calendar = _current_calendar.get() or default_calendar
+        if calendar is None:
+            raise Exception("No calendar is connected for this conversation")
+        return calendar
+
+    def current_handles() -> EventHandles:
+        handles = _current_handles.get()
+        return handles if handles is not None else default_handles
+
+    def write_lock(calendar):
+        with write_locks_guard:
+            lock = write_locks.get(calendar)
+            if lock is None:
+                is_async = isinstance(calendar, AsyncGoogleCalendarInterface)
+                lock = write_locks[calendar] = asyncio.Lock() if is_async else threading.Lock()
+            return lock
+
+    def serialized(method, lock):
+        def run(*args):
+            with lock:
+                return method(*args)
+        return run
+
+    async def call(method, *args):
+        """Await a provider call without ever blocking the event loop on a sync provider"""
+        calendar = method.__self__
+        is_async = isinstance(calendar, AsyncGoogleCalendarInterface)
+        mutating = method.__name__ in MUTATING_METHODS
+        calls = _turn_calls.get()
+        if calls is not None:
+            # Recorded before the call, a write that failed halfway may still have changed something
+            (calls.writes if mutating else calls.reads).append(method.__name__)
+        if mutating:
+            if is_async:
+                async with write_lock(calendar):
+                    return await method(*args)
+            method = serialized(method, write_lock(calendar))
+        if is_async:
+            return await method(*args)
+        if _inline_calls.get():
+            return method(*args)
+        return await asyncio.get_running_loop().run_in_executor(executor, lambda: method(*args))
+
+    def calendar_tool(args_schema):
+        """
+        Build a tool from an async body. The coroutine is used by the async agent
+        path, the sync entry point runs the same body for AgentExecutor.invoke.
+        """
+        def decorator(body):
+            async def run_inline(**kwargs):
+                _inline_calls.set(True)
+                return await body(**kwargs)
+
+            def run(**kwargs):
+                calendar = current_calendar()
+                if isinstance(calendar, AsyncGoogleCalendarInterface):
+                    return calendar.run_sync(body(**kwargs))
+                return asyncio.run(run_inline(**kwargs))
+
+            return StructuredTool.from_function(
+                func=run,
+                coroutine=body,
+                name=body.__name__,
+                description=inspect.getdoc(body) or args_schema.__doc__,
+                args_schema=args_schema
+            )
+        return decorator
 
     class AddEventInput(BaseModel):
         """Schema for adding a calendar event"""
@@ -21,6 +198,7 @@ def get_calendar_tools(calendar_provider: Optional[GoogleCalendar] = None):
         description: Optional[str] = Field(None, description="Event description/notes")
         location: Optional[str] = Field(None, description="Event location/address")
         timezone: str = Field(default="UTC", description="Timezone (e.g., 'America/New_York', 'UTC')")
+        recurrence: Optional[str] = Field(None, description="Repeat rule in RRULE form (e.g., 'FREQ=WEEKLY;BYDAY=MO,WE;COUNT=10' or 'FREQ=DAILY;UNTIL=20251231T000000Z'), leave empty for a one-off event")
     
     
     class ListEventsInput(BaseModel):
@@ -28,57 +206,124 @@ def get_calendar_tools(calendar_provider: Optional[GoogleCalendar] = None):
         start_date: Optional[str] = Field(None, description="Filter by start date (ISO format: YYYY-MM-DDTHH:MM:SS)")
         end_date: Optional[str] = Field(None, description="Filter by end date (ISO format: YYYY-MM-DDTHH:MM:SS)")
         search_query: Optional[str] = Field(None, description="Search term to filter events by title/description")
-        max_results: int = Field(default=10, description="Maximum number of events to return (1-100)")
+        max_results: int = Field(default=10, description="Maximum number of events to return (1-250)", ge=1, le=250)
     
     
     class GetEventInput(BaseModel):
         """Schema for getting a specific event"""
-        event_id: str = Field(..., description="Unique event ID")
+        event_id: str = Field(..., description="Event handle (e.g. e3)")
     
     
     class UpdateEventInput(BaseModel):
         """Schema for updating an event"""
-        event_id: str = Field(..., description="Event ID to update")
+        event_id: str = Field(..., description="Handle of the event to update (e.g. e3), the series handle to change every occurrence")
         title: Optional[str] = Field(None, description="New event title")
         start_datetime: Optional[str] = Field(None, description="New start datetime (ISO format)")
         end_datetime: Optional[str] = Field(None, description="New end datetime (ISO format)")
         description: Optional[str] = Field(None, description="New description")
         location: Optional[str] = Field(None, description="New location")
         timezone: str = Field(default="UTC", description="Timezone")
+        recurrence: Optional[str] = Field(None, description="New repeat rule of a series in RRULE form")
     
     
     class DeleteEventInput(BaseModel):
         """Schema for deleting an event"""
-        event_id: str = Field(..., description="Event ID to delete")
+        event_id: str = Field(..., description="Handle of the event to delete (e.g. e3)")
+
+
+    class AddEventsInput(BaseModel):
+        """Schema for adding several events at once"""
+        events: List[AddEventInput] = Field(..., min_length=1, description="Events to add")
+
+
+    class UpdateEventsInput(BaseModel):
+        """Schema for updating several events at once"""
+        updates: List[UpdateEventInput] = Field(..., min_length=1, description="Updates to apply, one per event")
+
+
+    class DeleteEventsInput(BaseModel):
+        """Schema for deleting several events at once"""
+        event_ids: List[str] = Field(..., min_length=1, description="Handles of the events to delete")
+
+
+    class FindFreeSlotsInput(BaseModel):
+        """Schema for finding free time"""
+        start_date: str = Field(..., description="Start of the search range (ISO format: YYYY-MM-DDTHH:MM:SS)")
+        end_date: str = Field(..., description="End of the search range (ISO format: YYYY-MM-DDTHH:MM:SS)")
+        duration_minutes: int = Field(default=60, description="Length of the free time needed, in minutes", ge=5, le=1440)
+        working_hours_start: str = Field(default=settings.WORKING_HOURS_START, description="Start of the working day (HH:MM)")
+        working_hours_end: str = Field(default=settings.WORKING_HOURS_END, description="End of the working day (HH:MM)")
+        include_weekends: bool = Field(default=False, description="Also look on Saturdays and Sundays")
+        calendar_ids: Optional[List[str]] = Field(None, description="Calendars that must all be free (e.g. colleagues' emails), default is the user's calendar")
+        timezone: str = Field(default=settings.TIMEZONE, description="Timezone of the range and the working hours")
+        max_results: int = Field(default=5, description="Maximum number of slots to return (1-50)", ge=1, le=50)
+
+    def recurrence_lines(rule: str) -> List[str]:
+        rule = rule.strip()
+        return [rule if rule.upper().startswith("RRULE:") else f"RRULE:{rule}"]
+
+    def build_event(title, start_datetime, end_datetime, description=None, location=None, timezone="UTC", recurrence=None) -> CalendarEvent:
+        event = CalendarEvent(
+            title=title,
+            description=description,
+            start_time=EventDateTime(date_time=datetime.fromisoformat(start_datetime), time_zone=timezone),
+            end_time=EventDateTime(date_time=datetime.fromisoformat(end_datetime), time_zone=timezone),
+            location=location
+        )
+        if recurrence:
+            event.recurrence = recurrence_lines(recurrence)
+        return event
 
-    @tool(args_schema=AddEventInput)
-    def add_calendar_event(
+    def build_patch(title=None, start_datetime=None, end_datetime=None, description=None, location=None, timezone="UTC", recurrence=None) -> EventPatch:
+        changes = {}
+        if recurrence:
+            changes['recurrence'] = recurrence_lines(recurrence)
+        if title: 
+            changes['title'] = title
+        if description is not None: 
+            changes['description'] = description
+        if location is not None: 
+            changes['location'] = location
+        if start_datetime:
+            changes['start_time'] = EventDateTime(date_time=datetime.fromisoformat(start_datetime), time_zone=timezone)
+        if end_datetime:
+            changes['end_time'] = EventDateTime(date_time=datetime.fromisoformat(end_datetime), time_zone=timezone)
+        patch = EventPatch(**changes)
+        if patch.is_empty():
+            raise ValueError("No changes given")
+        return patch
+
+    def format_batch_results(results: List[BatchItemResult], labels: List[str], action: str) -> str:
+        succeeded = sum(1 for result in results if result.success)
+        lines = [f"{action} {succeeded}/{len(results)}"]
+        for i, (result, label) in enumerate(zip(results, labels), 1):
+            if result.success:
+                lines.append(f"{i}. ok {encode_event(result.event, current_handles(), tz) if result.event else label}")
+            else:
+                lines.append(f"{i}. failed {label}: {result.error}")
+        return "\n".join(lines)
+
+    @calendar_tool(AddEventInput)
+    async def add_calendar_event(
         title: str,
         start_datetime: str,
         end_datetime: str,
         description: Optional[str] = None,
         location: Optional[str] = None,
-        timezone: str = "UTC"
+        timezone: str = "UTC",
+        recurrence: Optional[str] = None
     ) -> str:
         
         try:
-            start_dt = datetime.fromisoformat(start_datetime)
-            end_dt = datetime.fromisoformat(end_datetime)
-            event = CalendarEvent(
-                title=title,
-                description=description,
-                start_time=EventDateTime(date_time=start_dt, time_zone=timezone),
-                end_time=EventDateTime(date_time=end_dt, time_zone=timezone),
-                location=location
-            )
+            event = build_event(title, start_datetime, end_datetime, description, location, timezone, recurrence)
 
-            created = calendar.add_event(event)
-            return f"Event added with ID: {created.title} ({created.id})"
+            created = await call(current_calendar().add_event, event)
+            return f"added {encode_event(created, current_handles(), tz)}"
         except Exception as e:
             return f"Failed to add event: {str(e)}"
         
-    @tool(args_schema=ListEventsInput)
-    def list_calendar_events(
+    @calendar_tool(ListEventsInput)
+    async def list_calendar_events(
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
         search_query: Optional[str] = None,
@@ -93,93 +338,178 @@ def get_calendar_tools(calendar_provider: Optional[GoogleCalendar] = None):
                 max_results=max_results
             )
             
-            events = calendar.list_events(filters)
-            
-            if not events:
-                return "📅 No events found matching your criteria."
-            
-            response = f"📅 Found {len(events)} event(s):\n\n"
-            for i, event in enumerate(events, 1):
-                response += f"{i}. **{event.title}**\n"
-                response += f"   🕒 {event.start_time.date_time.strftime('%A, %B %d at %I:%M %p')} - {event.end_time.date_time.strftime('%I:%M %p')}\n"
-                if event.location:
-                    response += f"   📍 {event.location}\n"
-                if event.description:
-                    response += f"   📝 {event.description[:100]}{'...' if len(event.description) > 100 else ''}\n"
-                response += f"   🆔 ID: {event.id}\n\n"
-            
-            return response
+            events = await call(current_calendar().list_events, filters)
+            return encode_events(events, current_handles(), tz)
         except Exception as e:
             return f"❌ Failed to list events: {str(e)}"
         
-    @tool(args_schema=GetEventInput)
-    def get_calendar_event(event_id: str) -> str:
+    @calendar_tool(GetEventInput)
+    async def get_calendar_event(event_id: str) -> str:
         
         try:
-            event = calendar.get_event(event_id)
-            response = f"📅 **{event.title}**\n"
-            response += f"🕒 Start: {event.start_time.date_time.strftime('%A, %B %d, %Y at %I:%M %p')}\n"
-            response += f"🕒 End: {event.end_time.date_time.strftime('%A, %B %d, %Y at %I:%M %p')}\n"
-            if event.location:
-                response += f"📍 Location: {event.location}\n"
-            if event.description:
-                response += f"📝 Description: {event.description}\n"
-            response += f"🆔 ID: {event.id}"
-            return response
+            event = await call(current_calendar().get_event, current_handles().resolve(event_id))
+            return encode_event(event, current_handles(), tz, note_limit=DETAIL_NOTE_LIMIT)
         except Exception as e:
             return f"❌ Failed to get event: {str(e)}"
     
     
-    @tool(args_schema=UpdateEventInput)
-    def update_calendar_event(
+    @calendar_tool(UpdateEventInput)
+    async def update_calendar_event(
         event_id: str,
         title: Optional[str] = None,
         start_datetime: Optional[str] = None,
         end_datetime: Optional[str] = None,
         description: Optional[str] = None,
         location: Optional[str] = None,
-        timezone: str = "UTC"
+        timezone: str = "UTC",
+        recurrence: Optional[str] = None
     ) -> str:
         
         try:
-            event = calendar.get_event(event_id)
-            
-            if title: 
-                event.title = title
-            if description is not None: 
-                event.description = description
-            if location is not None: 
-                event.location = location
-            if start_datetime:
-                event.start_time.date_time = datetime.fromisoformat(start_datetime)
-                event.start_time.time_zone = timezone
-            if end_datetime:
-                event.end_time.date_time = datetime.fromisoformat(end_datetime)
-                event.end_time.time_zone = timezone
+            patch = build_patch(title, start_datetime, end_datetime, description, location, timezone, recurrence)
+            handles = current_handles()
+            event_id = handles.resolve(event_id)
             
-            updated = calendar.update_event(event_id, event)
-            return f"✅ Successfully updated '{updated.title}'!"
+            # Fails with a conflict when the event changed since the model last saw it
+            updated = await call(current_calendar().patch_event, event_id, patch, handles.etag(event_id))
+            return f"updated {encode_event(updated, handles, tz)}"
         except Exception as e:
             return f"❌ Failed to update event: {str(e)}"
         
 
-    @tool(args_schema=DeleteEventInput)
-    def delete_calendar_event(event_id: str) -> str:
+    @calendar_tool(DeleteEventInput)
+    async def delete_calendar_event(event_id: str) -> str:
         """
         Delete a calendar event permanently.
         Use this when the user wants to remove or cancel an event.
         IMPORTANT: Always confirm with the user before deleting!
         """
         try:
-            calendar.delete_event(event_id)
-            return f"✅ Event successfully deleted from calendar!"
+            await call(current_calendar().delete_event, current_handles().resolve(event_id))
+            return f"deleted {event_id}"
         except Exception as e:
             return f"❌ Failed to delete event: {str(e)}"
         
+    @calendar_tool(AddEventsInput)
+    async def add_calendar_events(events: List[AddEventInput]) -> str:
+        """
+        Add several calendar events in a single request.
+        Prefer this over repeated add_calendar_event calls when creating more than one event.
+        """
+        try:
+            events = [AddEventInput.model_validate(item) for item in events]
+            results: List[Optional[BatchItemResult]] = [None] * len(events)
+            pending = []
+            for index, item in enumerate(events):
+                try:
+                    pending.append((index, build_event(**item.model_dump())))
+                except Exception as e:
+                    results[index] = BatchItemResult(index=index, success=False, error=str(e))
+
+            if pending:
+                created = await call(current_calendar().add_events, [event for _, event in pending])
+                for (index, _), result in zip(pending, created):
+                    results[index] = result.model_copy(update={'index': index})
+
+            return format_batch_results(results, [item.title for item in events], "added")
+        except Exception as e:
+            return f"❌ Failed to add events: {str(e)}"
+
+    @calendar_tool(UpdateEventsInput)
+    async def update_calendar_events(updates: List[UpdateEventInput]) -> str:
+        """
+        Update several calendar events in a single request, e.g. moving a group of meetings.
+        Prefer this over repeated update_calendar_event calls when changing more than one event.
+        IMPORTANT: Always confirm with the user before updating!
+        """
+        try:
+            updates = [UpdateEventInput.model_validate(item) for item in updates]
+            handles = current_handles()
+            results: List[Optional[BatchItemResult]] = [None] * len(updates)
+            pending = []
+            for index, item in enumerate(updates):
+                try:
+                    changes = item.model_dump(exclude={'event_id'})
+                    event_id = handles.resolve(item.event_id)
+                    pending.append((index, (event_id, build_patch(**changes), handles.etag(event_id))))
+                except Exception as e:
+                    results[index] = BatchItemResult(index=index, success=False, event_id=item.event_id, error=str(e))
+
+            if pending:
+                updated = await call(current_calendar().patch_events, [patch for _, patch in pending])
+                for (index, _), result in zip(pending, updated):
+                    results[index] = result.model_copy(update={'index': index})
+
+            return format_batch_results(results, [item.event_id for item in updates], "updated")
+        except Exception as e:
+            return f"❌ Failed to update events: {str(e)}"
+
+    @calendar_tool(DeleteEventsInput)
+    async def delete_calendar_events(event_ids: List[str]) -> str:
+        """
+        Delete several calendar events in a single request, e.g. clearing a day.
+        Prefer this over repeated delete_calendar_event calls when removing more than one event.
+        IMPORTANT: Always confirm with the user before deleting!
+        """
+        try:
+            results = await call(current_calendar().delete_events, [current_handles().resolve(event_id) for event_id in event_ids])
+            return format_batch_results(results, event_ids, "deleted")
+        except Exception as e:
+            return f"❌ Failed to delete events: {str(e)}"
+
+    @calendar_tool(FindFreeSlotsInput)
+    async def find_free_slots(
+        start_date: str,
+        end_date: str,
+        duration_minutes: int = 60,
+        working_hours_start: str = settings.WORKING_HOURS_START,
+        working_hours_end: str = settings.WORKING_HOURS_END,
+        include_weekends: bool = False,
+        calendar_ids: Optional[List[str]] = None,
+        timezone: str = settings.TIMEZONE,
+        max_results: int = 5
+    ) -> str:
+        """
+        Find free time slots of a given length within working hours, across one or more calendars.
+        Use this for questions like "when am I free for 2 hours this week" instead of listing events.
+        """
+        try:
+            zone = get_timezone(timezone)
+
+            def localize(value: str) -> datetime:
+                parsed = datetime.fromisoformat(value)
+                return parsed if parsed.tzinfo else zone.localize(parsed)
+
+            start, end = localize(start_date), localize(end_date)
+            day_start, day_end = time.fromisoformat(working_hours_start), time.fromisoformat(working_hours_end)
+            if day_end <= day_start:
+                raise ValueError("Working hours must end after they start")
+
+            busy = await call(current_calendar().get_busy_intervals, start, end, calendar_ids)
+            slots = FreeBusyIndex(busy).free_slots(
+                start, end,
+                duration=timedelta(minutes=duration_minutes),
+                tz=timezone,
+                day_start=day_start,
+                day_end=day_end,
+                days=None if include_weekends else range(5),
+                limit=max_results
+            )
+
+            if not slots:
+                return f"slots(0) none of {duration_minutes}min"
+            return f"slots({len(slots)}) start/end, each at least {duration_minutes}min\n{encode_spans(slots, timezone)}"
+        except Exception as e:
+            return f"❌ Failed to find free slots: {str(e)}"
+
     return [
         add_calendar_event,
         list_calendar_events,
         get_calendar_event,
         update_calendar_event,
-        delete_calendar_event
+        delete_calendar_event,
+        add_calendar_events,
+        update_calendar_events,
+        delete_calendar_events,
+        find_free_slots
     ]
\ No newline at end of file
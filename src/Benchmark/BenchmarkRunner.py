@@ -0,0 +1,331 @@
+"""
+Offline benchmark for the calendar agent.
+
+Replays scripted multi-user conversations against a scripted chat model and
+an in-memory calendar, both with configurable latency, and reports per-turn
+latency percentiles, throughput, memory growth and token counts.
+
+    python -m src.Benchmark.BenchmarkRunner --users 20 --mode async
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Required settings without a default, none of them is used offline
+OFFLINE_SETTINGS = {
+    "OLLAMA_MODEL_NAME": "scripted",
+    "OLLAMA_URL": "http://localhost:11434",
+    "TEMPERATURE": "0",
+    "TELEGRAM_TOKEN": "offline",
+    "TELEGRAM_CHAT_ID": "0",
+    "GOOGLE_CALENDAR_CREDENTIALS_PATH": "offline",
+    "GOOGLE_CALENDAR_TOKEN_PATH": "offline",
+}
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile, 0 for an empty list"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, round(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+@dataclass
+class BenchmarkReport:
+    mode: str
+    users: int
+    turns: int = 0
+    errors: int = 0
+    wall_seconds: float = 0.0
+    latencies: List[float] = field(default_factory=list, repr=False)
+    memory_growth_bytes: Optional[int] = None
+    memory_peak_bytes: Optional[int] = None
+    tokens: Dict[str, int] = field(default_factory=dict)
+    fast_path: Dict[str, float] = field(default_factory=dict)
+    calendar: Dict[str, object] = field(default_factory=dict)
+
+    @property
+    def turns_per_second(self) -> float:
+        return self.turns / self.wall_seconds if self.wall_seconds else 0.0
+
+    def summary(self) -> dict:
+        result = asdict(self)
+        del result["latencies"]
+        result["turns_per_second"] = round(self.turns_per_second, 2)
+        for pct in (50, 95, 99):
+            result[f"p{pct}_ms"] = round(percentile(self.latencies, pct) * 1000, 1)
+        result["wall_seconds"] = round(self.wall_seconds, 3)
+        return result
+
+    def format(self) -> str:
+        summary = self.summary()
+        lines = [
+            f"mode={self.mode} users={self.users} turns={self.turns} errors={self.errors}",
+            f"latency p50={summary['p50_ms']}ms p95={summary['p95_ms']}ms p99={summary['p99_ms']}ms",
+            f"throughput {summary['turns_per_second']} turns/s over {summary['wall_seconds']}s",
+        ]
+        if self.memory_growth_bytes is not None:
+            lines.append(f"memory growth {self.memory_growth_bytes / 1024:.1f} KiB, peak {self.memory_peak_bytes / 1024:.1f} KiB")
+        lines.append(f"tokens {self.tokens}")
+        if self.fast_path:
+            lines.append(f"fast path {self.fast_path}")
+        lines.append(f"calendar {self.calendar}")
+        return "\n".join(lines)
+
+
+class BenchmarkRunner:
+    """
+    Builds a CalendarAgent on the offline backends and drives one scripted
+    conversation per user, all users at once. Modes:
+
+    - "async":    CalendarAgent.achat on one event loop
+    - "stream":   CalendarAgent.astream on one event loop
+    - "sync":     CalendarAgent.chat, one thread per user
+    - "telegram": TelegramCalendarBot.handle_message with fake updates, so
+                  the turn dispatcher and reply editing are included
+    - "webhook":  updates posted over HTTP to the bot's webhook server, replies
+                  sent over HTTP to a local fake Bot API
+    - "google":   CalendarAgent.achat with AsyncGoogleCalendar talking HTTP to
+                  a local fake Calendar API, optionally answering some
+                  requests with 429 or 503
+    """
+
+    MODES = ("async", "stream", "sync", "telegram", "webhook", "google")
+
+    def __init__(self, users: int = 10, llm_delay_seconds: float = 0.05, calendar_latency_seconds: float = 0.02, calendar_jitter_seconds: float = 0.0, telegram_latency_seconds: float = 0.0, fast_path: bool = True, trace_memory: bool = True, rate_limit_every: int = 0, unavailable_every: int = 0):
+        self.users = users
+        self.llm_delay_seconds = llm_delay_seconds
+        self.calendar_latency_seconds = calendar_latency_seconds
+        self.calendar_jitter_seconds = calendar_jitter_seconds
+        self.telegram_latency_seconds = telegram_latency_seconds
+        self.fast_path = fast_path
+        self.trace_memory = trace_memory
+        self.rate_limit_every = rate_limit_every
+        self.unavailable_every = unavailable_every
+
+    def _build(self, mode: str):
+        # Imported here so OFFLINE_SETTINGS can be applied first
+        from ..Agent.CalendarAgent import CalendarAgent
+        from .FakeOllama import FakeOllamaLLM
+        from .InMemoryCalendar import InMemoryCalendar
+        from .Scenarios import build_script, default_conversation, seed_events
+
+        start = datetime.now()
+        self.conversations = [default_conversation(user, start) for user in range(self.users)]
+        self.calendar_api = None
+        if mode == "google":
+            self.calendar = self._build_google(seed_events(self.users, start))
+        else:
+            self.calendar = InMemoryCalendar(
+                seed_events(self.users, start),
+                latency_seconds=self.calendar_latency_seconds,
+                jitter_seconds=self.calendar_jitter_seconds
+            )
+        llm = FakeOllamaLLM(build_script(self.conversations), delay_seconds=self.llm_delay_seconds)
+        self.agent = CalendarAgent(llm=llm, calendar_provider=self.calendar, verbose=False, fast_llm=llm)
+        if not self.fast_path:
+            self.agent.router = None
+        self.bot = None
+        self.telegram_api = None
+        if mode == "webhook":
+            from ..helpers.Config import reload_settings
+            from .FakeTelegram import FakeTelegramApi
+            self.telegram_api = FakeTelegramApi(self.telegram_latency_seconds)
+            os.environ.update({
+                "TELEGRAM_API_URL": self.telegram_api.base_url,
+                "TELEGRAM_WEBHOOK_URL": "",
+                "TELEGRAM_WEBHOOK_LISTEN": "127.0.0.1",
+                "TELEGRAM_WEBHOOK_PORT": "0",
+                "TELEGRAM_WEBHOOK_SECRET": "",
+            })
+            reload_settings()
+        if mode in ("telegram", "webhook"):
+            from ..TelegramInterface.TelegramCalendarBot import TelegramCalendarBot
+            self.bot = TelegramCalendarBot(calendar_agent=self.agent)
+        if mode == "webhook":
+            # One message per turn, so the end of a turn is visible to the fake API
+            self.bot.streaming = False
+
+    def _build_google(self, events):
+        from google.oauth2.credentials import Credentials
+        from ..calenderProvider.AsyncGoogleCalendar import AsyncGoogleCalendar
+        from ..helpers.Config import reload_settings
+        from .FakeGoogleCalendar import FakeCalendarApi
+
+        self.calendar_api = FakeCalendarApi(
+            self.calendar_latency_seconds,
+            rate_limit_every=self.rate_limit_every,
+            unavailable_every=self.unavailable_every
+        )
+        self.calendar_api.seed(events)
+        os.environ["GOOGLE_CALENDAR_API_URL"] = self.calendar_api.base_url
+        reload_settings()
+        calendar = AsyncGoogleCalendar(calendar_id="primary", http2=False)
+        # A token without expiry is always valid, nothing is read from disk or refreshed
+        calendar.credentials = Credentials(token="offline")
+        return calendar
+
+    async def _run_user_async(self, conversation, report: BenchmarkReport, turn):
+        for scripted in conversation.turns:
+            start = time.perf_counter()
+            output = await turn(scripted.message, conversation.user_id)
+            report.latencies.append(time.perf_counter() - start)
+            report.errors += output.startswith("❌")
+
+    async def _stream_turn(self, message: str, session_id: int) -> str:
+        output = ""
+        async for event in self.agent.astream(message, session_id):
+            if event.kind == "final":
+                output = event.text
+        return output
+
+    async def _run_webhook(self, report: BenchmarkReport):
+        import httpx
+
+        await self.telegram_api.start()
+        webhook = await self.bot.start_webhook()
+        try:
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{webhook.bound_port}") as client:
+                async def turn(message: str, chat_id: int) -> str:
+                    expected = len(self.telegram_api.sent[chat_id]) + 1
+                    while True:
+                        response = await client.post(webhook.path, json=self.telegram_api.make_update(chat_id, message))
+                        if response.status_code != 503:
+                            break
+                        # Backpressure, Telegram would deliver the update again later
+                        await asyncio.sleep(float(response.headers.get("retry-after", 1)))
+                    return await self.telegram_api.wait_for_message(chat_id, expected)
+
+                await asyncio.gather(*(self._run_user_async(c, report, turn) for c in self.conversations))
+        finally:
+            await self.bot.stop_webhook()
+            await self.telegram_api.stop()
+
+    async def _run_google(self, report: BenchmarkReport):
+        await self.calendar_api.start()
+        try:
+            await asyncio.gather(*(self._run_user_async(c, report, self.agent.achat) for c in self.conversations))
+        finally:
+            await self.calendar.close()
+            await self.calendar_api.stop()
+
+    async def _run_async(self, report: BenchmarkReport, mode: str):
+        if mode == "webhook":
+            return await self._run_webhook(report)
+        if mode == "google":
+            return await self._run_google(report)
+        if mode == "telegram":
+            from .FakeTelegram import final_reply, make_update
+
+            async def turn(message: str, chat_id: int) -> str:
+                update, context = make_update(chat_id, message, self.telegram_latency_seconds)
+                await self.bot.handle_message(update, context)
+                return final_reply(update.message)
+        elif mode == "stream":
+            turn = self._stream_turn
+        else:
+            turn = self.agent.achat
+
+        await asyncio.gather(*(self._run_user_async(c, report, turn) for c in self.conversations))
+
+    def _run_sync(self, report: BenchmarkReport):
+        def run_user(conversation):
+            for scripted in conversation.turns:
+                start = time.perf_counter()
+                output = self.agent.chat(scripted.message, conversation.user_id)
+                report.latencies.append(time.perf_counter() - start)
+                report.errors += output.startswith("❌")
+
+        with ThreadPoolExecutor(max_workers=self.users) as pool:
+            list(pool.map(run_user, self.conversations))
+
+    def run(self, mode: str = "async") -> BenchmarkReport:
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown mode {mode}, expected one of {', '.join(self.MODES)}")
+        self._build(mode)
+        report = BenchmarkReport(mode=mode, users=self.users)
+
+        gc.collect()
+        if self.trace_memory:
+            tracemalloc.start()
+            baseline = tracemalloc.get_traced_memory()[0]
+
+        start = time.perf_counter()
+        try:
+            if mode == "sync":
+                self._run_sync(report)
+            else:
+                asyncio.run(self._run_async(report, mode))
+        finally:
+            report.wall_seconds = time.perf_counter() - start
+            if self.trace_memory:
+                gc.collect()
+                current, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                report.memory_growth_bytes = current - baseline
+                report.memory_peak_bytes = peak - baseline
+            if self.bot is not None:
+                self.bot.dispatcher.shutdown(wait=False)
+            self.agent.close()
+
+        report.turns = len(report.latencies)
+        report.tokens = self.agent.usage_stats()
+        if self.agent.router is not None:
+            report.fast_path = self.agent.router.stats()
+        if self.calendar_api is not None:
+            report.calendar = {**self.calendar_api.stats(), 'cache': self.calendar.cache_stats(), 'scheduler': self.calendar.scheduler.stats()}
+        else:
+            report.calendar = self.calendar.stats()
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline calendar agent benchmark")
+    parser.add_argument("--mode", choices=BenchmarkRunner.MODES, default="async")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--llm-delay", type=float, default=0.05, help="Seconds per fake LLM call")
+    parser.add_argument("--calendar-latency", type=float, default=0.02, help="Seconds per fake calendar call")
+    parser.add_argument("--calendar-jitter", type=float, default=0.0, help="Extra random seconds per calendar call")
+    parser.add_argument("--telegram-latency", type=float, default=0.0, help="Seconds per fake Telegram send")
+    parser.add_argument("--google-429-every", type=int, default=0, help="google mode: answer every Nth Calendar API request with 429")
+    parser.add_argument("--google-503-every", type=int, default=0, help="google mode: answer every Nth Calendar API request with 503")
+    parser.add_argument("--no-fast-path", action="store_true", help="Send every turn through the LLM")
+    parser.add_argument("--no-trace-memory", action="store_true", help="Skip tracemalloc, it slows the run down")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args()
+
+    # Configured before the bot does, so per-turn logs do not flood the report
+    from ..helpers.Telemetry import configure_logging
+    configure_logging(args.log_level)
+
+    for key, value in OFFLINE_SETTINGS.items():
+        os.environ.setdefault(key, value)
+
+    runner = BenchmarkRunner(
+        users=args.users,
+        llm_delay_seconds=args.llm_delay,
+        calendar_latency_seconds=args.calendar_latency,
+        calendar_jitter_seconds=args.calendar_jitter,
+        telegram_latency_seconds=args.telegram_latency,
+        fast_path=not args.no_fast_path,
+        trace_memory=not args.no_trace_memory,
+        rate_limit_every=args.google_429_every,
+        unavailable_every=args.google_503_every
+    )
+    report = runner.run(args.mode)
+    print(json.dumps(report.summary(), indent=2) if args.json else report.format())
+
+
+if __name__ == '__main__':
+    main()
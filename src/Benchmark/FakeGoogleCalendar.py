@@ -0,0 +1,214 @@
+import asyncio
+import itertools
+import json
+import socket
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import parse_qsl, unquote
+from ..calenderProvider.EventCache import EventCache
+from ..calenderProvider.FreeBusyIndex import busy_from_events
+from ..calenderProvider.GoogleCalendarInterface import CalendarEvent
+from ..TelegramInterface.WebhookServer import read_request, write_response
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, reason: str, message: str = "", headers: Optional[Dict[str, str]] = None):
+        super().__init__(message or reason)
+        self.status = status
+        self.reason = reason
+        self.headers = headers or {}
+
+    def payload(self) -> dict:
+        return {"error": {"code": self.status, "message": str(self), "errors": [{"reason": self.reason}]}}
+
+
+class FakeCalendarApi:
+    """
+    Local stand-in for the Google Calendar v3 REST API over real HTTP, so
+    AsyncGoogleCalendar runs with its own client, retries and incremental
+    sync. Point GOOGLE_CALENDAR_API_URL at `base_url`.
+
+    Supports events list (paging, timeMin/timeMax, q, singleEvents and
+    syncToken), get, insert, update, patch (with If-Match) and delete, plus
+    freeBusy. Every `rate_limit_every`-th request is refused with 429 and
+    every `unavailable_every`-th with 503, both with Retry-After; every call
+    waits `latency_seconds`.
+    """
+
+    def __init__(self, latency_seconds: float = 0.0, rate_limit_every: int = 0, unavailable_every: int = 0, retry_after_seconds: float = 0.05, host: str = "127.0.0.1"):
+        self.latency_seconds = latency_seconds
+        self.rate_limit_every = rate_limit_every
+        self.unavailable_every = unavailable_every
+        self.retry_after_seconds = retry_after_seconds
+        # Bound right away so the address is known before the provider is configured
+        self._socket = socket.create_server((host, 0))
+        self.host = host
+        self.port = self._socket.getsockname()[1]
+        self.calls = Counter()
+        self._requests = itertools.count(1)
+        self._server: Optional[asyncio.AbstractServer] = None
+        # Events are queried through an EventCache, it has the same overlap, search and recurrence rules
+        self._stores: Dict[str, EventCache] = {}
+        # Latest change of every event per calendar as (sequence, item), cancelled items stay as tombstones
+        self._changes: Dict[str, Dict[str, Tuple[int, dict]]] = {}
+        self._sequence = 0
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/calendar/v3"
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._serve, sock=self._socket)
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def seed(self, events: Iterable[CalendarEvent], calendar_id: str = "primary"):
+        for event in events:
+            self._store_event(calendar_id, event.model_dump(by_alias=True, exclude_none=True, mode='json'))
+
+    def stats(self) -> dict:
+        return {
+            'events': sum(1 for changes in self._changes.values() for _, item in changes.values() if item.get('status') != 'cancelled'),
+            'calls': dict(self.calls)
+        }
+
+    def _calendar(self, calendar_id: str) -> EventCache:
+        if calendar_id not in self._stores:
+            self._stores[calendar_id] = EventCache(ttl_seconds=0)
+            self._changes[calendar_id] = {}
+        return self._stores[calendar_id]
+
+    def _record(self, calendar_id: str, item: dict):
+        self._sequence += 1
+        self._changes[calendar_id][item['id']] = (self._sequence, item)
+
+    def _store_event(self, calendar_id: str, body: dict) -> dict:
+        store = self._calendar(calendar_id)
+        item = dict(body, status='confirmed', etag=f'"{uuid.uuid4().hex}"')
+        item.setdefault('id', uuid.uuid4().hex)
+        item.setdefault('iCalUID', f"{item['id']}@fake")
+        item['htmlLink'] = f"{self.base_url}/event?eid={item['id']}"
+        store.put(item)
+        self._record(calendar_id, item)
+        return item
+
+    def _require(self, calendar_id: str, event_id: str) -> dict:
+        item = self._calendar(calendar_id).get(event_id)
+        if item is None:
+            raise ApiError(404, "notFound", "Not Found")
+        return item
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request = await read_request(reader, 1 << 20)
+                if request is None:
+                    return
+                await asyncio.sleep(self.latency_seconds)
+                try:
+                    status, payload = self._handle(request)
+                    headers = None
+                except ApiError as error:
+                    status, payload, headers = error.status, error.payload(), error.headers
+                await write_response(writer, status, payload, headers=headers, keep_alive=request.keep_alive)
+                if not request.keep_alive:
+                    return
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def _handle(self, request) -> Tuple[int, Optional[dict]]:
+        count = next(self._requests)
+        retry_after = {'Retry-After': str(self.retry_after_seconds)}
+        if self.rate_limit_every and count % self.rate_limit_every == 0:
+            self.calls['throttled'] += 1
+            raise ApiError(429, "rateLimitExceeded", "Rate Limit Exceeded", retry_after)
+        if self.unavailable_every and count % self.unavailable_every == 0:
+            self.calls['unavailable'] += 1
+            raise ApiError(503, "backendError", "Backend Error", retry_after)
+
+        parts = [unquote(part) for part in request.path.removeprefix("/calendar/v3").strip("/").split("/")]
+        params = dict(parse_qsl(request.query))
+        body = json.loads(request.body) if request.body else {}
+
+        if parts == ["freeBusy"] and request.method == "POST":
+            self.calls['freebusy'] += 1
+            return 200, self._freebusy(body)
+        if len(parts) not in (3, 4) or parts[0] != "calendars" or parts[2] != "events":
+            raise ApiError(404, "notFound", "Not Found")
+
+        calendar_id = parts[1]
+        self._calendar(calendar_id)
+        if len(parts) == 3:
+            if request.method == "GET":
+                self.calls['list'] += 1
+                return 200, self._list(calendar_id, params)
+            if request.method == "POST":
+                self.calls['insert'] += 1
+                return 200, self._store_event(calendar_id, body)
+            raise ApiError(405, "methodNotAllowed")
+
+        event_id = parts[3]
+        current = self._require(calendar_id, event_id)
+        if request.method == "GET":
+            self.calls['get'] += 1
+            return 200, current
+        if request.method in ("PUT", "PATCH"):
+            self.calls['update' if request.method == "PUT" else 'patch'] += 1
+            expected = request.headers.get("if-match")
+            if expected and expected != current.get('etag'):
+                raise ApiError(412, "conditionNotMet", "Precondition Failed")
+            merged = dict(current, **body) if request.method == "PATCH" else body
+            return 200, self._store_event(calendar_id, dict(merged, id=event_id))
+        if request.method == "DELETE":
+            self.calls['delete'] += 1
+            self._calendar(calendar_id).remove(event_id)
+            self._record(calendar_id, {'id': event_id, 'status': 'cancelled'})
+            return 204, None
+        raise ApiError(405, "methodNotAllowed")
+
+    def _list(self, calendar_id: str, params: dict) -> dict:
+        token = params.get('syncToken')
+        if token:
+            try:
+                since = int(token)
+            except ValueError:
+                raise ApiError(410, "fullSyncRequired", "Sync token is no longer valid")
+            items = [item for sequence, item in self._changes[calendar_id].values() if sequence > since]
+        elif params.get('singleEvents') == 'true':
+            items = self._calendar(calendar_id).query(
+                datetime.fromisoformat(params['timeMin']) if 'timeMin' in params else None,
+                datetime.fromisoformat(params['timeMax']) if 'timeMax' in params else None,
+                params.get('q')
+            )
+        else:
+            items = [item for _, item in self._changes[calendar_id].values() if item.get('status') != 'cancelled']
+
+        offset = int(params.get('pageToken', 0))
+        page_size = int(params.get('maxResults', 250))
+        page = {'kind': 'calendar#events', 'timeZone': 'UTC', 'items': items[offset:offset + page_size]}
+        if offset + page_size < len(items):
+            page['nextPageToken'] = str(offset + page_size)
+        else:
+            page['nextSyncToken'] = str(self._sequence)
+        return page
+
+    def _freebusy(self, body: dict) -> dict:
+        time_min = datetime.fromisoformat(body['timeMin'])
+        time_max = datetime.fromisoformat(body['timeMax'])
+        calendars = {}
+        for entry in body.get('items', []):
+            store = self._stores.get(entry['id'])
+            if store is None:
+                calendars[entry['id']] = {'errors': [{'domain': 'global', 'reason': 'notFound'}]}
+                continue
+            busy = busy_from_events(store.query(time_min, time_max))
+            calendars[entry['id']] = {'busy': [{'start': start.isoformat(), 'end': end.isoformat()} for start, end in busy]}
+        return {'kind': 'calendar#freeBusy', 'calendars': calendars}
@@ -0,0 +1,82 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Union
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from ..Agent.HistoryCompactor import estimate_tokens
+from ..LLMProvider.OllamaProvider import OllamaLLM
+
+# One model response: a list of tool calls ({"name": ..., "args": {...}}) or the final answer text
+ScriptStep = Union[List[Dict[str, Any]], str]
+
+
+class ScriptedChatModel(BaseChatModel):
+    """
+    Chat model that plays back a script instead of running a model.
+
+    The script maps a user message to the responses the model gives for that
+    turn, in order. The position in the turn is derived from the messages
+    themselves (tool calls made since the user message), so any number of
+    conversations can share one model. Each call sleeps `delay_seconds` and
+    reports Ollama-style token counts estimated from the text.
+    """
+
+    script: Dict[str, List[ScriptStep]] = {}
+    delay_seconds: float = 0.0
+    default_reply: str = "Okay."
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _next_step(self, messages: List[BaseMessage]) -> ScriptStep:
+        last_human = max((i for i, m in enumerate(messages) if isinstance(m, HumanMessage)), default=None)
+        if last_human is None:
+            return self.default_reply
+        # The agent prompt appends the date context after a blank line
+        user_message = messages[last_human].content.split("\n\n", 1)[0]
+        steps = self.script.get(user_message)
+        if not steps:
+            return self.default_reply
+        position = sum(1 for m in messages[last_human + 1:] if isinstance(m, AIMessage) and m.tool_calls)
+        return steps[min(position, len(steps) - 1)]
+
+    def _respond(self, messages: List[BaseMessage]) -> ChatResult:
+        step = self._next_step(messages)
+        prompt_tokens = sum(estimate_tokens(str(m.content)) for m in messages)
+        metadata = {
+            "prompt_eval_count": prompt_tokens,
+            "prompt_eval_duration": int(self.delay_seconds * 1e9),
+        }
+        if isinstance(step, str):
+            message = AIMessage(content=step, response_metadata={**metadata, "eval_count": estimate_tokens(step)})
+        else:
+            tool_calls = [
+                {"name": call["name"], "args": call["args"], "id": f"call_{len(messages)}_{index}"}
+                for index, call in enumerate(step)
+            ]
+            message = AIMessage(content="", tool_calls=tool_calls, response_metadata={**metadata, "eval_count": estimate_tokens(str(step))})
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        if self.delay_seconds:
+            time.sleep(self.delay_seconds)
+        return self._respond(messages)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        if self.delay_seconds:
+            await asyncio.sleep(self.delay_seconds)
+        return self._respond(messages)
+
+
+class FakeOllamaLLM(OllamaLLM):
+    """OllamaLLM backed by a ScriptedChatModel, no Ollama server needed"""
+
+    def __init__(self, script: Dict[str, List[ScriptStep]], delay_seconds: float = 0.0, model: str = "scripted"):
+        self.model = model
+        self.reasoning = False
+        self.llm = ScriptedChatModel(script=script, delay_seconds=delay_seconds)
@@ -0,0 +1,155 @@
+import asyncio
+import itertools
+import json
+import socket
+import time
+from collections import Counter, defaultdict
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl
+from ..TelegramInterface.WebhookServer import read_request, write_response
+
+_message_ids = itertools.count(1)
+
+
+class FakeMessage:
+    """The parts of telegram.Message the bot uses, every send or edit waits `latency_seconds`"""
+
+    def __init__(self, chat_id: int, text: str = "", latency_seconds: float = 0.0):
+        self.message_id = next(_message_ids)
+        self.chat_id = chat_id
+        self.text = text
+        self.latency_seconds = latency_seconds
+        self.replies = []
+        self.edits = 0
+
+    async def reply_text(self, text: str, **kwargs) -> "FakeMessage":
+        await asyncio.sleep(self.latency_seconds)
+        reply = FakeMessage(self.chat_id, text, self.latency_seconds)
+        self.replies.append(reply)
+        return reply
+
+    async def edit_text(self, text: str, **kwargs) -> "FakeMessage":
+        await asyncio.sleep(self.latency_seconds)
+        self.text = text
+        self.edits += 1
+        return self
+
+
+class FakeBot:
+    def __init__(self, latency_seconds: float = 0.0):
+        self.latency_seconds = latency_seconds
+
+    async def send_chat_action(self, chat_id: int, action, **kwargs) -> bool:
+        await asyncio.sleep(self.latency_seconds)
+        return True
+
+
+def make_update(chat_id: int, text: str, latency_seconds: float = 0.0):
+    """An object shaped like telegram.Update for a text message, plus a matching context"""
+    message = FakeMessage(chat_id, text, latency_seconds)
+    update = SimpleNamespace(message=message, effective_chat=SimpleNamespace(id=chat_id))
+    context = SimpleNamespace(bot=FakeBot(latency_seconds))
+    return update, context
+
+
+def final_reply(message: FakeMessage) -> str:
+    """Text the user ends up seeing for a message, after all edits"""
+    return "".join(reply.text for reply in message.replies)
+
+
+class FakeTelegramApi:
+    """
+    Local stand-in for the Telegram Bot API over real HTTP, so the bot's own
+    HTTP client and the webhook server are part of a run. Point
+    TELEGRAM_API_URL at `base_url`. Messages the bot sends are recorded per
+    chat; every call waits `latency_seconds`.
+    """
+
+    def __init__(self, latency_seconds: float = 0.0, host: str = "127.0.0.1"):
+        self.latency_seconds = latency_seconds
+        # Bound right away so the address is known before the bot is configured
+        self._socket = socket.create_server((host, 0))
+        self.host = host
+        self.port = self._socket.getsockname()[1]
+        self.sent: Dict[int, List[str]] = defaultdict(list)
+        self.calls = Counter()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._changed: Optional[asyncio.Condition] = None
+        self._update_ids = itertools.count(1)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/bot"
+
+    async def start(self):
+        self._changed = asyncio.Condition()
+        self._server = await asyncio.start_server(self._serve, sock=self._socket)
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def make_update(self, chat_id: int, text: str) -> dict:
+        """The JSON Telegram would post to the webhook for a text message"""
+        user = {"id": chat_id, "is_bot": False, "first_name": f"user{chat_id}"}
+        return {
+            "update_id": next(self._update_ids),
+            "message": {
+                "message_id": next(_message_ids),
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "from": user,
+                "text": text
+            }
+        }
+
+    async def wait_for_message(self, chat_id: int, count: int) -> str:
+        """Wait until the bot has sent `count` messages to the chat and return the last one"""
+        async with self._changed:
+            await self._changed.wait_for(lambda: len(self.sent[chat_id]) >= count)
+        return self.sent[chat_id][count - 1]
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request = await read_request(reader, 1 << 20)
+                if request is None:
+                    return
+                method = request.path.rsplit("/", 1)[-1]
+                if request.headers.get("content-type", "").startswith("application/json"):
+                    params = json.loads(request.body or b"{}")
+                else:
+                    params = dict(parse_qsl(request.body.decode("utf-8")))
+                await asyncio.sleep(self.latency_seconds)
+                result = await self._call(method, params)
+                await write_response(writer, 200, {"ok": True, "result": result}, keep_alive=request.keep_alive)
+                if not request.keep_alive:
+                    return
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _call(self, method: str, params: dict):
+        self.calls[method] += 1
+        if method == "getMe":
+            return {"id": 1, "is_bot": True, "first_name": "Calendar", "username": "calendar_bot"}
+        if method in ("sendMessage", "editMessageText"):
+            chat_id = int(params["chat_id"])
+            if method == "sendMessage":
+                self.sent[chat_id].append(params["text"])
+            else:
+                self.sent[chat_id][-1] = params["text"]
+            async with self._changed:
+                self._changed.notify_all()
+            return {
+                "message_id": int(params.get("message_id") or next(_message_ids)),
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "text": params["text"]
+            }
+        # sendChatAction, setWebhook, deleteWebhook, ...
+        return True
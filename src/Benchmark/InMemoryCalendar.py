@@ -0,0 +1,78 @@
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Hashable, Iterable, List, Optional
+from ..calenderProvider.GoogleCalendarInterface import CalendarEvent, EventFilters, GoogleCalendarInterface
+from ..calenderProvider.EventCache import EventCache
+
+
+class InMemoryCalendar(GoogleCalendarInterface):
+    """
+    Offline stand-in for GoogleCalendar. Events live in an EventCache, so
+    listing has the same overlap and search semantics as events().list, and
+    every call sleeps for `latency_seconds` (plus up to `jitter_seconds`) to
+    model the round trip to Google.
+    """
+
+    def __init__(self, events: Iterable[CalendarEvent] = (), latency_seconds: float = 0.0, jitter_seconds: float = 0.0):
+        self.latency_seconds = latency_seconds
+        self.jitter_seconds = jitter_seconds
+        self.store = EventCache(ttl_seconds=0)
+        self.calls: Counter = Counter()
+        self._lock = threading.Lock()
+        self.is_authenticated = True
+        for event in events:
+            self._put(event)
+
+    def _round_trip(self, operation: str):
+        with self._lock:
+            self.calls[operation] += 1
+        delay = self.latency_seconds + random.uniform(0, self.jitter_seconds)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _put(self, event: CalendarEvent) -> CalendarEvent:
+        stored = event.model_copy(update={'id': event.id or uuid.uuid4().hex, 'etag': uuid.uuid4().hex})
+        self.store.put(stored.model_dump(by_alias=True, exclude_none=True, mode='json'))
+        return stored
+
+    def _require(self, event_id: str) -> dict:
+        item = self.store.get(event_id)
+        if item is None:
+            raise Exception(f"Event not found: {event_id}")
+        return item
+
+    def authenticate(self) -> bool:
+        return True
+
+    def add_event(self, event: CalendarEvent) -> CalendarEvent:
+        self._round_trip('insert')
+        return self._put(event)
+
+    def get_event(self, event_id: str) -> CalendarEvent:
+        self._round_trip('get')
+        return CalendarEvent.model_validate(self._require(event_id))
+
+    def list_events(self, filters: EventFilters) -> List[CalendarEvent]:
+        self._round_trip('list')
+        items = self.store.query(filters.start_date, filters.end_date, filters.search_query, filters.max_results)
+        return [CalendarEvent.model_validate(item) for item in items]
+
+    def update_event(self, event_id: str, event: CalendarEvent) -> CalendarEvent:
+        self._round_trip('update')
+        self._require(event_id)
+        return self._put(event.model_copy(update={'id': event_id}))
+
+    def delete_event(self, event_id: str) -> bool:
+        self._round_trip('delete')
+        self._require(event_id)
+        self.store.remove(event_id)
+        return True
+
+    def calendar_version(self) -> Optional[Hashable]:
+        return self.store.version
+
+    def stats(self) -> dict:
+        return {'events': len(self.store), 'calls': dict(self.calls)}
@@ -0,0 +1,90 @@
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List
+from ..calenderProvider.GoogleCalendarInterface import CalendarEvent, EventDateTime
+from .FakeOllama import ScriptStep
+
+
+@dataclass
+class ScriptedTurn:
+    """A user message and the model responses the fake model gives for it"""
+    message: str
+    steps: List[ScriptStep] = field(default_factory=list)
+
+
+@dataclass
+class Conversation:
+    user_id: int
+    turns: List[ScriptedTurn]
+
+
+def _at(day: datetime, hour: int) -> str:
+    return day.replace(hour=hour, minute=0, second=0, microsecond=0).isoformat()
+
+
+def seed_events(users: int, start: datetime) -> List[CalendarEvent]:
+    """Three events per user with predictable ids, evt-<user>-<n>"""
+    events = []
+    for user in range(users):
+        for n in range(1, 4):
+            day = start + timedelta(days=n)
+            events.append(CalendarEvent(
+                id=f"evt-{user}-{n}",
+                title=f"Meeting {n} of user {user}",
+                start_time=EventDateTime(date_time=day.replace(hour=9 + n, minute=0, second=0, microsecond=0)),
+                end_time=EventDateTime(date_time=day.replace(hour=10 + n, minute=0, second=0, microsecond=0))
+            ))
+    return events
+
+
+def default_conversation(user: int, start: datetime) -> Conversation:
+    """
+    A typical session: a read the fast path can answer, a create, a lookup
+    with two tool calls in one step, an update and a delete. Messages carry
+    the user id so every user has its own script entries and events.
+    """
+    friday = start + timedelta(days=(4 - start.weekday()) % 7 or 7)
+    return Conversation(user_id=user, turns=[
+        ScriptedTurn(
+            message=f"What's on my calendar this week? (user {user})",
+            steps=[
+                [{"name": "list_calendar_events", "args": {"start_date": _at(start, 0), "end_date": _at(start + timedelta(days=7), 0)}}],
+                "You have three meetings this week."
+            ]
+        ),
+        ScriptedTurn(
+            message=f"Add a dentist appointment on Friday at 3pm for user {user}",
+            steps=[
+                [{"name": "add_calendar_event", "args": {"title": f"Dentist {user}", "start_datetime": _at(friday, 15), "end_datetime": _at(friday, 16)}}],
+                "Done, the dentist appointment is on your calendar for Friday at 3 PM."
+            ]
+        ),
+        ScriptedTurn(
+            message=f"Tell me about evt-{user}-1 and evt-{user}-2",
+            steps=[
+                [
+                    {"name": "get_calendar_event", "args": {"event_id": f"evt-{user}-1"}},
+                    {"name": "get_calendar_event", "args": {"event_id": f"evt-{user}-2"}}
+                ],
+                "Both are one hour meetings, the first one is tomorrow."
+            ]
+        ),
+        ScriptedTurn(
+            message=f"Move evt-{user}-1 to 5pm",
+            steps=[
+                [{"name": "update_calendar_event", "args": {"event_id": f"evt-{user}-1", "start_datetime": _at(start + timedelta(days=1), 17), "end_datetime": _at(start + timedelta(days=1), 18)}}],
+                "Moved it to 5 PM."
+            ]
+        ),
+        ScriptedTurn(
+            message=f"Cancel evt-{user}-3",
+            steps=[
+                [{"name": "delete_calendar_event", "args": {"event_id": f"evt-{user}-3"}}],
+                "The meeting is cancelled."
+            ]
+        ),
+    ])
+
+
+def build_script(conversations: List[Conversation]) -> Dict[str, List[ScriptStep]]:
+    return {turn.message: turn.steps for conversation in conversations for turn in conversation.turns}
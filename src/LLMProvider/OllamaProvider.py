@@ -1,34 +1,103 @@
-
-
-from typing import List, Dict, Any, Union
-from langchain_ollama import ChatOllama
+import logging
+from typing import List, Dict, Any, Optional, Union
+from langchain_core.callbacks import BaseCallbackHandler
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, BaseMessage
+from langchain_core.outputs import LLMResult
 from ..helpers.Config import get_settings
 
+logger = logging.getLogger(__name__)
+
+
+class OllamaUsageCallback(BaseCallbackHandler):
+    """
+    Collects the token counts Ollama reports for every LLM call of a turn.
+    prompt_eval_count only covers tokens Ollama actually evaluated, so a prefix
+    served from its KV cache shows up as a lower count.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.prompt_eval_tokens = 0
+        self.completion_tokens = 0
+        self.prompt_eval_seconds = 0.0
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        self.calls += 1
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                metadata = getattr(message, "response_metadata", None) or generation.generation_info or {}
+                self.prompt_eval_tokens += metadata.get("prompt_eval_count") or 0
+                self.completion_tokens += metadata.get("eval_count") or 0
+                # Ollama reports durations in nanoseconds
+                self.prompt_eval_seconds += (metadata.get("prompt_eval_duration") or 0) / 1e9
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "llm_calls": self.calls,
+            "prompt_eval_tokens": self.prompt_eval_tokens,
+            "completion_tokens": self.completion_tokens,
+            "prompt_eval_seconds": round(self.prompt_eval_seconds, 3)
+        }
+
 
 class OllamaLLM:
 
+    # Per-call options that can be overridden without building a new client
+    OPTION_FIELDS = ("num_ctx", "num_predict", "keep_alive", "temperature", "reasoning")
 
-    def __init__(self, model: str = None, base_url: str = None, temperature: float = None):
+    def __init__(self, model: str = None, base_url: str = None, temperature: float = None, reasoning: Optional[bool] = None, num_ctx: Optional[int] = None, num_predict: Optional[int] = None, keep_alive: Optional[str] = None):
         
         settings = get_settings()
         
-        self.model = settings.OLLAMA_MODEL_NAME
-        self.base_url = settings.OLLAMA_URL
-        self.temperature = settings.TEMPERATURE
+        self.model = model or settings.OLLAMA_MODEL_NAME
+        self.base_url = base_url or settings.OLLAMA_URL
+        self.temperature = settings.TEMPERATURE if temperature is None else temperature
+        self.reasoning = settings.OLLAMA_REASONING if reasoning is None else reasoning
+        self.num_ctx = num_ctx or settings.OLLAMA_NUM_CTX
+        self.num_predict = num_predict or settings.OLLAMA_NUM_PREDICT
+        # Keeps the model loaded in Ollama between messages instead of reloading it
+        self.keep_alive = keep_alive or settings.OLLAMA_KEEP_ALIVE
         
+        # Imported here, the Ollama client is only needed once a model is built
+        from langchain_ollama import ChatOllama
         self.llm = ChatOllama(
             model=self.model,
             ollama_url=self.base_url,
             temperature=self.temperature,
-            reasoning=True
+            reasoning=self.reasoning,
+            num_ctx=self.num_ctx,
+            num_predict=self.num_predict,
+            keep_alive=self.keep_alive
         )
 
-        print(f"Model ready: {self.model}")
+        logger.info("Model ready: %s (reasoning=%s)", self.model, self.reasoning)
 
-    def get_llm(self):
-        
-        return self.llm
+    @classmethod
+    def fast(cls) -> Optional["OllamaLLM"]:
+        """
+        The small model tier used for routing, summaries and simple tool calls.
+        Returns None when no fast model is configured.
+        """
+        settings = get_settings()
+        if not settings.OLLAMA_FAST_MODEL_NAME:
+            return None
+        return cls(
+            model=settings.OLLAMA_FAST_MODEL_NAME,
+            reasoning=settings.OLLAMA_FAST_REASONING
+        )
+
+    def get_llm(self, **overrides):
+        """
+        Return the chat model, or a copy with some of OPTION_FIELDS overridden
+        (e.g. num_ctx=4096, keep_alive="1h"). Copies share the same client.
+        """
+        if not overrides:
+            return self.llm
+        unknown = set(overrides) - set(self.OPTION_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown option(s): {', '.join(sorted(unknown))}")
+        return self.llm.model_copy(update=overrides)
 
     def _prepare_messages(self, messages: Union[List[Dict[str, str]], List[BaseMessage]]) -> List[BaseMessage]:
 
@@ -51,20 +120,20 @@ class OllamaLLM:
         
         return lc_messages
 
-    def chat(self, messages: Union[List[Dict[str, str]], List[BaseMessage]]) -> str:
+    def chat(self, messages: Union[List[Dict[str, str]], List[BaseMessage]], **overrides) -> str:
         
         try:
             prepared_messages = self._prepare_messages(messages)
-            response = self.llm.invoke(prepared_messages)
+            response = self.get_llm(**overrides).invoke(prepared_messages)
             return response.content
         except Exception as e:
             raise Exception(f"Chat failed: {str(e)}")
 
-    def stream(self, messages: Union[List[Dict[str, str]], List[BaseMessage]]):
+    def stream(self, messages: Union[List[Dict[str, str]], List[BaseMessage]], **overrides):
         
         try:
             prepared_messages = self._prepare_messages(messages)
-            for chunk in self.llm.stream(prepared_messages):
+            for chunk in self.get_llm(**overrides).stream(prepared_messages):
                 yield chunk.content
         except Exception as e:
             raise Exception(f"Stream failed: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import time
+from datetime import timedelta
+from typing import Optional
+from telegram import Bot, Message
+from telegram.constants import ChatAction, MessageLimit
+from telegram.error import BadRequest, RetryAfter, TelegramError
+from ..helpers.Telemetry import TELEGRAM_SECONDS, span
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressiveReply:
+    """
+    A single bot message that is edited as the answer grows.
+
+    Edits are throttled to one per `min_interval` seconds because Telegram
+    rate limits edits per chat. A failed edit is skipped while the answer is
+    still growing. The final edit waits and tries again when rate limited,
+    and when it still fails the answer is sent as a new message. A typing
+    indicator is kept alive until `finish` or `stop_typing` is called.
+    """
+
+    TYPING_REFRESH_SECONDS = 4.0
+    # Rate limited attempts at the final edit before giving up
+    FINAL_EDIT_ATTEMPTS = 3
+
+    def __init__(self, bot: Bot, reply_to: Message, min_interval: float = 1.0):
+        self.bot = bot
+        self.reply_to = reply_to
+        self.chat_id = reply_to.chat_id
+        self.min_interval = min_interval
+        self.message: Optional[Message] = None
+        self._sent_text = ""
+        self._last_edit = 0.0
+        self._typing_task: Optional[asyncio.Task] = None
+
+    async def _keep_typing(self):
+        while True:
+            try:
+                await self.bot.send_chat_action(self.chat_id, ChatAction.TYPING)
+            except Exception:
+                pass
+            await asyncio.sleep(self.TYPING_REFRESH_SECONDS)
+
+    async def start(self, placeholder: str = "…"):
+        self._typing_task = asyncio.create_task(self._keep_typing())
+        with span("telegram_send", TELEGRAM_SECONDS, operation="reply"):
+            self.message = await self.reply_to.reply_text(placeholder)
+        self._sent_text = placeholder
+        self._last_edit = time.monotonic()
+
+    def stop_typing(self):
+        if self._typing_task is not None:
+            self._typing_task.cancel()
+            self._typing_task = None
+
+    async def _edit(self, text: str, attempts: int = 1) -> bool:
+        """Show `text` in the message, False when rate limited on every attempt"""
+        text = text[:MessageLimit.MAX_TEXT_LENGTH]
+        if not text.strip() or text == self._sent_text:
+            return True
+        for attempt in range(1, attempts + 1):
+            with span("telegram_send", TELEGRAM_SECONDS, operation="edit") as labels:
+                try:
+                    await self.message.edit_text(text)
+                    break
+                except RetryAfter as e:
+                    labels["status"] = "rate_limited"
+                    delay = e.retry_after
+                    # An int today, a timedelta once PTB_TIMEDELTA becomes the default
+                    if isinstance(delay, timedelta):
+                        delay = delay.total_seconds()
+                    self._last_edit = time.monotonic() + delay
+                    if attempt == attempts:
+                        # Skip this edit, a later update or finish() will catch up
+                        return False
+                except BadRequest as e:
+                    if "not modified" not in str(e).lower():
+                        raise
+                    break
+            await asyncio.sleep(delay)
+        self._sent_text = text
+        self._last_edit = time.monotonic()
+        return True
+
+    async def update(self, text: str):
+        if time.monotonic() - self._last_edit < self.min_interval:
+            return
+        try:
+            await self._edit(text)
+        except TelegramError as e:
+            logger.debug("Skipping a progress edit: %s", e)
+
+    async def finish(self, text: str):
+        self.stop_typing()
+
+        limit = MessageLimit.MAX_TEXT_LENGTH
+        head, rest = text[:limit], text[limit:]
+        wait = self._last_edit - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        # The final answer must not be lost to a rate limit or a failed edit
+        try:
+            shown = await self._edit(head, attempts=self.FINAL_EDIT_ATTEMPTS)
+        except TelegramError as e:
+            logger.warning("Final edit failed, sending the answer as a new message: %s", e)
+            shown = False
+        if not shown:
+            with span("telegram_send", TELEGRAM_SECONDS, operation="reply"):
+                await self.reply_to.reply_text(head)
+        while rest:
+            with span("telegram_send", TELEGRAM_SECONDS, operation="reply"):
+                await self.reply_to.reply_text(rest[:limit])
+            rest = rest[limit:]
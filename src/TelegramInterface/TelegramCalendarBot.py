@@ -1,28 +1,257 @@
+import logging
 import asyncio
+from typing import TYPE_CHECKING, Optional
 from telegram import Update
-from telegram.ext import Application, MessageHandler, filters, ContextTypes
-from ..Agent.CalendarAgent import CalendarAgent
+from telegram.constants import ChatAction
+from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes
 from ..helpers.Config import get_settings
+from ..helpers.Telemetry import TELEGRAM_SECONDS, configure_logging, span, start_metrics_server
+from .TurnDispatcher import TurnDispatcher, DispatcherBusyError
+from .ProgressiveReply import ProgressiveReply
+from .WebhookServer import WebhookServer
+
+if TYPE_CHECKING:
+    from ..Agent.CalendarAgent import CalendarAgent
+    from ..calenderProvider.CalendarRegistry import CalendarRegistry
+    from ..calenderProvider.OAuthOnboarding import OAuthOnboarding
+
+logger = logging.getLogger(__name__)
+
+
+TOOL_STATUS = {
+    "list_calendar_events": "🔎 Checking your calendar…",
+    "get_calendar_event": "🔎 Looking up the event…",
+    "add_calendar_event": "📝 Adding the event…",
+    "add_calendar_events": "📝 Adding the events…",
+    "update_calendar_event": "✏️ Updating the event…",
+    "update_calendar_events": "✏️ Updating the events…",
+    "delete_calendar_event": "🗑️ Deleting the event…",
+    "delete_calendar_events": "🗑️ Deleting the events…",
+    "find_free_slots": "🗓️ Looking for free time…",
+}
 
 
 class TelegramCalendarBot:
-    def __init__(self):
+    def __init__(self, calendar_agent: Optional["CalendarAgent"] = None):
         settings = get_settings()
+        configure_logging(settings.LOG_LEVEL)
+        self.metrics_port = settings.METRICS_PORT
         self.token = settings.TELEGRAM_TOKEN
-        self.calendar_agent = CalendarAgent(verbose=False)
-        self.application = Application.builder().token(self.token).build()
+        self.streaming = settings.TELEGRAM_STREAMING
+        self.edit_interval = settings.TELEGRAM_EDIT_INTERVAL_SECONDS
+        self.mode = settings.TELEGRAM_MODE
+        self.webhook: Optional[WebhookServer] = None
+        # Built in the background once polling starts, see _warm_up
+        self.calendar_agent = calendar_agent
+        self._agent_task: Optional[asyncio.Future] = None
+        # Every Telegram user brings their own Google account when a credential store is configured
+        self.registry: Optional["CalendarRegistry"] = None
+        self.onboarding: Optional["OAuthOnboarding"] = None
+        if settings.GOOGLE_CREDENTIALS_STORE_DIR:
+            # The Google auth libraries are only loaded when per-user accounts are on
+            from ..calenderProvider import CalendarRegistry as registry_module, OAuthOnboarding as onboarding_module
+            self.registry = registry_module.CalendarRegistry.from_settings()
+            self.onboarding = onboarding_module.OAuthOnboarding(
+                settings.GOOGLE_CALENDAR_CREDENTIALS_PATH,
+                redirect_uri=settings.GOOGLE_OAUTH_REDIRECT_URI,
+                scopes=registry_module.CalendarRegistry.SCOPES
+            )
+        self.dispatcher = TurnDispatcher(
+            max_concurrency=settings.MAX_CONCURRENT_TURNS,
+            max_queue_depth=settings.MAX_QUEUED_TURNS_PER_CHAT
+        )
+        self.application = (
+            Application.builder()
+            .token(self.token)
+            .base_url(settings.TELEGRAM_API_URL)
+            # Every webhook worker may be sending a reply at the same time
+            .connection_pool_size(max(settings.TELEGRAM_WEBHOOK_WORKERS, settings.MAX_CONCURRENT_TURNS) * 2)
+            .concurrent_updates(True)
+            .post_init(self._warm_up)
+            .post_shutdown(self._shutdown)
+            .build()
+        )
+        self.application.add_handler(CommandHandler("connect", self.handle_connect))
+        self.application.add_handler(CommandHandler("disconnect", self.handle_disconnect))
         self.application.add_handler(MessageHandler(filters.TEXT, self.handle_message))
 
+    def _build_agent(self) -> "CalendarAgent":
+        # langchain, the Google client and the Ollama client load here instead of at import time
+        from ..Agent.CalendarAgent import CalendarAgent
+        return CalendarAgent(verbose=False, multi_user=self.registry is not None)
+
+    async def _warm_up(self, application: Optional[Application] = None) -> None:
+        """Start building the agent without holding up polling"""
+        if self.registry is not None:
+            self.registry.start()
+        if self.calendar_agent is None and self._agent_task is None:
+            self._agent_task = asyncio.ensure_future(asyncio.to_thread(self._build_agent))
+
+    async def _get_agent(self) -> "CalendarAgent":
+        if self.calendar_agent is None:
+            await self._warm_up()
+            try:
+                self.calendar_agent = await self._agent_task
+            except Exception:
+                # Let the next message try again
+                self._agent_task = None
+                raise
+        return self.calendar_agent
+
+    async def handle_connect(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        if self.registry is None:
+            await update.message.reply_text("This bot uses the Google account configured by its owner.")
+            return
+        user_id = update.effective_user.id
+        try:
+            if not context.args:
+                url = await asyncio.to_thread(self.onboarding.authorization_url, user_id)
+                await update.message.reply_text(
+                    "🔗 Open this link and allow access to your calendar, then send "
+                    "/connect followed by the code or the address you were sent to:\n" + url
+                )
+                return
+            credentials = await asyncio.to_thread(self.onboarding.finish, user_id, " ".join(context.args))
+            await asyncio.to_thread(self.registry.connect, user_id, credentials)
+        except Exception as e:
+            logger.exception("Connecting a Google account failed")
+            await update.message.reply_text(f"❌ Could not connect your calendar: {str(e)}")
+            return
+        await update.message.reply_text("✅ Your Google Calendar is connected.")
+
+    async def handle_disconnect(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        if self.registry is None:
+            await update.message.reply_text("This bot uses the Google account configured by its owner.")
+            return
+        removed = await asyncio.to_thread(self.registry.disconnect, update.effective_user.id)
+        await update.message.reply_text("👋 Your Google Calendar is disconnected." if removed else "No Google Calendar is connected.")
+
+    async def _get_calendar(self, update: Update):
+        """The sender's calendar in multi-user mode, None means the agent's own"""
+        if self.registry is None:
+            return None
+        return await asyncio.to_thread(self.registry.get, update.effective_user.id)
+
     async def handle_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         user_message = update.message.text
-        response = self.calendar_agent.chat(user_message)
-        await update.message.reply_text(response)
+        chat_id = update.effective_chat.id
+        try:
+            await self._get_agent()
+        except Exception as e:
+            logger.exception("Calendar agent failed to start")
+            await update.message.reply_text(f"❌ The calendar assistant failed to start: {str(e)}")
+            return
+        try:
+            calendar = await self._get_calendar(update)
+        except Exception as e:
+            # Only reachable in multi-user mode, the registry module is loaded by then
+            from ..calenderProvider.CalendarRegistry import CalendarNotConnected
+            if isinstance(e, CalendarNotConnected):
+                await update.message.reply_text("🔗 Connect your Google Calendar with /connect first.")
+            else:
+                logger.exception("Opening the calendar of user %s failed", update.effective_user.id)
+                await update.message.reply_text(f"❌ Could not open your calendar: {str(e)}")
+            return
+        try:
+            if self.streaming:
+                await context.bot.send_chat_action(chat_id, ChatAction.TYPING)
+                await self.dispatcher.submit(chat_id, self._stream_reply, update, context, user_message, calendar)
+                return
+            response = await self.dispatcher.submit(chat_id, self.calendar_agent.achat, user_message, chat_id, calendar)
+        except DispatcherBusyError:
+            response = "⏳ I'm still working on your previous messages, please wait a moment."
+        with span("telegram_send", TELEGRAM_SECONDS, operation="reply"):
+            await update.message.reply_text(response)
+
+    async def _stream_reply(self, update: Update, context: ContextTypes.DEFAULT_TYPE, user_message: str, calendar=None) -> None:
+        reply = ProgressiveReply(context.bot, update.message, min_interval=self.edit_interval)
+        await reply.start()
+
+        answer = ""
+        final = ""
+        try:
+            async for event in self.calendar_agent.astream(user_message, update.effective_chat.id, calendar):
+                if event.kind == "tool_start":
+                    # Text before a tool call is the model talking to itself, start over
+                    answer = ""
+                    await reply.update(TOOL_STATUS.get(event.tool, "⚙️ Working on it…"))
+                elif event.kind == "token":
+                    answer += event.text
+                    await reply.update(answer)
+                elif event.kind == "final":
+                    final = event.text
+            await reply.finish(final)
+        finally:
+            # Also when streaming failed, the typing indicator must not outlive the turn
+            reply.stop_typing()
+
+    async def _shutdown(self, application: Application) -> None:
+        self.dispatcher.shutdown(wait=False)
+        if self.calendar_agent is not None:
+            self.calendar_agent.close()
+        if self.registry is not None:
+            self.registry.close()
+
+    async def start_webhook(self) -> WebhookServer:
+        """
+        Start the application and the webhook server without blocking, for
+        run_webhook and for tests against a fake Bot API.
+        """
+        settings = get_settings()
+        await self.application.initialize()
+        if self.application.post_init is not None:
+            await self.application.post_init(self.application)
+        await self.application.start()
+
+        self.webhook = WebhookServer(
+            self.application,
+            host=settings.TELEGRAM_WEBHOOK_LISTEN,
+            port=settings.TELEGRAM_WEBHOOK_PORT,
+            path=settings.TELEGRAM_WEBHOOK_PATH,
+            secret_token=settings.TELEGRAM_WEBHOOK_SECRET,
+            queue_size=settings.TELEGRAM_WEBHOOK_QUEUE_SIZE,
+            workers=settings.TELEGRAM_WEBHOOK_WORKERS
+        )
+        await self.webhook.start()
+        if settings.TELEGRAM_WEBHOOK_URL:
+            await self.application.bot.set_webhook(
+                url=settings.TELEGRAM_WEBHOOK_URL,
+                secret_token=settings.TELEGRAM_WEBHOOK_SECRET or None,
+                max_connections=settings.TELEGRAM_WEBHOOK_MAX_CONNECTIONS,
+                allowed_updates=Update.ALL_TYPES
+            )
+            logger.info("Webhook registered at %s", settings.TELEGRAM_WEBHOOK_URL)
+        return self.webhook
+
+    async def stop_webhook(self):
+        if self.webhook is not None:
+            await self.webhook.stop()
+            self.webhook = None
+        await self.application.stop()
+        await self.application.shutdown()
+        if self.application.post_shutdown is not None:
+            await self.application.post_shutdown(self.application)
+
+    async def run_webhook(self):
+        await self.start_webhook()
+        try:
+            # Runs until the process is interrupted
+            await asyncio.Event().wait()
+        finally:
+            await self.stop_webhook()
 
     def start(self):
-        print("Starting Telegram Calendar Bot...")
+        logger.info("Starting Telegram Calendar Bot...")
+        start_metrics_server(self.metrics_port)
+        if self.mode == "webhook":
+            try:
+                asyncio.run(self.run_webhook())
+            except KeyboardInterrupt:
+                pass
+            return
         asyncio.run(self.application.run_polling())
 
 if __name__ == '__main__':
     bot = TelegramCalendarBot()
     bot.start()
-        
\ No newline at end of file
+        
@@ -0,0 +1,67 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable
+
+
+class DispatcherBusyError(Exception):
+    """Raised when a chat already has too many turns waiting to be processed"""
+
+
+class TurnDispatcher:
+    """
+    Schedules agent turns without blocking the event loop.
+
+    Turns for the same chat are processed one at a time in arrival order,
+    turns for different chats run in parallel. Coroutine functions are awaited
+    on the loop, plain functions run on a bounded worker pool; both share the
+    same concurrency limit.
+    """
+
+    def __init__(self, max_concurrency: int = 4, max_queue_depth: int = 5):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        if max_queue_depth < 1:
+            raise ValueError("max_queue_depth must be at least 1")
+
+        self.max_concurrency = max_concurrency
+        self.max_queue_depth = max_queue_depth
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_concurrency,
+            thread_name_prefix="agent-turn"
+        )
+        self._slots = asyncio.Semaphore(max_concurrency)
+        # asyncio.Lock wakes waiters in FIFO order, which keeps per-chat ordering
+        self._chat_locks: Dict[Hashable, asyncio.Lock] = {}
+        self._pending: Dict[Hashable, int] = {}
+
+    def pending(self, chat_id: Hashable) -> int:
+        return self._pending.get(chat_id, 0)
+
+    async def submit(self, chat_id: Hashable, func: Callable[..., Any], *args, **kwargs) -> Any:
+
+        if self.pending(chat_id) >= self.max_queue_depth:
+            raise DispatcherBusyError(
+                f"Chat {chat_id} already has {self.max_queue_depth} turns queued"
+            )
+
+        self._pending[chat_id] = self.pending(chat_id) + 1
+        lock = self._chat_locks.setdefault(chat_id, asyncio.Lock())
+        try:
+            async with lock, self._slots:
+                if asyncio.iscoroutinefunction(func):
+                    return await func(*args, **kwargs)
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(
+                    self.executor,
+                    functools.partial(func, *args, **kwargs)
+                )
+        finally:
+            self._pending[chat_id] -= 1
+            if self._pending[chat_id] == 0:
+                # Nobody is waiting on this chat anymore, drop its bookkeeping
+                del self._pending[chat_id]
+                del self._chat_locks[chat_id]
+
+    def shutdown(self, wait: bool = True):
+        self.executor.shutdown(wait=wait)
@@ -0,0 +1,280 @@
+import asyncio
+import hmac
+import json
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+from telegram import Update
+from telegram.ext import Application
+from ..helpers.Telemetry import TELEGRAM_QUEUE_SECONDS, TELEGRAM_UPDATES
+
+logger = logging.getLogger(__name__)
+
+REASONS = {
+    200: "OK", 204: "No Content", 400: "Bad Request", 403: "Forbidden", 404: "Not Found", 405: "Method Not Allowed",
+    408: "Request Timeout", 410: "Gone", 412: "Precondition Failed", 413: "Payload Too Large",
+    429: "Too Many Requests", 431: "Request Header Fields Too Large", 501: "Not Implemented",
+    503: "Service Unavailable"
+}
+MAX_HEADERS = 100
+CHUNK_SIZE = re.compile(rb"[0-9A-Fa-f]{1,16}")
+
+
+class HttpError(Exception):
+    def __init__(self, status: int):
+        super().__init__(REASONS.get(status, str(status)))
+        self.status = status
+
+
+@dataclass
+class HttpRequest:
+    method: str
+    path: str
+    headers: Dict[str, str] = field(default_factory=dict)
+    body: bytes = b""
+    query: str = ""
+
+    @property
+    def keep_alive(self) -> bool:
+        return self.headers.get("connection", "").lower() != "close"
+
+
+async def _read_line(reader: asyncio.StreamReader) -> bytes:
+    try:
+        return await reader.readline()
+    except ValueError:
+        # Longer than the reader's buffer limit
+        raise HttpError(431)
+
+
+async def _read_headers(reader: asyncio.StreamReader) -> Dict[str, str]:
+    """Header fields by lower case name, repeated fields are joined with commas"""
+    headers: Dict[str, str] = {}
+    for _ in range(MAX_HEADERS + 1):
+        line = await _read_line(reader)
+        if line in (b"\r\n", b"\n", b""):
+            return headers
+        name, colon, value = line.decode("latin-1").partition(":")
+        name = name.strip().lower()
+        if not colon or not name or " " in name:
+            raise HttpError(400)
+        value = value.strip()
+        headers[name] = f"{headers[name]}, {value}" if name in headers else value
+    raise HttpError(431)
+
+
+async def _read_chunked(reader: asyncio.StreamReader, max_body_bytes: int) -> bytes:
+    body = bytearray()
+    while True:
+        # Chunk extensions after ";" are ignored
+        size_text = (await _read_line(reader)).split(b";", 1)[0].strip()
+        if not CHUNK_SIZE.fullmatch(size_text):
+            raise HttpError(400)
+        size = int(size_text, 16)
+        if size == 0:
+            # Trailer fields are read and ignored
+            await _read_headers(reader)
+            return bytes(body)
+        if len(body) + size > max_body_bytes:
+            raise HttpError(413)
+        body += await reader.readexactly(size)
+        if await reader.readexactly(2) != b"\r\n":
+            raise HttpError(400)
+
+
+async def _read_body(reader: asyncio.StreamReader, headers: Dict[str, str], max_body_bytes: int) -> bytes:
+    transfer_encoding = headers.get("transfer-encoding")
+    if transfer_encoding is not None:
+        # A length next to a transfer coding is how requests get smuggled past proxies
+        if "content-length" in headers:
+            raise HttpError(400)
+        if transfer_encoding.lower() != "chunked":
+            raise HttpError(501)
+        return await _read_chunked(reader, max_body_bytes)
+
+    lengths = {value.strip() for value in headers.get("content-length", "0").split(",")}
+    if len(lengths) != 1:
+        raise HttpError(400)
+    length = lengths.pop()
+    if not length.isdigit():
+        raise HttpError(400)
+    length = int(length)
+    if length > max_body_bytes:
+        raise HttpError(413)
+    return await reader.readexactly(length) if length else b""
+
+
+async def read_request(reader: asyncio.StreamReader, max_body_bytes: int, idle_timeout: Optional[float] = None, read_timeout: Optional[float] = None) -> Optional[HttpRequest]:
+    """
+    Read one HTTP/1.1 request, the body framed by Content-Length or chunked.
+    Returns None when the client closed the connection between requests or
+    sent nothing for `idle_timeout` seconds. Once a request has started, its
+    headers and body have to arrive within `read_timeout` seconds or it is
+    answered with 408.
+    """
+    try:
+        request_line = await asyncio.wait_for(_read_line(reader), timeout=idle_timeout)
+    except asyncio.TimeoutError:
+        return None
+    if not request_line:
+        return None
+    try:
+        method, target, _ = request_line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise HttpError(400)
+
+    async def read_rest():
+        headers = await _read_headers(reader)
+        return headers, await _read_body(reader, headers, max_body_bytes)
+
+    try:
+        headers, body = await asyncio.wait_for(read_rest(), timeout=read_timeout)
+    except asyncio.TimeoutError:
+        raise HttpError(408)
+    url = urlsplit(target)
+    return HttpRequest(method=method.upper(), path=url.path, headers=headers, body=body, query=url.query)
+
+
+async def write_response(writer: asyncio.StreamWriter, status: int, payload: Optional[dict] = None, headers: Optional[Dict[str, str]] = None, keep_alive: bool = True):
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    lines = [
+        f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+        f"Content-Length: {len(body)}",
+        "Content-Type: application/json",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+    ]
+    lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+
+
+class WebhookServer:
+    """
+    Receives Telegram updates over HTTP and feeds them to the application.
+
+    Every update is acknowledged as soon as it is parsed and queued, before
+    any agent work, so Telegram never waits on a turn. The queue is bounded:
+    when it is full the update is refused with 503 and Retry-After, and
+    Telegram delivers it again later instead of the process piling up work.
+    `workers` updates are processed at the same time.
+    """
+
+    def __init__(self, application: Application, host: str = "0.0.0.0", port: int = 8080, path: str = "/telegram", secret_token: str = "", queue_size: int = 1000, workers: int = 16, max_body_bytes: int = 1 << 20, idle_timeout_seconds: float = 75, read_timeout_seconds: float = 10, drain_seconds: float = 10):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.application = application
+        self.host = host
+        self.port = port
+        self.path = path
+        self.secret_token = secret_token
+        self.workers = workers
+        self.max_body_bytes = max_body_bytes
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self.read_timeout_seconds = read_timeout_seconds
+        self.drain_seconds = drain_seconds
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._workers: List[asyncio.Task] = []
+        self.accepted = 0
+        self.rejected = 0
+
+    @property
+    def bound_port(self) -> int:
+        """The port actually listened on, useful with port=0"""
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start(self):
+        self._workers = [asyncio.create_task(self._work(), name=f"webhook-worker-{i}") for i in range(self.workers)]
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        logger.info("Webhook server listening on %s:%s%s", self.host, self.bound_port, self.path)
+
+    async def stop(self):
+        """Stop accepting updates, give the queued ones `drain_seconds` to finish"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout=self.drain_seconds)
+        except asyncio.TimeoutError:
+            logger.warning("Dropping %d queued updates on shutdown", self.queue.qsize())
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def stats(self) -> dict:
+        return {
+            "queued": self.queue.qsize(),
+            "queue_size": self.queue.maxsize,
+            "workers": self.workers,
+            "accepted": self.accepted,
+            "rejected": self.rejected
+        }
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        # Telegram keeps connections open and sends many updates over each
+        try:
+            while True:
+                try:
+                    request = await read_request(
+                        reader,
+                        self.max_body_bytes,
+                        idle_timeout=self.idle_timeout_seconds,
+                        read_timeout=self.read_timeout_seconds
+                    )
+                except HttpError as error:
+                    await write_response(writer, error.status, {"ok": False, "error": str(error)}, keep_alive=False)
+                    return
+                if request is None:
+                    return
+                status, payload, headers = self._handle(request)
+                await write_response(writer, status, payload, headers, keep_alive=request.keep_alive)
+                if not request.keep_alive:
+                    return
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def _handle(self, request: HttpRequest):
+        if request.method == "GET" and request.path == "/healthz":
+            return 200, {"ok": True, **self.stats()}, None
+        if request.path != self.path:
+            return 404, {"ok": False}, None
+        if request.method != "POST":
+            return 405, {"ok": False}, None
+        if self.secret_token and not hmac.compare_digest(request.headers.get("x-telegram-bot-api-secret-token", ""), self.secret_token):
+            TELEGRAM_UPDATES.labels(status="forbidden").inc()
+            return 403, {"ok": False}, None
+
+        try:
+            update = Update.de_json(json.loads(request.body), self.application.bot)
+        except Exception:
+            TELEGRAM_UPDATES.labels(status="invalid").inc()
+            logger.warning("Ignoring a malformed update")
+            return 400, {"ok": False}, None
+
+        try:
+            self.queue.put_nowait((update, time.monotonic()))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            TELEGRAM_UPDATES.labels(status="rejected").inc()
+            return 503, {"ok": False, "error": "busy"}, {"Retry-After": "1"}
+        self.accepted += 1
+        TELEGRAM_UPDATES.labels(status="accepted").inc()
+        return 200, {"ok": True}, None
+
+    async def _work(self):
+        while True:
+            update, queued_at = await self.queue.get()
+            TELEGRAM_QUEUE_SECONDS.observe(time.monotonic() - queued_at)
+            try:
+                await self.application.process_update(update)
+            except Exception:
+                logger.exception("Processing update %s failed", update.update_id)
+            finally:
+                self.queue.task_done()
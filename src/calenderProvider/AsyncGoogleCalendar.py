@@ -0,0 +1,484 @@
+import logging
+import asyncio
+from datetime import datetime
+from functools import partial
+from typing import AsyncIterator, Hashable, Iterable, List, Optional, Tuple
+from urllib.parse import quote
+import httpx
+from google.oauth2.credentials import Credentials
+from ..helpers.Config import get_settings
+from ..helpers.Telemetry import GOOGLE_SECONDS, span
+from .GoogleCalendarInterface import (
+    AsyncGoogleCalendarInterface,
+    CalendarEvent,
+    EventFilters,
+    EventPatch
+)
+from .EventCache import EventCache, as_utc
+from .FreeBusyIndex import busy_from_events, busy_from_freebusy
+from .CredentialStore import CredentialRefresher, load_credentials
+from .RequestScheduler import RetryHint, get_scheduler, parse_retry_after, retry_hint
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class CalendarApiError(Exception):
+    def __init__(self, status: int, message: str, reasons: Iterable[str] = (), retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.reasons = list(reasons)
+        self.retry_after = retry_after
+
+    @classmethod
+    def from_response(cls, response: httpx.Response) -> "CalendarApiError":
+        try:
+            reasons = [error.get('reason') for error in response.json()['error'].get('errors', [])]
+        except (ValueError, KeyError, TypeError, AttributeError):
+            reasons = []
+        return cls(
+            response.status_code,
+            f"{response.status_code} {response.text}",
+            reasons,
+            parse_retry_after(response.headers.get('retry-after'))
+        )
+
+
+def api_error_hint(error: Exception, idempotent: bool = True) -> Optional[RetryHint]:
+    if not isinstance(error, CalendarApiError):
+        return None
+    return retry_hint(error.status, error.reasons, error.retry_after, idempotent)
+
+
+class AsyncGoogleCalendar(AsyncGoogleCalendarInterface):
+    """
+    Google Calendar provider on a pooled httpx.AsyncClient.
+
+    Connections are kept alive and shared by every request (multiplexed over
+    HTTP/2 when the h2 package is installed). The client is bound to the event
+    loop that makes the first request; `run_sync` lets worker threads use the
+    provider through that loop.
+    """
+
+    SCOPES = ['https://www.googleapis.com/auth/calendar']
+    MAX_PAGE_SIZE = 2500
+    EVENT_FIELDS = "id,etag,status,summary,description,location,start,end,htmlLink,recurrence,recurringEventId,originalStartTime,transparency,iCalUID"
+    # freebusy.query accepts at most this many calendars per request
+    FREEBUSY_MAX_CALENDARS = 50
+    # (HTTP method, addresses a single event) -> operation label for metrics
+    OPERATIONS = {
+        ('GET', False): 'calendar.events.list',
+        ('POST', False): 'calendar.events.insert',
+        ('GET', True): 'calendar.events.get',
+        ('PUT', True): 'calendar.events.update',
+        ('PATCH', True): 'calendar.events.patch',
+        ('DELETE', True): 'calendar.events.delete',
+    }
+
+    def __init__(self, calendar_id: str = 'primary', pool_size: Optional[int] = None, base_url: Optional[str] = None, http2: Optional[bool] = None, cache_ttl_seconds: Optional[float] = None):
+        settings = get_settings()
+        self.token_path = settings.GOOGLE_CALENDAR_TOKEN_PATH
+        self.calendar_id = calendar_id
+        self.base_url = (base_url or settings.GOOGLE_CALENDAR_API_URL).rstrip('/')
+        self.pool_size = pool_size or settings.GOOGLE_HTTP_POOL_SIZE
+        self.http2 = (settings.GOOGLE_HTTP2 if http2 is None else http2) and HTTP2_AVAILABLE
+        self.credentials: Optional[Credentials] = None
+        self.client: Optional[httpx.AsyncClient] = None
+        self.is_authenticated = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._auth_lock = asyncio.Lock()
+        self.refresh_margin_seconds = settings.GOOGLE_TOKEN_REFRESH_MARGIN_SECONDS
+        self.refresher: Optional[CredentialRefresher] = None
+
+        if cache_ttl_seconds is None:
+            cache_ttl_seconds = settings.CALENDAR_CACHE_TTL_SECONDS
+        self.cache: Optional[EventCache] = EventCache(cache_ttl_seconds) if cache_ttl_seconds > 0 else None
+        self._sync_lock = asyncio.Lock()
+        # Provider that owns the credentials and the HTTP client, see for_calendar
+        self._owner = self
+        self.quota_user: Hashable = "default"
+        self.scheduler = get_scheduler()
+
+    @property
+    def events_path(self) -> str:
+        return f"/calendars/{quote(self.calendar_id, safe='')}/events"
+
+    async def authenticate(self) -> bool:
+        try:
+            if self.credentials is None:
+                self.credentials = load_credentials(self.token_path, self.SCOPES)
+                if self.credentials is None:
+                    raise FileNotFoundError(
+                        f"Token file not found: {self.token_path}\n"
+                        "Run the GoogleCalendar OAuth flow once to create it."
+                    )
+                self.refresher = CredentialRefresher(
+                    self.credentials,
+                    token_path=self.token_path,
+                    margin_seconds=self.refresh_margin_seconds
+                )
+                self.refresher.start()
+
+            if not self.credentials.valid:
+                if not self.credentials.refresh_token:
+                    raise Exception("Stored credentials are invalid and cannot be refreshed")
+                logger.info("Refreshing expired credentials...")
+                await asyncio.to_thread(self.refresher.refresh)
+
+            if self.client is None:
+                limits = httpx.Limits(
+                    max_connections=self.pool_size,
+                    max_keepalive_connections=self.pool_size
+                )
+                self.client = httpx.AsyncClient(
+                    base_url=self.base_url,
+                    http2=self.http2,
+                    limits=limits,
+                    timeout=httpx.Timeout(30.0)
+                )
+                self._loop = asyncio.get_running_loop()
+
+            self.is_authenticated = True
+            logger.info("Async Google Calendar ready (pool size %s, http2=%s)", self.pool_size, self.http2)
+            return True
+
+        except Exception as e:
+            logger.error("Authentication failed: %s", str(e))
+            self.is_authenticated = False
+            return False
+
+    def for_calendar(self, calendar_id: str) -> "AsyncGoogleCalendar":
+        """
+        Provider for another calendar of the same account. It shares this
+        provider's credentials and connection pool and keeps its own event cache.
+        """
+        other = AsyncGoogleCalendar(
+            calendar_id=calendar_id,
+            pool_size=self.pool_size,
+            base_url=self.base_url,
+            http2=self.http2,
+            cache_ttl_seconds=self.cache.ttl_seconds if self.cache is not None else 0
+        )
+        other._owner = self
+        other.quota_user = self.quota_user
+        return other
+
+    async def _ensure_authenticated(self):
+        if self._owner is not self:
+            await self._owner._ensure_authenticated()
+            self.credentials = self._owner.credentials
+            self.client = self._owner.client
+            self._loop = self._owner._loop
+            self.is_authenticated = True
+            return
+        if self.is_authenticated and self.client is not None and self.credentials.valid:
+            return
+        async with self._auth_lock:
+            if self.is_authenticated and self.client is not None and self.credentials.valid:
+                return
+            if not await self.authenticate():
+                raise Exception(
+                    "Not authenticated. Call authenticate() first or authentication failed."
+                )
+
+    async def _request(self, method: str, path: str, params: Optional[dict] = None, json: Optional[dict] = None, headers: Optional[dict] = None, operation: Optional[str] = None, idempotent: Optional[bool] = None) -> dict:
+        """
+        One API call through the scheduler. Server errors are only retried for
+        idempotent calls, by default everything but POST and conditional
+        (If-Match) changes; read-only POSTs such as freeBusy pass
+        idempotent=True.
+        """
+        await self._ensure_authenticated()
+        if idempotent is None:
+            idempotent = method != 'POST' and 'If-Match' not in (headers or {})
+        # Same operation names as the discovery based client uses
+        operation = operation or self.OPERATIONS.get((method, path != self.events_path), "unknown")
+
+        async def send() -> httpx.Response:
+            # Built per attempt, a retry picks up a token refreshed in the meantime
+            request_headers = {'Authorization': f"Bearer {self.credentials.token}"}
+            if headers:
+                request_headers.update(headers)
+            with span("google_request", GOOGLE_SECONDS, operation=operation) as labels:
+                response = await self.client.request(method, path, params=params, json=json, headers=request_headers)
+                if response.status_code >= 400:
+                    labels["status"] = str(response.status_code)
+                    raise CalendarApiError.from_response(response)
+            return response
+
+        # Identical reads of one account share a single response
+        coalesce_key = (self.quota_user, path, repr(sorted((params or {}).items())), repr(sorted((headers or {}).items()))) if method == 'GET' else None
+        response = await self.scheduler.acall(
+            self.quota_user,
+            send,
+            classify=partial(api_error_hint, idempotent=idempotent),
+            operation=operation,
+            coalesce_key=coalesce_key
+        )
+        if response.status_code == 204 or not response.content:
+            return {}
+        return response.json()
+
+    def run_sync(self, coro):
+        """
+        Run a coroutine on the loop that owns the HTTP client, for callers on
+        other threads such as the synchronous agent path.
+        """
+        loop = self._owner._loop
+        if loop is None or not loop.is_running():
+            coro.close()
+            raise Exception("AsyncGoogleCalendar has no running event loop, use the async agent path")
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            coro.close()
+            raise Exception("run_sync cannot be called from the provider's own event loop")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    async def close(self):
+        if self._owner is not self:
+            # The owner closes the shared client
+            self.client = None
+            self.is_authenticated = False
+            return
+        if self.refresher is not None:
+            self.refresher.stop()
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+            self.is_authenticated = False
+
+    def _calendar_event_to_google_format(self, event: CalendarEvent) -> dict:
+
+        return event.model_dump(by_alias=True, exclude_unset=True, exclude={'id', 'etag', 'ical_uid', 'recurring_event_id', 'original_start_time'}, mode='json')
+
+    def _google_format_to_calendar_event(self, google_event: dict) -> CalendarEvent:
+
+        return CalendarEvent.model_validate(google_event)
+
+    async def _paginate(self, params: dict, limit: Optional[int] = None) -> AsyncIterator[dict]:
+        params = dict(params)
+        while True:
+            params['maxResults'] = min(self.MAX_PAGE_SIZE, limit) if limit else self.MAX_PAGE_SIZE
+            page = await self._request('GET', self.events_path, params=params)
+            yield page
+            if limit:
+                limit -= len(page.get('items', []))
+                if limit <= 0:
+                    return
+            page_token = page.get('nextPageToken')
+            if not page_token:
+                return
+            params['pageToken'] = page_token
+
+    async def _fetch_sync_pages(self, **params) -> Tuple[List[dict], Optional[str], Optional[str]]:
+        query_params = {
+            # Recurring events come as one master plus their exceptions, the cache expands them
+            'singleEvents': 'false',
+            'fields': f"nextPageToken,nextSyncToken,timeZone,items({self.EVENT_FIELDS})",
+            **params
+        }
+        items = []
+        page = {}
+        async for page in self._paginate(query_params):
+            items.extend(page.get('items', []))
+        return items, page.get('nextSyncToken'), page.get('timeZone')
+
+    async def _sync_cache(self):
+        if self.cache is None or self.cache.is_fresh:
+            return
+
+        async with self._sync_lock:
+            if self.cache.is_fresh:
+                return
+
+            if self.cache.sync_token:
+                try:
+                    items, sync_token, time_zone = await self._fetch_sync_pages(syncToken=self.cache.sync_token)
+                    self.cache.update(items, sync_token, time_zone)
+                    return
+                except CalendarApiError as error:
+                    if error.status != 410:
+                        raise
+                    logger.info("Sync token expired, running a full sync...")
+
+            items, sync_token, time_zone = await self._fetch_sync_pages()
+            self.cache.replace(items, sync_token, time_zone)
+            logger.debug("Event cache synced: %s events", len(self.cache))
+
+    async def calendar_version(self) -> Optional[Hashable]:
+        if self.cache is None:
+            return None
+        await self._ensure_authenticated()
+        await self._sync_cache()
+        return self.cache.version
+
+    def cache_stats(self) -> dict:
+        if self.cache is None:
+            return {'enabled': False}
+        return {'enabled': True, **self.cache.stats()}
+
+    async def add_event(self, event: CalendarEvent) -> CalendarEvent:
+        try:
+            created_event = await self._request('POST', self.events_path, json=self._calendar_event_to_google_format(event))
+        except CalendarApiError as error:
+            raise Exception(f"Failed to create event: {error}")
+
+        logger.info("Event created: %s", created_event.get('htmlLink'))
+        if self.cache is not None:
+            self.cache.put(created_event)
+        return self._google_format_to_calendar_event(created_event)
+
+    async def get_event(self, event_id: str) -> CalendarEvent:
+        if self.cache is not None:
+            try:
+                await self._sync_cache()
+            except CalendarApiError as error:
+                logger.warning("Event cache sync failed: %s", error)
+            cached_event = self.cache.get(event_id)
+            if cached_event is not None:
+                return self._google_format_to_calendar_event(cached_event)
+
+        try:
+            google_event = await self._request('GET', f"{self.events_path}/{quote(event_id, safe='')}")
+        except CalendarApiError as error:
+            if error.status == 404:
+                raise Exception(f"Event not found: {event_id}")
+            raise Exception(f"Failed to get event: {error}")
+
+        if self.cache is not None:
+            self.cache.put(google_event)
+        return self._google_format_to_calendar_event(google_event)
+
+    async def iter_events(self, filters: EventFilters) -> AsyncIterator[CalendarEvent]:
+        if self.cache is not None:
+            try:
+                await self._sync_cache()
+                cached_events = self.cache.query(
+                    time_min=filters.start_date,
+                    time_max=filters.end_date,
+                    search_query=filters.search_query,
+                    limit=filters.max_results
+                )
+            except CalendarApiError as error:
+                logger.warning("Event cache sync failed, querying Google directly: %s", error)
+            else:
+                for event in cached_events:
+                    yield self._google_format_to_calendar_event(event)
+                return
+
+        params = {
+            'singleEvents': 'true',
+            'orderBy': 'startTime',
+            'fields': f"nextPageToken,items({self.EVENT_FIELDS})"
+        }
+        if filters.start_date:
+            params['timeMin'] = as_utc(filters.start_date).isoformat()
+        if filters.end_date:
+            params['timeMax'] = as_utc(filters.end_date).isoformat()
+        if filters.search_query:
+            params['q'] = filters.search_query
+
+        remaining = filters.max_results
+        try:
+            async for page in self._paginate(params, limit=remaining):
+                for event in page.get('items', []):
+                    yield self._google_format_to_calendar_event(event)
+                    if remaining is not None:
+                        remaining -= 1
+                        if remaining == 0:
+                            return
+        except CalendarApiError as error:
+            raise Exception(f"Failed to list events: {error}")
+
+    async def list_events(self, filters: EventFilters) -> List[CalendarEvent]:
+        calendar_events = [event async for event in self.iter_events(filters)]
+        logger.debug("Found %s events", len(calendar_events))
+        return calendar_events
+
+    async def update_event(self, event_id: str, event: CalendarEvent) -> CalendarEvent:
+        try:
+            updated_event = await self._request(
+                'PUT',
+                f"{self.events_path}/{quote(event_id, safe='')}",
+                json=self._calendar_event_to_google_format(event)
+            )
+        except CalendarApiError as error:
+            if error.status == 404:
+                raise Exception(f"Event not found: {event_id}")
+            raise Exception(f"Failed to update event: {error}")
+
+        logger.info("Event updated: %s", updated_event.get('htmlLink'))
+        if self.cache is not None:
+            self.cache.put(updated_event)
+        return self._google_format_to_calendar_event(updated_event)
+
+    async def patch_event(self, event_id: str, patch: EventPatch, etag: Optional[str] = None) -> CalendarEvent:
+        try:
+            patched_event = await self._request(
+                'PATCH',
+                f"{self.events_path}/{quote(event_id, safe='')}",
+                json=patch.model_dump(by_alias=True, exclude_unset=True, mode='json'),
+                headers={'If-Match': etag} if etag else None
+            )
+        except CalendarApiError as error:
+            if error.status == 404:
+                raise Exception(f"Event not found: {event_id}")
+            if error.status == 412:
+                if self.cache is not None:
+                    self.cache.remove(event_id)
+                raise Exception(f"Event {event_id} was changed since it was last read")
+            raise Exception(f"Failed to patch event: {error}")
+
+        logger.info("Event patched: %s", patched_event.get('htmlLink'))
+        if self.cache is not None:
+            self.cache.put(patched_event)
+        return self._google_format_to_calendar_event(patched_event)
+
+    async def delete_event(self, event_id: str) -> bool:
+        try:
+            await self._request('DELETE', f"{self.events_path}/{quote(event_id, safe='')}")
+        except CalendarApiError as error:
+            if error.status == 404:
+                raise Exception(f"Event not found: {event_id}")
+            raise Exception(f"Failed to delete event: {error}")
+
+        logger.info("Event deleted: %s", event_id)
+        if self.cache is not None:
+            self.cache.remove(event_id)
+        return True
+
+    async def get_busy_intervals(self, start: datetime, end: datetime, calendar_ids: Optional[List[str]] = None) -> List[Tuple[datetime, datetime]]:
+        calendar_ids = list(calendar_ids or [self.calendar_id])
+
+        if self.cache is not None and calendar_ids == [self.calendar_id]:
+            try:
+                await self._sync_cache()
+            except CalendarApiError as error:
+                logger.warning("Event cache sync failed, querying free/busy instead: %s", error)
+            else:
+                return busy_from_events(self.cache.query(time_min=start, time_max=end), self.cache.day_zone)
+
+        chunks = [
+            calendar_ids[chunk_start:chunk_start + self.FREEBUSY_MAX_CALENDARS]
+            for chunk_start in range(0, len(calendar_ids), self.FREEBUSY_MAX_CALENDARS)
+        ]
+        try:
+            responses = await asyncio.gather(*(
+                self._request('POST', '/freeBusy', json={
+                    'timeMin': as_utc(start).isoformat(),
+                    'timeMax': as_utc(end).isoformat(),
+                    'items': [{'id': calendar_id} for calendar_id in chunk]
+                }, operation='calendar.freebusy.query', idempotent=True)
+                for chunk in chunks
+            ))
+        except CalendarApiError as error:
+            raise Exception(f"Failed to query free/busy: {error}")
+        return [interval for response in responses for interval in busy_from_freebusy(response)]
@@ -0,0 +1,196 @@
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, Optional
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+from ..helpers.Config import get_settings
+from .GoogleCalendarInterface import GoogleCalendarInterface
+from .CredentialStore import EncryptedCredentialStore, seconds_until_expiry
+
+logger = logging.getLogger(__name__)
+
+
+class CalendarNotConnected(Exception):
+    """The user has not connected a Google account yet"""
+
+
+def build_user_calendar(user_id: Hashable, credentials: Credentials) -> GoogleCalendarInterface:
+    """Provider for one user's credentials over the configured calendar ids"""
+    from .GoogleCalendar import GoogleCalendar
+    from .MultiCalendar import MultiCalendar
+
+    calendar_ids = get_settings().calendar_ids
+    calendar = GoogleCalendar.from_credentials(credentials, calendar_id=calendar_ids[0], quota_user=user_id)
+    if len(calendar_ids) == 1:
+        return calendar
+    return MultiCalendar([calendar] + [calendar.for_calendar(calendar_id) for calendar_id in calendar_ids[1:]])
+
+
+@dataclass
+class _Entry:
+    calendar: GoogleCalendarInterface
+    credentials: Credentials
+    lock: threading.Lock
+
+
+class CalendarRegistry:
+    """
+    Hands out one authenticated calendar provider per user. Providers are
+    built on first use from the user's stored credentials and kept in an
+    LRU of bounded size. A single background thread refreshes the tokens
+    of cached users shortly before they expire and writes them back to the
+    store, so no request waits for a refresh.
+    """
+
+    SCOPES = ['https://www.googleapis.com/auth/calendar']
+
+    def __init__(self, store: EncryptedCredentialStore, max_size: int = 256, factory: Callable[[Hashable, Credentials], GoogleCalendarInterface] = build_user_calendar, margin_seconds: float = 300, check_seconds: float = 60):
+        self.store = store
+        self.max_size = max_size
+        self.factory = factory
+        self.margin_seconds = margin_seconds
+        self.check_seconds = check_seconds
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._building: Dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.refreshes = 0
+
+    @classmethod
+    def from_settings(cls) -> "CalendarRegistry":
+        settings = get_settings()
+        store = EncryptedCredentialStore(settings.GOOGLE_CREDENTIALS_STORE_DIR, settings.GOOGLE_CREDENTIALS_KEY)
+        return cls(
+            store,
+            max_size=settings.CALENDAR_REGISTRY_SIZE,
+            margin_seconds=settings.GOOGLE_TOKEN_REFRESH_MARGIN_SECONDS
+        )
+
+    def _lookup(self, user_id: Hashable) -> Optional[_Entry]:
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            self._entries.move_to_end(user_id)
+        return entry
+
+    def get(self, user_id: Hashable) -> GoogleCalendarInterface:
+        """
+        The user's provider, built on first use. Blocks on the first call
+        for a user (store read and possibly a token refresh), so call it off
+        the event loop. Raises CalendarNotConnected for unknown users.
+        """
+        with self._lock:
+            entry = self._lookup(user_id)
+            if entry is not None:
+                self.hits += 1
+                return entry.calendar
+            # Concurrent first requests of one user build a single provider
+            building = self._building.setdefault(user_id, threading.Lock())
+
+        with building:
+            with self._lock:
+                entry = self._lookup(user_id)
+                if entry is not None:
+                    self.hits += 1
+                    return entry.calendar
+                self.misses += 1
+
+            try:
+                entry = self._build(user_id)
+            finally:
+                with self._lock:
+                    self._building.pop(user_id, None)
+
+            with self._lock:
+                self._entries[user_id] = entry
+                while len(self._entries) > self.max_size:
+                    _, evicted = self._entries.popitem(last=False)
+                    self.evictions += 1
+                    self._close(evicted)
+            return entry.calendar
+
+    def _build(self, user_id: Hashable) -> _Entry:
+        credentials = self.store.load(user_id, self.SCOPES)
+        if credentials is None:
+            raise CalendarNotConnected(f"User {user_id} has not connected a Google account")
+        if not credentials.valid:
+            if not credentials.refresh_token:
+                raise CalendarNotConnected(f"Stored credentials of user {user_id} expired and cannot be refreshed")
+            credentials.refresh(Request())
+            self.store.save(user_id, credentials)
+        return _Entry(calendar=self.factory(user_id, credentials), credentials=credentials, lock=threading.Lock())
+
+    def connect(self, user_id: Hashable, credentials: Credentials):
+        """Store new credentials for the user, replacing any cached provider"""
+        self.store.save(user_id, credentials)
+        self.evict(user_id)
+
+    def disconnect(self, user_id: Hashable) -> bool:
+        self.evict(user_id)
+        return self.store.delete(user_id)
+
+    def is_connected(self, user_id: Hashable) -> bool:
+        with self._lock:
+            if user_id in self._entries:
+                return True
+        return self.store.has(user_id)
+
+    def evict(self, user_id: Hashable):
+        with self._lock:
+            entry = self._entries.pop(user_id, None)
+        if entry is not None:
+            self._close(entry)
+
+    def _close(self, entry: _Entry):
+        close = getattr(entry.calendar, 'close', None)
+        if close is not None:
+            close()
+
+    def _refresh_due(self):
+        with self._lock:
+            entries = list(self._entries.items())
+        for user_id, entry in entries:
+            remaining = seconds_until_expiry(entry.credentials)
+            if remaining is None or remaining > self.margin_seconds or not entry.credentials.refresh_token:
+                continue
+            try:
+                with entry.lock:
+                    entry.credentials.refresh(Request())
+                    self.store.save(user_id, entry.credentials)
+                self.refreshes += 1
+            except Exception as e:
+                logger.warning("Background token refresh failed for user %s: %s", user_id, str(e))
+
+    def _run(self):
+        while not self._stop.wait(self.check_seconds):
+            self._refresh_due()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="calendar-registry-refresh", daemon=True)
+        self._thread.start()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "refreshes": self.refreshes
+            }
+
+    def close(self):
+        self._stop.set()
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+        for entry in entries:
+            self._close(entry)
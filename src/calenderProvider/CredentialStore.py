@@ -0,0 +1,159 @@
+import hashlib
+import logging
+import json
+import os
+import pickle
+import tempfile
+import threading
+from datetime import datetime, timezone
+from typing import List, Optional
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+from cryptography.fernet import Fernet, InvalidToken
+
+logger = logging.getLogger(__name__)
+
+
+def load_credentials(token_path: str, scopes: List[str]) -> Optional[Credentials]:
+    """
+    Load OAuth credentials stored as JSON. Tokens written by older versions
+    were pickled, those are read once and rewritten as JSON.
+    """
+    if not os.path.exists(token_path):
+        return None
+
+    try:
+        with open(token_path, 'r', encoding='utf-8') as token:
+            info = json.load(token)
+        return Credentials.from_authorized_user_info(info, scopes)
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        with open(token_path, 'rb') as token:
+            credentials = pickle.load(token)
+        logger.info("Migrating pickled token to JSON...")
+        save_credentials(token_path, credentials)
+        return credentials
+
+
+def save_credentials(token_path: str, credentials: Credentials):
+    # Write to a temp file and swap it in so a crash never leaves a half written token
+    directory = os.path.dirname(os.path.abspath(token_path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.token-', suffix='.json')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as token:
+            token.write(credentials.to_json())
+        os.replace(temp_path, token_path)
+    except Exception:
+        os.unlink(temp_path)
+        raise
+
+
+class EncryptedCredentialStore:
+    """
+    OAuth credentials of many users, one Fernet-encrypted file per user.
+    File names are a hash of the user id, so the directory listing does not
+    reveal who is connected. Generate a key with Fernet.generate_key().
+    """
+
+    def __init__(self, directory: str, key: str):
+        if not key:
+            raise ValueError("An encryption key is required for the credential store")
+        self.directory = directory
+        self.fernet = Fernet(key.encode() if isinstance(key, str) else key)
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+
+    def _path(self, user_id) -> str:
+        digest = hashlib.sha256(str(user_id).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, f"{digest}.token")
+
+    def has(self, user_id) -> bool:
+        return os.path.exists(self._path(user_id))
+
+    def load(self, user_id, scopes: List[str]) -> Optional[Credentials]:
+        path = self._path(user_id)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as token:
+            encrypted = token.read()
+        try:
+            info = json.loads(self.fernet.decrypt(encrypted))
+        except InvalidToken:
+            raise Exception(f"Stored credentials of user {user_id} cannot be decrypted with the configured key")
+        return Credentials.from_authorized_user_info(info, scopes)
+
+    def save(self, user_id, credentials: Credentials):
+        encrypted = self.fernet.encrypt(credentials.to_json().encode('utf-8'))
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix='.token-')
+        try:
+            with os.fdopen(fd, 'wb') as token:
+                token.write(encrypted)
+            os.replace(temp_path, self._path(user_id))
+        except Exception:
+            os.unlink(temp_path)
+            raise
+
+    def delete(self, user_id) -> bool:
+        try:
+            os.remove(self._path(user_id))
+            return True
+        except FileNotFoundError:
+            return False
+
+
+def seconds_until_expiry(credentials: Credentials) -> Optional[float]:
+    if credentials.expiry is None:
+        return None
+    # google-auth keeps expiry as a naive UTC datetime
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return (credentials.expiry - now).total_seconds()
+
+
+class CredentialRefresher:
+    """
+    Refreshes credentials in a background thread shortly before they expire,
+    so requests never pay for a token refresh.
+    """
+
+    def __init__(self, credentials: Credentials, token_path: Optional[str] = None, margin_seconds: float = 300, retry_seconds: float = 60):
+        self.credentials = credentials
+        self.token_path = token_path
+        self.margin_seconds = margin_seconds
+        self.retry_seconds = retry_seconds
+        self.lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def refresh(self):
+        with self.lock:
+            self.credentials.refresh(Request())
+            if self.token_path:
+                save_credentials(self.token_path, self.credentials)
+
+    def ensure_valid(self):
+        """Refresh now if the token is already expired, for callers that cannot wait"""
+        if not self.credentials.valid:
+            self.refresh()
+
+    def _next_delay(self) -> float:
+        remaining = seconds_until_expiry(self.credentials)
+        if remaining is None:
+            return self.retry_seconds
+        return max(0.0, remaining - self.margin_seconds)
+
+    def _run(self):
+        while not self._stop.wait(self._next_delay()):
+            try:
+                self.refresh()
+                logger.info("Google credentials refreshed in the background")
+            except Exception as e:
+                logger.warning("Background token refresh failed: %s", str(e))
+                if self._stop.wait(self.retry_seconds):
+                    return
+
+    def start(self):
+        if self._thread is not None or not self.credentials.refresh_token:
+            return
+        self._thread = threading.Thread(target=self._run, name="google-token-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,252 @@
+import heapq
+import logging
+import threading
+import time
+from datetime import datetime, timezone, tzinfo
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Set
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from ..helpers.Config import get_settings
+from .Recurrence import RecurringSeries
+
+logger = logging.getLogger(__name__)
+
+
+def calendar_zone(name: Optional[str] = None) -> tzinfo:
+    """The zone all-day dates are anchored in: the calendar's own, else the configured TIMEZONE"""
+    for candidate in (name, get_settings().TIMEZONE):
+        if candidate:
+            try:
+                return ZoneInfo(candidate)
+            except (ZoneInfoNotFoundError, ValueError):
+                pass
+    return timezone.utc
+
+
+def parse_event_time(value: dict, day_zone: Optional[tzinfo] = None) -> datetime:
+    """
+    Parse a Google start/end object into an aware datetime.
+    All-day events only carry a 'date', they start at midnight in `day_zone`
+    (the calendar's timezone), the configured TIMEZONE when it is not given.
+    """
+    if value.get('dateTime'):
+        parsed = datetime.fromisoformat(value['dateTime'])
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed
+    return datetime.fromisoformat(value['date']).replace(tzinfo=day_zone or calendar_zone())
+
+
+def as_utc(value: datetime) -> datetime:
+    # Naive filter datetimes have always been sent to Google as UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class EventCache:
+    """
+    Local mirror of one calendar, stored as raw Google event dicts.
+
+    The owner keeps it fresh with `events().list` incremental sync: a full
+    sync stores every event plus the returned `nextSyncToken`, later syncs
+    only apply the changes since that token. Entries are considered fresh for
+    `ttl_seconds` after the last sync. `version` goes up whenever the
+    stored events change, locally or through a sync.
+
+    Recurring events are kept as their master plus exceptions (instances
+    that were moved or cancelled), the way events().list returns them
+    without singleEvents. Queries expand the masters locally and only build
+    the occurrences that are actually returned.
+
+    All-day events are placed at midnight in the calendar's timezone, taken
+    from the `timeZone` of the list response on every sync.
+    """
+
+    def __init__(self, ttl_seconds: float = 30):
+        self.ttl_seconds = ttl_seconds
+        self.time_zone: Optional[tzinfo] = None
+        self.sync_token: Optional[str] = None
+        self.last_sync: float = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.syncs = 0
+        self.version = 0
+        self._events: Dict[str, dict] = {}
+        self._series: Dict[str, "RecurringSeries"] = {}
+        # Original start times of the moved or cancelled instances of each series
+        self._exceptions: Dict[str, Set[datetime]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._events) + len(self._series)
+
+    @property
+    def is_fresh(self) -> bool:
+        return self.sync_token is not None and time.monotonic() - self.last_sync < self.ttl_seconds
+
+    def _apply(self, items: Iterable[dict]):
+        changed = False
+        for item in items:
+            changed = True
+            self._apply_one(item)
+        if changed:
+            self.version += 1
+
+    def _apply_one(self, item: dict):
+        event_id = item['id']
+        series_id = item.get('recurringEventId')
+        if series_id and item.get('originalStartTime'):
+            self._exceptions.setdefault(series_id, set()).add(self._parse(item['originalStartTime']))
+
+        if item.get('status') == 'cancelled':
+            self._events.pop(event_id, None)
+            if self._series.pop(event_id, None) is not None:
+                self._forget_series(event_id)
+            return
+
+        if item.get('recurrence'):
+            try:
+                self._series[event_id] = RecurringSeries(item, self.day_zone)
+                self._events.pop(event_id, None)
+                return
+            except (ValueError, KeyError, TypeError) as error:
+                logger.warning("Cannot expand recurring event %s, keeping it as a single event: %s", event_id, error)
+        self._series.pop(event_id, None)
+        self._events[event_id] = item
+
+    @property
+    def day_zone(self) -> tzinfo:
+        return self.time_zone or calendar_zone()
+
+    def _parse(self, value: dict) -> datetime:
+        return parse_event_time(value, self.day_zone)
+
+    def _set_zone(self, time_zone: Optional[str]) -> bool:
+        """Adopt the calendar's timezone, True when it changed"""
+        if not time_zone:
+            return False
+        zone = calendar_zone(time_zone)
+        changed = zone != self.time_zone
+        self.time_zone = zone
+        return changed
+
+    def _forget_series(self, series_id: str):
+        self._exceptions.pop(series_id, None)
+        for event_id in [event_id for event_id, item in self._events.items() if item.get('recurringEventId') == series_id]:
+            del self._events[event_id]
+
+    def replace(self, items: Iterable[dict], sync_token: Optional[str], time_zone: Optional[str] = None):
+        with self._lock:
+            self._set_zone(time_zone)
+            self._events = {}
+            self._series = {}
+            self._exceptions = {}
+            self.version += 1
+            self._apply(items)
+            self._mark_synced(sync_token)
+
+    def update(self, items: Iterable[dict], sync_token: Optional[str], time_zone: Optional[str] = None):
+        with self._lock:
+            self._apply(items)
+            # All-day events were anchored in the old zone, the next read does a full sync
+            self._mark_synced(None if self._set_zone(time_zone) else sync_token)
+
+    def _mark_synced(self, sync_token: Optional[str]):
+        self.sync_token = sync_token
+        self.last_sync = time.monotonic()
+        self.syncs += 1
+
+    def invalidate(self):
+        """Forget the sync token so the next read does a full sync"""
+        with self._lock:
+            self.sync_token = None
+            self._events = {}
+            self._series = {}
+            self._exceptions = {}
+            self.version += 1
+
+    def put(self, item: dict):
+        with self._lock:
+            self._apply([item])
+
+    def remove(self, event_id: str):
+        """Forget a deleted event, deleting a series deletes all of it and deleting an instance cancels it"""
+        with self._lock:
+            if self._events.pop(event_id, None) is not None:
+                self.version += 1
+            if self._series.pop(event_id, None) is not None:
+                self._forget_series(event_id)
+                self.version += 1
+                return
+            instance = self._occurrence(event_id)
+            if instance is not None:
+                self._exceptions.setdefault(instance['recurringEventId'], set()).add(self._parse(instance['start']))
+                self.version += 1
+
+    def _occurrence(self, event_id: str) -> Optional[dict]:
+        """Build an instance of a cached series from its id"""
+        series = self._series.get(event_id.rpartition('_')[0])
+        if series is None:
+            return None
+        return series.occurrence(event_id, self._exceptions.get(series.id, ()))
+
+    def get(self, event_id: str) -> Optional[dict]:
+        with self._lock:
+            item = self._events.get(event_id)
+            if item is None:
+                series = self._series.get(event_id)
+                item = series.master if series is not None else self._occurrence(event_id)
+            if item is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return item
+
+    def query(self, time_min: Optional[datetime] = None, time_max: Optional[datetime] = None, search_query: Optional[str] = None, limit: Optional[int] = None) -> List[dict]:
+        """
+        Same semantics as events().list: an event matches when it ends after
+        time_min and starts before time_max. The search is a case-insensitive
+        substring match on title, description and location.
+        """
+        time_min = as_utc(time_min) if time_min else None
+        time_max = as_utc(time_max) if time_max else None
+        needle = search_query.lower() if search_query else None
+
+        with self._lock:
+            matches = []
+            for item in self._events.values():
+                if time_min and self._parse(item['end']) <= time_min:
+                    continue
+                if time_max and self._parse(item['start']) >= time_max:
+                    continue
+                if needle:
+                    haystack = " ".join(item.get(key) or "" for key in ('summary', 'description', 'location'))
+                    if needle not in haystack.lower():
+                        continue
+                matches.append(item)
+            series = [
+                (recurring, frozenset(self._exceptions.get(series_id, ())))
+                for series_id, recurring in self._series.items()
+                if not needle or recurring.matches(needle)
+            ]
+            self.hits += 1
+            day_zone = self.day_zone
+
+        matches.sort(key=lambda item: parse_event_time(item['start'], day_zone))
+        if not series:
+            return matches[:limit] if limit else matches
+        # Each series yields its occurrences in order, merging stops once the limit is reached
+        streams = [matches] + [recurring.occurrences(time_min, time_max, skip) for recurring, skip in series]
+        merged = heapq.merge(*streams, key=lambda item: parse_event_time(item['start'], day_zone))
+        return list(islice(merged, limit)) if limit else list(merged)
+
+    def stats(self) -> dict:
+        return {
+            'events': len(self._events),
+            'series': len(self._series),
+            'hits': self.hits,
+            'misses': self.misses,
+            'syncs': self.syncs,
+            'fresh': self.is_fresh
+        }
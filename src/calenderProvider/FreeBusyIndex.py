@@ -0,0 +1,123 @@
+from bisect import bisect_right
+from datetime import datetime, time, timedelta, timezone, tzinfo
+from typing import Collection, Iterable, Iterator, List, Optional, Tuple
+from ..helpers.Config import get_timezone
+from .EventCache import parse_event_time
+
+Interval = Tuple[datetime, datetime]
+
+WEEKDAYS = frozenset(range(5))
+
+
+def _to_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    """Sort intervals by start and merge the ones that overlap or touch"""
+    merged: List[List[datetime]] = []
+    for start, end in sorted((_to_utc(s), _to_utc(e)) for s, e in intervals):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def busy_from_events(items: Iterable[dict], day_zone: Optional[tzinfo] = None) -> List[Interval]:
+    """
+    Busy intervals of raw Google events, events marked as free are skipped.
+    All-day events block their whole day in `day_zone`, the calendar's timezone.
+    """
+    return [
+        (parse_event_time(item['start'], day_zone), parse_event_time(item['end'], day_zone))
+        for item in items
+        if item.get('transparency') != 'transparent'
+    ]
+
+
+def busy_from_freebusy(response: dict) -> List[Interval]:
+    """Busy intervals of every calendar in a freebusy.query response"""
+    busy = []
+    for calendar_id, calendar in response.get('calendars', {}).items():
+        errors = calendar.get('errors')
+        if errors:
+            reasons = ", ".join(error.get('reason', 'unknown') for error in errors)
+            raise Exception(f"Free/busy unavailable for {calendar_id}: {reasons}")
+        busy.extend(
+            (parse_event_time({'dateTime': block['start']}), parse_event_time({'dateTime': block['end']}))
+            for block in calendar.get('busy', [])
+        )
+    return busy
+
+
+class FreeBusyIndex:
+    """
+    Busy time of one or more calendars, merged into two sorted arrays of
+    starts and ends. Overlap checks and gap searches are a binary search plus
+    a walk over the busy blocks inside the window, so scanning weeks of
+    calendars for free time never touches the LLM.
+    """
+
+    def __init__(self, busy: Iterable[Interval] = ()):
+        merged = merge_intervals(busy)
+        self.starts = [start for start, _ in merged]
+        self.ends = [end for _, end in merged]
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def is_free(self, start: datetime, end: datetime) -> bool:
+        start, end = _to_utc(start), _to_utc(end)
+        # First busy block that ends after start is the only one that can overlap first
+        i = bisect_right(self.ends, start)
+        return i == len(self.starts) or self.starts[i] >= end
+
+    def gaps(self, start: datetime, end: datetime) -> Iterator[Interval]:
+        """Free intervals between start and end, in order"""
+        cursor, end = _to_utc(start), _to_utc(end)
+        i = bisect_right(self.ends, cursor)
+        while i < len(self.starts) and self.starts[i] < end:
+            if self.starts[i] > cursor:
+                yield cursor, self.starts[i]
+            cursor = max(cursor, self.ends[i])
+            i += 1
+        if cursor < end:
+            yield cursor, end
+
+    def free_slots(
+        self,
+        start: datetime,
+        end: datetime,
+        duration: timedelta,
+        tz: str = "UTC",
+        day_start: time = time(9),
+        day_end: time = time(17),
+        days: Optional[Collection[int]] = WEEKDAYS,
+        limit: Optional[int] = None
+    ) -> List[Interval]:
+        """
+        Free intervals of at least `duration` inside working hours
+        (`day_start` to `day_end` in `tz`, on the weekdays in `days`, None
+        for every day). Each result is a whole gap, returned in `tz`.
+        """
+        zone = get_timezone(tz)
+        start, end = _to_utc(start), _to_utc(end)
+        slots: List[Interval] = []
+        day = start.astimezone(zone).date()
+        last_day = end.astimezone(zone).date()
+        while day <= last_day:
+            if days is None or day.weekday() in days:
+                window_start = max(start, zone.localize(datetime.combine(day, day_start)))
+                window_end = min(end, zone.localize(datetime.combine(day, day_end)))
+                for gap_start, gap_end in self.gaps(window_start, window_end):
+                    if gap_end - gap_start >= duration:
+                        slots.append((gap_start.astimezone(zone), gap_end.astimezone(zone)))
+                        if limit and len(slots) >= limit:
+                            return slots
+            day += timedelta(days=1)
+        return slots
@@ -1,25 +1,111 @@
+import json
+import logging
 import os
-import pickle
-from typing import List, Optional
-from datetime import datetime, timezone
+import threading
+import time
+from functools import lru_cache, partial
+from typing import Hashable, Iterator, List, Optional, Tuple
+from datetime import datetime
+import httplib2
 from google.auth.transport.requests import Request
+from google_auth_httplib2 import AuthorizedHttp
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
 from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpRequest
 from ..helpers.Config import get_settings
+from ..helpers.Telemetry import GOOGLE_SECONDS, span
 from .GoogleCalendarInterface import (
     GoogleCalendarInterface,
     CalendarEvent,
     EventFilters,
-    EventDateTime
+    EventPatch,
+    BatchItemResult
 )
+from .EventCache import EventCache, as_utc
+from .FreeBusyIndex import busy_from_events, busy_from_freebusy
+from .CredentialStore import CredentialRefresher, load_credentials, save_credentials
+from .RequestScheduler import RequestScheduler, RetryHint, get_scheduler, parse_retry_after, retry_hint
+
+logger = logging.getLogger(__name__)
+
+
+# Raw connections of each worker thread, shared by every provider in the process
+_transport = threading.local()
+
+
+@lru_cache(maxsize=1)
+def _discovery_document() -> dict:
+    """
+    The Calendar API description bundled with the client library, parsed
+    once and shared by all services instead of once per user.
+    """
+    return json.loads(get_static_doc('calendar', 'v3'))
+
+
+def http_error_hint(error: Exception, idempotent: bool = True) -> Optional[RetryHint]:
+    if not isinstance(error, HttpError):
+        return None
+    try:
+        reasons = [detail.get('reason') for detail in json.loads(error.content)['error'].get('errors', [])]
+    except (ValueError, KeyError, TypeError, AttributeError):
+        reasons = []
+    return retry_hint(error.resp.status, reasons, parse_retry_after(error.resp.get('retry-after')), idempotent)
+
+
+def is_idempotent(request: HttpRequest) -> bool:
+    """
+    Whether the request may be sent again after a server error. An insert
+    may have gone through, and a conditional change that did would fail
+    its own If-Match on the second try with a false conflict.
+    """
+    return request.method != 'POST' and 'If-Match' not in request.headers
+
+
+class TimedHttpRequest(HttpRequest):
+    """
+    HttpRequest that goes through the request scheduler and records the
+    duration of every API call it executes
+    """
+
+    scheduler: Optional[RequestScheduler] = None
+    quota_user: Hashable = None
+
+    def _execute_timed(self, *args, **kwargs):
+        with span("google_request", GOOGLE_SECONDS, operation=self.methodId or "unknown") as labels:
+            try:
+                return super().execute(*args, **kwargs)
+            except HttpError as error:
+                labels["status"] = str(error.resp.status)
+                raise
+
+    def execute(self, *args, **kwargs):
+        if self.scheduler is None:
+            return self._execute_timed(*args, **kwargs)
+        # Identical reads of one account share a single response
+        coalesce_key = (self.quota_user, self.uri) if self.method == 'GET' else None
+        return self.scheduler.call(
+            self.quota_user,
+            lambda: self._execute_timed(*args, **kwargs),
+            classify=partial(http_error_hint, idempotent=is_idempotent(self)),
+            operation=self.methodId or "unknown",
+            coalesce_key=coalesce_key
+        )
 
 class GoogleCalendar(GoogleCalendarInterface):
 
     SCOPES = ['https://www.googleapis.com/auth/calendar']
+    MAX_PAGE_SIZE = 2500
+    # Google rejects batches with more than 50 calls
+    MAX_BATCH_SIZE = 50
+    # Only the parts of an event we actually read, keeps list payloads small
+    EVENT_FIELDS = "id,etag,status,summary,description,location,start,end,htmlLink,recurrence,recurringEventId,originalStartTime,transparency,iCalUID"
+    # freebusy.query accepts at most this many calendars per request
+    FREEBUSY_MAX_CALENDARS = 50
 
-    def __init__(self, credentials_path: str = 'credentials.json', token_path: str = 'token.json', calendar_id: str = 'primary'):
+    def __init__(self, credentials_path: str = 'credentials.json', token_path: str = 'token.json', calendar_id: str = 'primary', cache_ttl_seconds: Optional[float] = None):
         settings = get_settings()
         self.credentials_path = settings.GOOGLE_CALENDAR_CREDENTIALS_PATH
         self.token_path = settings.GOOGLE_CALENDAR_TOKEN_PATH
@@ -27,16 +113,25 @@ class GoogleCalendar(GoogleCalendarInterface):
         self.credentials: Optional[Credentials] = None
         self.service = None
         self.is_authenticated = False
+
+        if cache_ttl_seconds is None:
+            cache_ttl_seconds = settings.CALENDAR_CACHE_TTL_SECONDS
+        self.cache: Optional[EventCache] = EventCache(cache_ttl_seconds) if cache_ttl_seconds > 0 else None
+        self._sync_lock = threading.Lock()
+        self._local = threading.local()
+        self.refresh_margin_seconds = settings.GOOGLE_TOKEN_REFRESH_MARGIN_SECONDS
+        self.refresher: Optional[CredentialRefresher] = None
+        # Names the Google account for quota pacing, one per registry user
+        self.quota_user: Hashable = "default"
+        self.scheduler = get_scheduler()
     
     def authenticate(self) -> bool:
         try:
-            if os.path.exists(self.token_path):
-                with open(self.token_path, 'rb') as token:
-                    self.credentials = pickle.load(token)
+            self.credentials = load_credentials(self.token_path, self.SCOPES)
             
             if not self.credentials or not self.credentials.valid:
                 if self.credentials and self.credentials.expired and self.credentials.refresh_token:
-                    print("Refreshing expired credentials...")
+                    logger.info("Refreshing expired credentials...")
                     self.credentials.refresh(Request())
                 else:
                     if not os.path.exists(self.credentials_path):
@@ -45,7 +140,7 @@ class GoogleCalendar(GoogleCalendarInterface):
                             "Get it from: https://console.cloud.google.com/apis/credentials"
                         )
                     
-                    print("Starting OAuth2 authentication flow...")
+                    logger.info("Starting OAuth2 authentication flow...")
                     flow = InstalledAppFlow.from_client_secrets_file(
                         self.credentials_path, 
                         self.SCOPES
@@ -53,19 +148,82 @@ class GoogleCalendar(GoogleCalendarInterface):
                     self.credentials = flow.run_local_server(port=0)
                 
                 # Save credentials for next time
-                with open(self.token_path, 'wb') as token:
-                    pickle.dump(self.credentials, token)
+                save_credentials(self.token_path, self.credentials)
+
+            self.service = self._build_service()
+
+            if self.refresher is not None:
+                self.refresher.stop()
+            self.refresher = CredentialRefresher(
+                self.credentials,
+                token_path=self.token_path,
+                margin_seconds=self.refresh_margin_seconds
+            )
+            self.refresher.start()
 
-            self.service = build('calendar', 'v3', credentials=self.credentials)
             self.is_authenticated = True
-            print("Successfully authenticated with Google Calendar!")
+            logger.info("Successfully authenticated with Google Calendar!")
             return True
             
         except Exception as e:
-            print(f"Authentication failed: {str(e)}")
+            logger.error("Authentication failed: %s", str(e))
             self.is_authenticated = False
             return False
         
+    @classmethod
+    def from_credentials(cls, credentials: Credentials, calendar_id: str = 'primary', cache_ttl_seconds: Optional[float] = None, quota_user: Hashable = "default") -> "GoogleCalendar":
+        """
+        Provider for credentials the caller owns, e.g. one user of a
+        CalendarRegistry. No token file is written and no refresher is
+        started, refreshing is the owner's job.
+        """
+        provider = cls(calendar_id=calendar_id, cache_ttl_seconds=cache_ttl_seconds)
+        provider.credentials = credentials
+        provider.token_path = None
+        provider.quota_user = quota_user
+        provider.service = provider._build_service()
+        provider.is_authenticated = True
+        return provider
+
+    def _build_service(self):
+        # The discovery document bundled with the client library is used, no network fetch at startup
+        return build_from_document(
+            _discovery_document(),
+            credentials=self.credentials,
+            requestBuilder=self._build_request
+        )
+
+    def for_calendar(self, calendar_id: str) -> "GoogleCalendar":
+        """
+        Provider for another calendar of the same account. It shares this
+        provider's credentials and connections and keeps its own event cache.
+        """
+        self._ensure_authenticated()
+        other = GoogleCalendar(
+            calendar_id=calendar_id,
+            cache_ttl_seconds=self.cache.ttl_seconds if self.cache is not None else 0
+        )
+        other.credentials = self.credentials
+        other.service = self.service
+        other.quota_user = self.quota_user
+        other.is_authenticated = True
+        return other
+
+    def _build_request(self, http, *args, **kwargs) -> HttpRequest:
+        # httplib2.Http is not thread safe, every worker thread keeps its own connection.
+        # Providers of different users share it and only wrap it with their credentials.
+        thread_http = getattr(self._local, 'http', None)
+        if thread_http is None:
+            raw_http = getattr(_transport, 'http', None)
+            if raw_http is None:
+                raw_http = _transport.http = httplib2.Http()
+            thread_http = AuthorizedHttp(self.credentials, http=raw_http)
+            self._local.http = thread_http
+        request = TimedHttpRequest(thread_http, *args, **kwargs)
+        request.scheduler = self.scheduler
+        request.quota_user = self.quota_user
+        return request
+
     def _ensure_authenticated(self):
         if not self.is_authenticated or not self.service:
             raise Exception(
@@ -73,6 +231,79 @@ class GoogleCalendar(GoogleCalendarInterface):
             )
         
     
+    def _paginate(self, query_params: dict, limit: Optional[int] = None) -> Iterator[dict]:
+        """
+        Yield raw events().list pages, following nextPageToken lazily.
+        With a limit, each request only asks for as many events as are still needed.
+        """
+        query_params = dict(query_params)
+        while True:
+            query_params['maxResults'] = min(self.MAX_PAGE_SIZE, limit) if limit else self.MAX_PAGE_SIZE
+            page = self.service.events().list(**query_params).execute()
+            yield page
+            if limit:
+                limit -= len(page.get('items', []))
+                if limit <= 0:
+                    return
+            page_token = page.get('nextPageToken')
+            if not page_token:
+                return
+            query_params['pageToken'] = page_token
+
+    def _fetch_sync_pages(self, **params) -> Tuple[List[dict], Optional[str], Optional[str]]:
+        query_params = {
+            'calendarId': self.calendar_id,
+            # Recurring events come as one master plus their exceptions, the cache expands them
+            'singleEvents': False,
+            'fields': f"nextPageToken,nextSyncToken,timeZone,items({self.EVENT_FIELDS})",
+            **params
+        }
+        items = []
+        page = {}
+        for page in self._paginate(query_params):
+            items.extend(page.get('items', []))
+        # Google only returns the sync token on the last page
+        return items, page.get('nextSyncToken'), page.get('timeZone')
+
+    def _sync_cache(self):
+        """
+        Bring the event cache up to date: an incremental sync when we hold a
+        sync token, a full sync otherwise or when Google expired the token.
+        """
+        if self.cache is None or self.cache.is_fresh:
+            return
+
+        with self._sync_lock:
+            if self.cache.is_fresh:
+                return
+
+            if self.cache.sync_token:
+                try:
+                    items, sync_token, time_zone = self._fetch_sync_pages(syncToken=self.cache.sync_token)
+                    self.cache.update(items, sync_token, time_zone)
+                    return
+                except HttpError as error:
+                    if error.resp.status != 410:
+                        raise
+                    logger.info("Sync token expired, running a full sync...")
+
+            items, sync_token, time_zone = self._fetch_sync_pages()
+            self.cache.replace(items, sync_token, time_zone)
+            logger.debug("Event cache synced: %s events", len(self.cache))
+
+    def calendar_version(self) -> Optional[Hashable]:
+        if self.cache is None:
+            return None
+        self._ensure_authenticated()
+        # Free while the cache is fresh, one incremental sync otherwise
+        self._sync_cache()
+        return self.cache.version
+
+    def cache_stats(self) -> dict:
+        if self.cache is None:
+            return {'enabled': False}
+        return {'enabled': True, **self.cache.stats()}
+
     def _calendar_event_to_google_format(self, event: CalendarEvent) -> dict:
         """
         Convert our CalendarEvent to Google Calendar API format.
@@ -89,9 +320,13 @@ class GoogleCalendar(GoogleCalendarInterface):
         return event.model_dump(
             by_alias=True,
             exclude_unset=True,
-            exclude={'id'},
+            exclude={'id', 'etag', 'ical_uid', 'recurring_event_id', 'original_start_time'},
             mode='json'
         )
+
+    def _patch_to_google_format(self, patch: EventPatch) -> dict:
+
+        return patch.model_dump(by_alias=True, exclude_unset=True, mode='json')
     
     def _google_format_to_calendar_event(self, google_event: dict) -> CalendarEvent:
         
@@ -111,7 +346,9 @@ class GoogleCalendar(GoogleCalendarInterface):
                 body=google_event
             ).execute()
             
-            print(f"✅ Event created: {created_event.get('htmlLink')}")
+            logger.info("Event created: %s", created_event.get('htmlLink'))
+            if self.cache is not None:
+                self.cache.put(created_event)
             
             # Convert back to CalendarEvent
             return self._google_format_to_calendar_event(created_event)
@@ -122,12 +359,23 @@ class GoogleCalendar(GoogleCalendarInterface):
     def get_event(self, event_id: str) -> CalendarEvent:
         
         self._ensure_authenticated()
+
+        if self.cache is not None:
+            try:
+                self._sync_cache()
+            except HttpError as error:
+                logger.warning("Event cache sync failed: %s", error)
+            cached_event = self.cache.get(event_id)
+            if cached_event is not None:
+                return self._google_format_to_calendar_event(cached_event)
         
         try:
             google_event = self.service.events().get(
                 calendarId=self.calendar_id,
                 eventId=event_id
             ).execute()
+            if self.cache is not None:
+                self.cache.put(google_event)
             
             return self._google_format_to_calendar_event(google_event)
             
@@ -136,44 +384,60 @@ class GoogleCalendar(GoogleCalendarInterface):
                 raise Exception(f"Event not found: {event_id}")
             raise Exception(f"Failed to get event: {error}")
     
-    def list_events(self, filters: EventFilters) -> List[CalendarEvent]:
-        
+    def iter_events(self, filters: EventFilters) -> Iterator[CalendarEvent]:
+        """
+        Lazily yield events matching the filters in start time order.
+        Pages are only fetched as the caller consumes them, so stopping early
+        never pays for pages that are not needed.
+        """
         self._ensure_authenticated()
-        
+
+        if self.cache is not None:
+            try:
+                self._sync_cache()
+                cached_events = self.cache.query(
+                    time_min=filters.start_date,
+                    time_max=filters.end_date,
+                    search_query=filters.search_query,
+                    limit=filters.max_results
+                )
+            except HttpError as error:
+                logger.warning("Event cache sync failed, querying Google directly: %s", error)
+            else:
+                for event in cached_events:
+                    yield self._google_format_to_calendar_event(event)
+                return
+
+        query_params = {
+            'calendarId': self.calendar_id,
+            'singleEvents': True,  # Expand recurring events
+            'orderBy': 'startTime',
+            'fields': f"nextPageToken,items({self.EVENT_FIELDS})"
+        }
+        if filters.start_date:
+            query_params['timeMin'] = as_utc(filters.start_date).isoformat()
+        if filters.end_date:
+            query_params['timeMax'] = as_utc(filters.end_date).isoformat()
+        if filters.search_query:
+            query_params['q'] = filters.search_query
+
+        remaining = filters.max_results
         try:
-            # Build query parameters
-            query_params = {
-                'calendarId': self.calendar_id,
-                'maxResults': filters.max_results,
-                'singleEvents': True,  # Expand recurring events
-                'orderBy': 'startTime'
-            }
-            
-            # Add time range filters
-            if filters.start_date:
-                query_params['timeMin'] = filters.start_date.isoformat() + 'Z'
-            if filters.end_date:
-                query_params['timeMax'] = filters.end_date.isoformat() + 'Z'
-            
-            # Add search query
-            if filters.search_query:
-                query_params['q'] = filters.search_query
-            
-            # Execute API call
-            events_result = self.service.events().list(**query_params).execute()
-            google_events = events_result.get('items', [])
-            
-            # Convert to CalendarEvent list
-            calendar_events = [
-                self._google_format_to_calendar_event(event) 
-                for event in google_events
-            ]
-            
-            print(f"Found {len(calendar_events)} events")
-            return calendar_events
-            
+            for page in self._paginate(query_params, limit=remaining):
+                for event in page.get('items', []):
+                    yield self._google_format_to_calendar_event(event)
+                    if remaining is not None:
+                        remaining -= 1
+                        if remaining == 0:
+                            return
         except HttpError as error:
             raise Exception(f"Failed to list events: {error}")
+
+    def list_events(self, filters: EventFilters) -> List[CalendarEvent]:
+
+        calendar_events = list(self.iter_events(filters))
+        logger.debug("Found %s events", len(calendar_events))
+        return calendar_events
     
     def update_event(self, event_id: str, event: CalendarEvent) -> CalendarEvent:
         
@@ -188,7 +452,9 @@ class GoogleCalendar(GoogleCalendarInterface):
                 body=google_event
             ).execute()
             
-            print(f"Event updated: {updated_event.get('htmlLink')}")
+            logger.info("Event updated: %s", updated_event.get('htmlLink'))
+            if self.cache is not None:
+                self.cache.put(updated_event)
             
             return self._google_format_to_calendar_event(updated_event)
             
@@ -197,6 +463,36 @@ class GoogleCalendar(GoogleCalendarInterface):
                 raise Exception(f"Event not found: {event_id}")
             raise Exception(f"Failed to update event: {error}")
     
+    def patch_event(self, event_id: str, patch: EventPatch, etag: Optional[str] = None) -> CalendarEvent:
+        
+        self._ensure_authenticated()
+        
+        try:
+            request = self.service.events().patch(
+                calendarId=self.calendar_id,
+                eventId=event_id,
+                body=self._patch_to_google_format(patch)
+            )
+            if etag:
+                request.headers['If-Match'] = etag
+            patched_event = request.execute()
+            
+            logger.info("Event patched: %s", patched_event.get('htmlLink'))
+            if self.cache is not None:
+                self.cache.put(patched_event)
+            
+            return self._google_format_to_calendar_event(patched_event)
+            
+        except HttpError as error:
+            if error.resp.status == 404:
+                raise Exception(f"Event not found: {event_id}")
+            if error.resp.status == 412:
+                # Our copy is stale, make sure the next read fetches the current version
+                if self.cache is not None:
+                    self.cache.remove(event_id)
+                raise Exception(f"Event {event_id} was changed since it was last read")
+            raise Exception(f"Failed to patch event: {error}")
+    
     def delete_event(self, event_id: str) -> bool:
         
         self._ensure_authenticated()
@@ -207,10 +503,171 @@ class GoogleCalendar(GoogleCalendarInterface):
                 eventId=event_id
             ).execute()
             
-            print(f"✅ Event deleted: {event_id}")
+            logger.info("Event deleted: %s", event_id)
+            if self.cache is not None:
+                self.cache.remove(event_id)
             return True
             
         except HttpError as error:
             if error.resp.status == 404:
                 raise Exception(f"Event not found: {event_id}")
-            raise Exception(f"Failed to delete event: {error}")
\ No newline at end of file
+            raise Exception(f"Failed to delete event: {error}")
+
+    def get_busy_intervals(self, start: datetime, end: datetime, calendar_ids: Optional[List[str]] = None) -> List[Tuple[datetime, datetime]]:
+        """
+        Busy time of one or more calendars. This calendar alone is answered
+        from the synced event cache, anything else goes to freebusy.query,
+        which only returns busy blocks instead of full events.
+        """
+        self._ensure_authenticated()
+        calendar_ids = list(calendar_ids or [self.calendar_id])
+
+        if self.cache is not None and calendar_ids == [self.calendar_id]:
+            try:
+                self._sync_cache()
+            except HttpError as error:
+                logger.warning("Event cache sync failed, querying free/busy instead: %s", error)
+            else:
+                return busy_from_events(self.cache.query(time_min=start, time_max=end), self.cache.day_zone)
+
+        busy = []
+        try:
+            for chunk_start in range(0, len(calendar_ids), self.FREEBUSY_MAX_CALENDARS):
+                chunk = calendar_ids[chunk_start:chunk_start + self.FREEBUSY_MAX_CALENDARS]
+                response = self.service.freebusy().query(body={
+                    'timeMin': as_utc(start).isoformat(),
+                    'timeMax': as_utc(end).isoformat(),
+                    'items': [{'id': calendar_id} for calendar_id in chunk]
+                }).execute()
+                busy.extend(busy_from_freebusy(response))
+        except HttpError as error:
+            raise Exception(f"Failed to query free/busy: {error}")
+        return busy
+
+    def _run_batch(self, requests: list, event_ids: List[Optional[str]], deleting: bool = False) -> List[BatchItemResult]:
+        """
+        Send prepared API requests through HTTP batch requests, one round trip
+        per MAX_BATCH_SIZE calls, and collect a result for every item in order.
+        """
+        results: List[Optional[BatchItemResult]] = [None] * len(requests)
+        # Items Google rate limited (or failed with a server error) in this round, sent again in the next
+        retry: List[Tuple[int, RetryHint]] = []
+        attempt = 0
+
+        def callback(request_id, response, exception):
+            index = int(request_id)
+            event_id = event_ids[index]
+            if exception is not None:
+                hint = http_error_hint(exception, idempotent=is_idempotent(requests[index]))
+                if hint is not None and attempt < self.scheduler.max_retries:
+                    retry.append((index, hint))
+                    return
+                status = exception.resp.status if isinstance(exception, HttpError) else None
+                if status == 404:
+                    error = f"Event not found: {event_id}"
+                elif status == 412:
+                    # Only this item conflicts, our copy of it is stale
+                    if self.cache is not None:
+                        self.cache.remove(event_id)
+                    error = f"Event {event_id} was changed since it was last read"
+                else:
+                    error = str(exception)
+                results[index] = BatchItemResult(index=index, success=False, event_id=event_id, error=error)
+            elif deleting:
+                if self.cache is not None:
+                    self.cache.remove(event_id)
+                results[index] = BatchItemResult(index=index, success=True, event_id=event_id)
+            else:
+                if self.cache is not None:
+                    self.cache.put(response)
+                event = self._google_format_to_calendar_event(response)
+                results[index] = BatchItemResult(index=index, success=True, event_id=event.id, event=event)
+
+        def send(batch):
+            with span("google_request", GOOGLE_SECONDS, operation="batch"):
+                batch.execute()
+
+        pending = list(range(len(requests)))
+        try:
+            while pending:
+                retry.clear()
+                for chunk_start in range(0, len(pending), self.MAX_BATCH_SIZE):
+                    chunk = pending[chunk_start:chunk_start + self.MAX_BATCH_SIZE]
+                    batch = self.service.new_batch_http_request(callback=callback)
+                    for index in chunk:
+                        batch.add(requests[index], request_id=str(index))
+                    # A failed envelope may still have committed inserts or conditional changes, resending those is not safe
+                    idempotent = all(is_idempotent(requests[index]) for index in chunk)
+                    # Every call inside a batch counts against the quota
+                    self.scheduler.call(
+                        self.quota_user,
+                        partial(send, batch),
+                        classify=partial(http_error_hint, idempotent=idempotent),
+                        operation="batch",
+                        cost=len(chunk)
+                    )
+                if not retry:
+                    break
+                # One wait for the whole round, as long as the most demanding item asks for
+                hint = max((hint for _, hint in retry), key=lambda hint: hint.retry_after or 0)
+                time.sleep(self.scheduler.retry_delay(self.quota_user, hint, attempt, "batch"))
+                pending = sorted(index for index, _ in retry)
+                attempt += 1
+        except HttpError as error:
+            raise Exception(f"Failed to run batch request: {error}")
+
+        logger.debug("Batch finished: %s/%s succeeded", sum(1 for r in results if r and r.success), len(results))
+        return results
+
+    def add_events(self, events: List[CalendarEvent]) -> List[BatchItemResult]:
+
+        self._ensure_authenticated()
+
+        requests = [
+            self.service.events().insert(
+                calendarId=self.calendar_id,
+                body=self._calendar_event_to_google_format(event)
+            )
+            for event in events
+        ]
+        return self._run_batch(requests, [None] * len(events))
+
+    def update_events(self, events: List[CalendarEvent]) -> List[BatchItemResult]:
+
+        self._ensure_authenticated()
+
+        requests = [
+            self.service.events().update(
+                calendarId=self.calendar_id,
+                eventId=event.id,
+                body=self._calendar_event_to_google_format(event)
+            )
+            for event in events
+        ]
+        return self._run_batch(requests, [event.id for event in events])
+
+    def patch_events(self, patches: List[Tuple[str, EventPatch, Optional[str]]]) -> List[BatchItemResult]:
+
+        self._ensure_authenticated()
+
+        requests = []
+        for event_id, patch, etag in patches:
+            request = self.service.events().patch(
+                calendarId=self.calendar_id,
+                eventId=event_id,
+                body=self._patch_to_google_format(patch)
+            )
+            if etag:
+                request.headers['If-Match'] = etag
+            requests.append(request)
+        return self._run_batch(requests, [event_id for event_id, _, _ in patches])
+
+    def delete_events(self, event_ids: List[str]) -> List[BatchItemResult]:
+
+        self._ensure_authenticated()
+
+        requests = [
+            self.service.events().delete(calendarId=self.calendar_id, eventId=event_id)
+            for event_id in event_ids
+        ]
+        return self._run_batch(requests, list(event_ids), deleting=True)
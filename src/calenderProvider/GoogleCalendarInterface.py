@@ -1,11 +1,15 @@
+import asyncio
 from abc import ABC, abstractmethod
-from datetime import datetime
-from typing import List, Optional
-from pydantic import BaseModel, ConfigDict, Field, field_validator
+from datetime import date, datetime, time, tzinfo
+from typing import AsyncIterator, Awaitable, Hashable, Iterator, List, Optional, Tuple
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+from ..helpers.Config import get_settings, get_timezone
 
 
 class EventDateTime(BaseModel):
-    date_time: datetime = Field(..., alias='dateTime')
+    """A timed start or end, or the date of an all-day one (Google's 'date')"""
+    date_time: Optional[datetime] = Field(None, alias='dateTime')
+    day: Optional[date] = Field(None, alias='date')
     time_zone: str = Field(default="UTC", alias='timeZone')
 
     model_config = ConfigDict(populate_by_name=True)
@@ -16,24 +20,86 @@ class EventDateTime(BaseModel):
         if not v or v.strip() == "":
             raise ValueError("Timezone cannot be empty")
         return v
+
+    @model_validator(mode='after')
+    def validate_date_or_time(self):
+        """Exactly one of dateTime and date"""
+        if (self.date_time is None) == (self.day is None):
+            raise ValueError("Either dateTime or date is required, not both")
+        return self
+
+    @property
+    def is_all_day(self) -> bool:
+        return self.day is not None
+
+    def aware(self, day_zone: Optional[tzinfo] = None) -> datetime:
+        """
+        As an aware datetime. Naive times are read in `time_zone`; all-day
+        dates start at midnight in `day_zone`, else the explicit `time_zone`,
+        else the configured TIMEZONE.
+        """
+        if self.day is not None:
+            if day_zone is None:
+                day_zone = get_timezone(self.time_zone if 'time_zone' in self.model_fields_set else get_settings().TIMEZONE)
+            midnight = datetime.combine(self.day, time())
+            return day_zone.localize(midnight) if hasattr(day_zone, 'localize') else midnight.replace(tzinfo=day_zone)
+        if self.date_time.tzinfo is not None:
+            return self.date_time
+        return get_timezone(self.time_zone).localize(self.date_time)
     
 class CalendarEvent(BaseModel):
     """Represents a calendar event with all its details"""
     id: Optional[str] = None  
+    etag: Optional[str] = None
     title: str = Field(..., min_length=1, max_length=200, alias='summary')  # Google uses 'summary'
     description: Optional[str] = Field(None, max_length=1000)
     start_time: EventDateTime = Field(..., alias='start')
     end_time: EventDateTime = Field(..., alias='end')
     location: Optional[str] = Field(None, max_length=500)
+    # Same for every copy of an event, e.g. a meeting on both a personal and a team calendar
+    ical_uid: Optional[str] = Field(None, alias='iCalUID')
+    # RRULE, EXDATE and RDATE lines of a recurring event, e.g. ["RRULE:FREQ=WEEKLY;BYDAY=MO"]
+    recurrence: Optional[List[str]] = None
+    # Set on the instances of a recurring event, the id of the series and where this instance was scheduled
+    recurring_event_id: Optional[str] = Field(None, alias='recurringEventId')
+    original_start_time: Optional[EventDateTime] = Field(None, alias='originalStartTime')
 
     model_config = ConfigDict(populate_by_name=True, from_attributes=True)
 
+class EventPatch(BaseModel):
+    """Fields to change on an existing event, only the fields that are set get sent"""
+    title: Optional[str] = Field(None, min_length=1, max_length=200, alias='summary')
+    description: Optional[str] = Field(None, max_length=1000)
+    start_time: Optional[EventDateTime] = Field(None, alias='start')
+    end_time: Optional[EventDateTime] = Field(None, alias='end')
+    location: Optional[str] = Field(None, max_length=500)
+    recurrence: Optional[List[str]] = None
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    def is_empty(self) -> bool:
+        return not self.model_fields_set
+
 class EventFilters(BaseModel):
     """Filters for searching/listing events"""
     start_date: Optional[datetime] = None
     end_date: Optional[datetime] = None
     search_query: Optional[str] = None
-    max_results: int = Field(default=10, ge=1, le=100)
+    max_results: Optional[int] = Field(default=10, ge=1, description="Maximum number of events, None for no limit")
+
+
+class BatchItemResult(BaseModel):
+    """Outcome of one item in a batch mutation"""
+    index: int
+    success: bool
+    event_id: Optional[str] = None
+    event: Optional[CalendarEvent] = None
+    error: Optional[str] = None
+
+
+def event_interval(event: CalendarEvent, day_zone: Optional[tzinfo] = None) -> Tuple[datetime, datetime]:
+    """Start and end of an event as aware datetimes, see EventDateTime.aware"""
+    return event.start_time.aware(day_zone), event.end_time.aware(day_zone)
 
 
 class GoogleCalendarInterface(ABC):
@@ -59,12 +125,179 @@ class GoogleCalendarInterface(ABC):
 
         pass
     
+    def iter_events(self, filters: EventFilters) -> Iterator[CalendarEvent]:
+        """Lazily yield matching events, providers that can page should override this"""
+        yield from self.list_events(filters)
+    
     @abstractmethod
     def update_event(self, event_id: str, event: CalendarEvent) -> CalendarEvent:
 
         pass
     
+    def patch_event(self, event_id: str, patch: EventPatch, etag: Optional[str] = None) -> CalendarEvent:
+        """
+        Change only the fields set on the patch. When an etag is given the
+        update must fail if the event changed since that version was read.
+        """
+        event = self.get_event(event_id)
+        if etag and event.etag and event.etag != etag:
+            raise Exception(f"Event {event_id} was changed since it was last read")
+        for field_name in patch.model_fields_set:
+            setattr(event, field_name, getattr(patch, field_name))
+        return self.update_event(event_id, event)
+
     @abstractmethod
     def delete_event(self, event_id: str) -> bool:
 
-        pass
\ No newline at end of file
+        pass
+
+    def add_events(self, events: List[CalendarEvent]) -> List[BatchItemResult]:
+        """Create several events, providers with a batch endpoint should override this"""
+        results = []
+        for index, event in enumerate(events):
+            try:
+                created = self.add_event(event)
+                results.append(BatchItemResult(index=index, success=True, event_id=created.id, event=created))
+            except Exception as e:
+                results.append(BatchItemResult(index=index, success=False, error=str(e)))
+        return results
+
+    def update_events(self, events: List[CalendarEvent]) -> List[BatchItemResult]:
+        """Replace several events, each one identified by its id"""
+        results = []
+        for index, event in enumerate(events):
+            try:
+                updated = self.update_event(event.id, event)
+                results.append(BatchItemResult(index=index, success=True, event_id=updated.id, event=updated))
+            except Exception as e:
+                results.append(BatchItemResult(index=index, success=False, event_id=event.id, error=str(e)))
+        return results
+
+    def patch_events(self, patches: List[Tuple[str, EventPatch, Optional[str]]]) -> List[BatchItemResult]:
+        """
+        Patch several events, given as (event_id, patch, etag) triples. An item
+        with an etag fails on its own when the event changed since it was read.
+        """
+        results = []
+        for index, (event_id, patch, etag) in enumerate(patches):
+            try:
+                patched = self.patch_event(event_id, patch, etag)
+                results.append(BatchItemResult(index=index, success=True, event_id=patched.id, event=patched))
+            except Exception as e:
+                results.append(BatchItemResult(index=index, success=False, event_id=event_id, error=str(e)))
+        return results
+
+    def delete_events(self, event_ids: List[str]) -> List[BatchItemResult]:
+        """Delete several events by id"""
+        results = []
+        for index, event_id in enumerate(event_ids):
+            try:
+                self.delete_event(event_id)
+                results.append(BatchItemResult(index=index, success=True, event_id=event_id))
+            except Exception as e:
+                results.append(BatchItemResult(index=index, success=False, event_id=event_id, error=str(e)))
+        return results
+
+    def calendar_version(self) -> Optional[Hashable]:
+        """
+        A value that changes whenever the calendar's events change, used to
+        tell whether an earlier answer about the calendar still holds. None
+        when the provider cannot tell cheaply.
+        """
+        return None
+
+    def get_busy_intervals(self, start: datetime, end: datetime, calendar_ids: Optional[List[str]] = None) -> List[Tuple[datetime, datetime]]:
+        """
+        Busy time between start and end as (start, end) pairs, unsorted and
+        possibly overlapping. The default reads this provider's own events,
+        providers that can query other calendars should override this.
+        """
+        if calendar_ids and any(calendar_id != getattr(self, 'calendar_id', 'primary') for calendar_id in calendar_ids):
+            raise Exception("This calendar provider can only report its own calendar")
+        filters = EventFilters(start_date=start, end_date=end, max_results=None)
+        return [event_interval(event) for event in self.iter_events(filters)]
+
+
+class AsyncGoogleCalendarInterface(ABC):
+    """
+    Same operations as GoogleCalendarInterface for providers built on an async
+    HTTP client. Batch operations run their items concurrently by default.
+    """
+
+    @abstractmethod
+    async def authenticate(self) -> bool:
+
+        pass
+
+    @abstractmethod
+    async def add_event(self, event: CalendarEvent) -> CalendarEvent:
+
+        pass
+
+    @abstractmethod
+    async def get_event(self, event_id: str) -> CalendarEvent:
+
+        pass
+
+    @abstractmethod
+    async def list_events(self, filters: EventFilters) -> List[CalendarEvent]:
+
+        pass
+
+    async def iter_events(self, filters: EventFilters) -> AsyncIterator[CalendarEvent]:
+        for event in await self.list_events(filters):
+            yield event
+
+    @abstractmethod
+    async def update_event(self, event_id: str, event: CalendarEvent) -> CalendarEvent:
+
+        pass
+
+    @abstractmethod
+    async def patch_event(self, event_id: str, patch: EventPatch, etag: Optional[str] = None) -> CalendarEvent:
+
+        pass
+
+    @abstractmethod
+    async def delete_event(self, event_id: str) -> bool:
+
+        pass
+
+    async def _gather_results(self, calls: List[Awaitable], event_ids: List[Optional[str]]) -> List[BatchItemResult]:
+        outcomes = await asyncio.gather(*calls, return_exceptions=True)
+        results = []
+        for index, (outcome, event_id) in enumerate(zip(outcomes, event_ids)):
+            if isinstance(outcome, BaseException):
+                results.append(BatchItemResult(index=index, success=False, event_id=event_id, error=str(outcome)))
+            elif isinstance(outcome, CalendarEvent):
+                results.append(BatchItemResult(index=index, success=True, event_id=outcome.id, event=outcome))
+            else:
+                results.append(BatchItemResult(index=index, success=True, event_id=event_id))
+        return results
+
+    async def add_events(self, events: List[CalendarEvent]) -> List[BatchItemResult]:
+        return await self._gather_results([self.add_event(event) for event in events], [None] * len(events))
+
+    async def update_events(self, events: List[CalendarEvent]) -> List[BatchItemResult]:
+        return await self._gather_results(
+            [self.update_event(event.id, event) for event in events],
+            [event.id for event in events]
+        )
+
+    async def patch_events(self, patches: List[Tuple[str, EventPatch, Optional[str]]]) -> List[BatchItemResult]:
+        return await self._gather_results(
+            [self.patch_event(event_id, patch, etag) for event_id, patch, etag in patches],
+            [event_id for event_id, _, _ in patches]
+        )
+
+    async def delete_events(self, event_ids: List[str]) -> List[BatchItemResult]:
+        return await self._gather_results([self.delete_event(event_id) for event_id in event_ids], list(event_ids))
+
+    async def calendar_version(self) -> Optional[Hashable]:
+        return None
+
+    async def get_busy_intervals(self, start: datetime, end: datetime, calendar_ids: Optional[List[str]] = None) -> List[Tuple[datetime, datetime]]:
+        if calendar_ids and any(calendar_id != getattr(self, 'calendar_id', 'primary') for calendar_id in calendar_ids):
+            raise Exception("This calendar provider can only report its own calendar")
+        filters = EventFilters(start_date=start, end_date=end, max_results=None)
+        return [event_interval(event) async for event in self.iter_events(filters)]
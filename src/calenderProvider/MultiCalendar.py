@@ -0,0 +1,321 @@
+import asyncio
+import heapq
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple
+from ..helpers.Config import get_settings
+from .GoogleCalendarInterface import (
+    AsyncGoogleCalendarInterface,
+    BatchItemResult,
+    CalendarEvent,
+    EventFilters,
+    EventPatch,
+    GoogleCalendarInterface,
+    event_interval
+)
+
+
+def merge_events(results: Iterable[List[CalendarEvent]], limit: Optional[int] = None) -> List[CalendarEvent]:
+    """
+    K-way merge of per-calendar results, each already sorted by start time.
+    An event that shows up on several calendars (same iCalUID and start) is
+    kept once, from the first calendar that returned it.
+    """
+    keyed = ([(event_interval(event)[0], event) for event in events] for events in results)
+    merged, seen = [], set()
+    for start, event in heapq.merge(*keyed, key=lambda pair: pair[0]):
+        key = (event.ical_uid or event.id, start)
+        if key in seen:
+            continue
+        seen.add(key)
+        merged.append(event)
+        if limit and len(merged) >= limit:
+            break
+    return merged
+
+
+def _collect(grouped: Dict[int, List[int]], outcomes: Dict[int, List[BatchItemResult]], size: int) -> List[BatchItemResult]:
+    """Put per-calendar batch results back in the order of the original request"""
+    results: List[Optional[BatchItemResult]] = [None] * size
+    for child, indexes in grouped.items():
+        for index, result in zip(indexes, outcomes[child]):
+            results[index] = result.model_copy(update={'index': index})
+    return results
+
+
+class _EventOwners:
+    """
+    Which calendar each event id was last seen on, so writes go to the right
+    provider. The least recently used ids are dropped beyond `max_size`, a
+    forgotten id is looked up on every calendar again.
+    """
+
+    def __init__(self, max_size: int = 4096):
+        self.max_size = max_size
+        self._owners: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def remember(self, child: int, events: Iterable[CalendarEvent]):
+        with self._lock:
+            for event in events:
+                if event.id:
+                    self._owners[event.id] = child
+                    self._owners.move_to_end(event.id)
+            while len(self._owners) > self.max_size:
+                self._owners.popitem(last=False)
+
+    def remember_listed(self, results: Sequence[List[CalendarEvent]]):
+        """
+        Owners of merged results. merge_events shows a shared event from the
+        first calendar that has it, remembering in reverse order lets that
+        calendar win too.
+        """
+        for child in reversed(range(len(results))):
+            self.remember(child, results[child])
+
+    def lookup(self, event_id: str) -> Optional[int]:
+        with self._lock:
+            child = self._owners.get(event_id)
+            if child is not None:
+                self._owners.move_to_end(event_id)
+            return child
+
+    def forget(self, event_id: str):
+        with self._lock:
+            self._owners.pop(event_id, None)
+
+
+class MultiCalendar(GoogleCalendarInterface):
+    """
+    Several calendars behind one provider. Reads fan out to every calendar
+    concurrently and are merged by start time, so a query costs about as
+    much as the slowest single calendar. New events go to the first
+    calendar, changes go to the calendar the event belongs to.
+    """
+
+    def __init__(self, calendars: Sequence[GoogleCalendarInterface], max_workers: Optional[int] = None):
+        if not calendars:
+            raise ValueError("MultiCalendar needs at least one calendar")
+        self.calendars = list(calendars)
+        self.calendar_id = getattr(self.calendars[0], 'calendar_id', 'primary')
+        self.owners = _EventOwners()
+        # Every concurrent turn fans out to all calendars at once, a smaller
+        # pool would queue one chat's reads behind another's
+        if max_workers is None:
+            max_workers = get_settings().MAX_CONCURRENT_TURNS * len(self.calendars)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="calendar-fanout")
+
+    @property
+    def is_authenticated(self) -> bool:
+        return all(getattr(calendar, 'is_authenticated', True) for calendar in self.calendars)
+
+    def _fan_out(self, method: str, *args) -> List:
+        futures = [self._pool.submit(getattr(calendar, method), *args) for calendar in self.calendars]
+        return [future.result() for future in futures]
+
+    def _owner(self, event_id: str) -> int:
+        child = self.owners.lookup(event_id)
+        if child is not None:
+            return child
+        futures = [self._pool.submit(calendar.get_event, event_id) for calendar in self.calendars]
+        for child, future in enumerate(futures):
+            try:
+                self.owners.remember(child, [future.result()])
+                return child
+            except Exception:
+                continue
+        raise Exception(f"Event not found: {event_id}")
+
+    def _group(self, event_ids: List[str]) -> Tuple[Dict[int, List[int]], List[BatchItemResult]]:
+        grouped: Dict[int, List[int]] = {}
+        missing = []
+        for index, event_id in enumerate(event_ids):
+            try:
+                grouped.setdefault(self._owner(event_id), []).append(index)
+            except Exception as e:
+                missing.append(BatchItemResult(index=index, success=False, event_id=event_id, error=str(e)))
+        return grouped, missing
+
+    def _run_grouped(self, method: str, items: list, event_ids: List[str]) -> List[BatchItemResult]:
+        grouped, missing = self._group(event_ids)
+        futures = {
+            child: self._pool.submit(getattr(self.calendars[child], method), [items[index] for index in indexes])
+            for child, indexes in grouped.items()
+        }
+        results = _collect(grouped, {child: future.result() for child, future in futures.items()}, len(items))
+        for failure in missing:
+            results[failure.index] = failure
+        return results
+
+    def authenticate(self) -> bool:
+        return all(self._fan_out('authenticate'))
+
+    def add_event(self, event: CalendarEvent) -> CalendarEvent:
+        created = self.calendars[0].add_event(event)
+        self.owners.remember(0, [created])
+        return created
+
+    def get_event(self, event_id: str) -> CalendarEvent:
+        return self.calendars[self._owner(event_id)].get_event(event_id)
+
+    def list_events(self, filters: EventFilters) -> List[CalendarEvent]:
+        results = self._fan_out('list_events', filters)
+        self.owners.remember_listed(results)
+        return merge_events(results, filters.max_results)
+
+    def iter_events(self, filters: EventFilters) -> Iterator[CalendarEvent]:
+        yield from self.list_events(filters)
+
+    def update_event(self, event_id: str, event: CalendarEvent) -> CalendarEvent:
+        return self.calendars[self._owner(event_id)].update_event(event_id, event)
+
+    def patch_event(self, event_id: str, patch: EventPatch, etag: Optional[str] = None) -> CalendarEvent:
+        return self.calendars[self._owner(event_id)].patch_event(event_id, patch, etag)
+
+    def delete_event(self, event_id: str) -> bool:
+        deleted = self.calendars[self._owner(event_id)].delete_event(event_id)
+        self.owners.forget(event_id)
+        return deleted
+
+    def add_events(self, events: List[CalendarEvent]) -> List[BatchItemResult]:
+        results = self.calendars[0].add_events(events)
+        self.owners.remember(0, [result.event for result in results if result.event])
+        return results
+
+    def update_events(self, events: List[CalendarEvent]) -> List[BatchItemResult]:
+        return self._run_grouped('update_events', events, [event.id for event in events])
+
+    def patch_events(self, patches: List[Tuple[str, EventPatch, Optional[str]]]) -> List[BatchItemResult]:
+        return self._run_grouped('patch_events', patches, [event_id for event_id, _, _ in patches])
+
+    def delete_events(self, event_ids: List[str]) -> List[BatchItemResult]:
+        results = self._run_grouped('delete_events', event_ids, event_ids)
+        for result in results:
+            if result.success:
+                self.owners.forget(result.event_id)
+        return results
+
+    def calendar_version(self) -> Optional[Hashable]:
+        versions = tuple(self._fan_out('calendar_version'))
+        return None if None in versions else versions
+
+    def get_busy_intervals(self, start: datetime, end: datetime, calendar_ids: Optional[List[str]] = None) -> List[Tuple[datetime, datetime]]:
+        if calendar_ids:
+            # A single free/busy query covers any set of calendars
+            return self.calendars[0].get_busy_intervals(start, end, calendar_ids)
+        return [interval for busy in self._fan_out('get_busy_intervals', start, end) for interval in busy]
+
+    def close(self):
+        self._pool.shutdown(wait=False)
+        for calendar in self.calendars:
+            close = getattr(calendar, 'close', None)
+            if close is not None:
+                close()
+
+
+class AsyncMultiCalendar(AsyncGoogleCalendarInterface):
+    """MultiCalendar for async providers, the fan-out runs on the event loop"""
+
+    def __init__(self, calendars: Sequence[AsyncGoogleCalendarInterface]):
+        if not calendars:
+            raise ValueError("AsyncMultiCalendar needs at least one calendar")
+        self.calendars = list(calendars)
+        self.calendar_id = getattr(self.calendars[0], 'calendar_id', 'primary')
+        self.owners = _EventOwners()
+
+    async def _fan_out(self, method: str, *args) -> List:
+        return await asyncio.gather(*(getattr(calendar, method)(*args) for calendar in self.calendars))
+
+    async def _owner(self, event_id: str) -> int:
+        child = self.owners.lookup(event_id)
+        if child is not None:
+            return child
+        outcomes = await asyncio.gather(
+            *(calendar.get_event(event_id) for calendar in self.calendars),
+            return_exceptions=True
+        )
+        for child, outcome in enumerate(outcomes):
+            if isinstance(outcome, CalendarEvent):
+                self.owners.remember(child, [outcome])
+                return child
+        raise Exception(f"Event not found: {event_id}")
+
+    async def _run_grouped(self, method: str, items: list, event_ids: List[str]) -> List[BatchItemResult]:
+        grouped: Dict[int, List[int]] = {}
+        missing = []
+        for index, event_id in enumerate(event_ids):
+            try:
+                grouped.setdefault(await self._owner(event_id), []).append(index)
+            except Exception as e:
+                missing.append(BatchItemResult(index=index, success=False, event_id=event_id, error=str(e)))
+        children = list(grouped)
+        outcomes = await asyncio.gather(*(
+            getattr(self.calendars[child], method)([items[index] for index in grouped[child]])
+            for child in children
+        ))
+        results = _collect(grouped, dict(zip(children, outcomes)), len(items))
+        for failure in missing:
+            results[failure.index] = failure
+        return results
+
+    def run_sync(self, coro):
+        return self.calendars[0].run_sync(coro)
+
+    async def authenticate(self) -> bool:
+        return all(await self._fan_out('authenticate'))
+
+    async def add_event(self, event: CalendarEvent) -> CalendarEvent:
+        created = await self.calendars[0].add_event(event)
+        self.owners.remember(0, [created])
+        return created
+
+    async def get_event(self, event_id: str) -> CalendarEvent:
+        return await self.calendars[await self._owner(event_id)].get_event(event_id)
+
+    async def list_events(self, filters: EventFilters) -> List[CalendarEvent]:
+        results = await self._fan_out('list_events', filters)
+        self.owners.remember_listed(results)
+        return merge_events(results, filters.max_results)
+
+    async def update_event(self, event_id: str, event: CalendarEvent) -> CalendarEvent:
+        return await self.calendars[await self._owner(event_id)].update_event(event_id, event)
+
+    async def patch_event(self, event_id: str, patch: EventPatch, etag: Optional[str] = None) -> CalendarEvent:
+        return await self.calendars[await self._owner(event_id)].patch_event(event_id, patch, etag)
+
+    async def delete_event(self, event_id: str) -> bool:
+        deleted = await self.calendars[await self._owner(event_id)].delete_event(event_id)
+        self.owners.forget(event_id)
+        return deleted
+
+    async def add_events(self, events: List[CalendarEvent]) -> List[BatchItemResult]:
+        results = await self.calendars[0].add_events(events)
+        self.owners.remember(0, [result.event for result in results if result.event])
+        return results
+
+    async def update_events(self, events: List[CalendarEvent]) -> List[BatchItemResult]:
+        return await self._run_grouped('update_events', events, [event.id for event in events])
+
+    async def patch_events(self, patches: List[Tuple[str, EventPatch, Optional[str]]]) -> List[BatchItemResult]:
+        return await self._run_grouped('patch_events', patches, [event_id for event_id, _, _ in patches])
+
+    async def delete_events(self, event_ids: List[str]) -> List[BatchItemResult]:
+        results = await self._run_grouped('delete_events', event_ids, event_ids)
+        for result in results:
+            if result.success:
+                self.owners.forget(result.event_id)
+        return results
+
+    async def calendar_version(self) -> Optional[Hashable]:
+        versions = tuple(await self._fan_out('calendar_version'))
+        return None if None in versions else versions
+
+    async def get_busy_intervals(self, start: datetime, end: datetime, calendar_ids: Optional[List[str]] = None) -> List[Tuple[datetime, datetime]]:
+        if calendar_ids:
+            return await self.calendars[0].get_busy_intervals(start, end, calendar_ids)
+        return [interval for busy in await self._fan_out('get_busy_intervals', start, end) for interval in busy]
+
+    async def close(self):
+        await asyncio.gather(*(calendar.close() for calendar in self.calendars if hasattr(calendar, 'close')))
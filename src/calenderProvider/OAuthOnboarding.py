@@ -0,0 +1,65 @@
+import threading
+import time
+from typing import Dict, Hashable, List, Tuple
+from urllib.parse import parse_qs, urlparse
+from google.oauth2.credentials import Credentials
+from google_auth_oauthlib.flow import Flow
+
+
+class OAuthOnboarding:
+    """
+    Connects a chat user's Google account without a local browser: the
+    user opens the authorization URL, allows access and sends back the code
+    (or the whole address they were redirected to). Unfinished flows are
+    dropped after `ttl_seconds`.
+    """
+
+    def __init__(self, client_secrets_path: str, redirect_uri: str, scopes: List[str], ttl_seconds: float = 600):
+        self.client_secrets_path = client_secrets_path
+        self.redirect_uri = redirect_uri
+        self.scopes = scopes
+        self.ttl_seconds = ttl_seconds
+        self._pending: Dict[Hashable, Tuple[Flow, str, float]] = {}
+        self._lock = threading.Lock()
+
+    def _expire(self, now: float):
+        for user_id in [user_id for user_id, (_, _, started) in self._pending.items() if now - started > self.ttl_seconds]:
+            del self._pending[user_id]
+
+    def authorization_url(self, user_id: Hashable) -> str:
+        flow = Flow.from_client_secrets_file(
+            self.client_secrets_path,
+            scopes=self.scopes,
+            redirect_uri=self.redirect_uri,
+            autogenerate_code_verifier=True
+        )
+        # offline access with forced consent, otherwise Google omits the refresh token
+        url, state = flow.authorization_url(access_type='offline', prompt='consent')
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            self._pending[user_id] = (flow, state, now)
+        return url
+
+    def finish(self, user_id: Hashable, response: str) -> Credentials:
+        """Exchange the code the user sent back for credentials"""
+        with self._lock:
+            self._expire(time.monotonic())
+            pending = self._pending.pop(user_id, None)
+        if pending is None:
+            raise Exception("No authorization in progress, start again with /connect")
+        flow, state, _ = pending
+
+        code = response.strip()
+        if code.startswith(('http://', 'https://')):
+            query = parse_qs(urlparse(code).query)
+            if query.get('state', [state])[0] != state:
+                raise Exception("The authorization response does not belong to this request")
+            if 'error' in query:
+                raise Exception(f"Google refused the authorization: {query['error'][0]}")
+            if 'code' not in query:
+                raise Exception("The address does not contain an authorization code")
+            code = query['code'][0]
+
+        flow.fetch_token(code=code)
+        return flow.credentials
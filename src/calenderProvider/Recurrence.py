@@ -0,0 +1,154 @@
+import re
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Collection, Dict, Iterator, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from dateutil.rrule import rruleset, rrulestr
+
+# Open-ended series are expanded this far when a query has no end
+EXPANSION_HORIZON = timedelta(days=366)
+
+UNTIL_UTC = re.compile(r"UNTIL=(\d{8}T\d{6})Z")
+
+
+def _zone(name: Optional[str], fallback: Optional[tzinfo]) -> tzinfo:
+    if name:
+        try:
+            return ZoneInfo(name)
+        except (ZoneInfoNotFoundError, ValueError):
+            pass
+    return fallback or timezone.utc
+
+
+def _split_property(line: str) -> Tuple[str, Dict[str, str], str]:
+    """RFC 5545 content line, e.g. "EXDATE;TZID=Europe/Berlin:20251020T090000" """
+    head, _, value = line.partition(':')
+    name, *params = head.split(';')
+    return name.strip().upper(), dict(param.split('=', 1) for param in params if '=' in param), value.strip()
+
+
+def _ical_time(value: str, tzid: Optional[str], zone: tzinfo) -> datetime:
+    """An EXDATE/RDATE value as naive wall time in the series' zone"""
+    if len(value) == 8:
+        return datetime.strptime(value, "%Y%m%d")
+    if value.endswith('Z'):
+        moment = datetime.strptime(value, "%Y%m%dT%H%M%SZ").replace(tzinfo=timezone.utc)
+    else:
+        moment = datetime.strptime(value, "%Y%m%dT%H%M%S").replace(tzinfo=_zone(tzid, zone))
+    return moment.astimezone(zone).replace(tzinfo=None)
+
+
+class RecurringSeries:
+    """
+    A recurring event master and its parsed recurrence rules.
+
+    Occurrences are computed in the series' own timezone, so a 9:00 standup
+    stays at 9:00 across DST changes, and are built on demand as Google
+    builds instances: id "<master id>_<original start>", recurringEventId
+    and originalStartTime set, no recurrence. Instances that were moved or
+    cancelled are exceptions, the owner passes their original start times
+    as `skip`. All-day series run in `day_zone`, the calendar's timezone.
+    Raises ValueError for rules it cannot parse.
+    """
+
+    def __init__(self, master: dict, day_zone: tzinfo = timezone.utc):
+        self.master = master
+        self.id: str = master['id']
+        start, end = master['start'], master['end']
+        self.all_day = not start.get('dateTime')
+        if self.all_day:
+            self.zone: tzinfo = day_zone
+            self.dtstart = datetime.fromisoformat(start['date'])
+            self.duration = datetime.fromisoformat(end['date']) - self.dtstart
+        else:
+            parsed = datetime.fromisoformat(start['dateTime'])
+            self.zone = _zone(start.get('timeZone'), parsed.tzinfo)
+            local = self._in_zone(parsed)
+            self.dtstart = local.replace(tzinfo=None)
+            self.duration = self._in_zone(datetime.fromisoformat(end['dateTime'])) - local
+        self.rules = self._build_rules(master.get('recurrence') or [])
+        # Everything an instance shares with its master
+        self._template = {key: value for key, value in master.items() if key not in ('recurrence', 'etag')}
+
+    def _build_rules(self, recurrence: List[str]) -> rruleset:
+        rules = rruleset()
+        for line in recurrence:
+            name, params, value = _split_property(line)
+            if name == 'RRULE':
+                # dateutil wants UNTIL in the same form as the naive start
+                value = UNTIL_UTC.sub(lambda match: "UNTIL=" + self._local_stamp(match.group(1)), value)
+                rules.rrule(rrulestr(value, dtstart=self.dtstart))
+            elif name in ('EXDATE', 'RDATE'):
+                add = rules.exdate if name == 'EXDATE' else rules.rdate
+                for item in value.split(','):
+                    add(_ical_time(item, params.get('TZID'), self.zone))
+        return rules
+
+    def _local_stamp(self, utc_stamp: str) -> str:
+        moment = datetime.strptime(utc_stamp, "%Y%m%dT%H%M%S").replace(tzinfo=timezone.utc)
+        return moment.astimezone(self.zone).strftime("%Y%m%dT%H%M%S")
+
+    def _in_zone(self, moment: datetime) -> datetime:
+        # Naive times are wall time in the event's own timezone
+        return moment.astimezone(self.zone) if moment.tzinfo else moment.replace(tzinfo=self.zone)
+
+    def _aware(self, local: datetime) -> datetime:
+        return local.replace(tzinfo=self.zone)
+
+    def _local(self, moment: datetime) -> datetime:
+        return moment.astimezone(self.zone).replace(tzinfo=None)
+
+    def matches(self, needle: str) -> bool:
+        haystack = " ".join(self.master.get(key) or "" for key in ('summary', 'description', 'location'))
+        return needle in haystack.lower()
+
+    def _instance(self, start: datetime) -> dict:
+        end = start + self.duration
+        item = dict(self._template)
+        if self.all_day:
+            stamp = start.strftime("%Y%m%d")
+            item['start'] = {'date': start.date().isoformat()}
+            item['end'] = {'date': end.date().isoformat()}
+        else:
+            stamp = start.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+            time_zone = self.master['start'].get('timeZone')
+            item['start'] = {'dateTime': start.isoformat(), **({'timeZone': time_zone} if time_zone else {})}
+            item['end'] = {'dateTime': end.isoformat(), **({'timeZone': time_zone} if time_zone else {})}
+        item['id'] = f"{self.id}_{stamp}"
+        item['recurringEventId'] = self.id
+        item['originalStartTime'] = dict(item['start'])
+        return item
+
+    def occurrences(self, time_min: Optional[datetime] = None, time_max: Optional[datetime] = None, skip: Collection[datetime] = ()) -> Iterator[dict]:
+        """
+        Lazily yield the instances that end after time_min and start before
+        time_max (both aware), in start order
+        """
+        if time_max is None:
+            time_max = (time_min or datetime.now(timezone.utc)) + EXPANSION_HORIZON
+        if time_min is None:
+            local_starts = iter(self.rules)
+        else:
+            local_starts = self.rules.xafter(self._local(time_min - self.duration), inc=False)
+        for local_start in local_starts:
+            start = self._aware(local_start)
+            if start >= time_max:
+                return
+            if start in skip:
+                continue
+            yield self._instance(start)
+
+    def occurrence(self, instance_id: str, skip: Collection[datetime] = ()) -> Optional[dict]:
+        """The instance with the given id, None when the series has no such occurrence"""
+        prefix, _, stamp = instance_id.rpartition('_')
+        if prefix != self.id:
+            return None
+        try:
+            if self.all_day:
+                start = datetime.strptime(stamp, "%Y%m%d").replace(tzinfo=self.zone)
+            else:
+                start = datetime.strptime(stamp, "%Y%m%dT%H%M%SZ").replace(tzinfo=timezone.utc).astimezone(self.zone)
+        except ValueError:
+            return None
+        if start in skip or self._local(start) not in self.rules:
+            return None
+        return self._instance(start)
@@ -0,0 +1,288 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional
+from ..helpers.Config import get_settings
+from ..helpers.Telemetry import GOOGLE_COALESCED, GOOGLE_RETRIES, GOOGLE_THROTTLE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# 403 reasons Google uses for "slow down", as opposed to a missing permission or an exhausted daily quota
+RATE_LIMIT_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded'}
+SERVER_ERRORS = {500, 502, 503, 504}
+
+
+@dataclass
+class RetryHint:
+    """Why a failed request may be retried. reason is "rate_limited" or "server_error"."""
+    reason: str
+    retry_after: Optional[float] = None
+    # Google limits the whole project, not just this user
+    project_wide: bool = False
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header, given either as seconds or as an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_hint(status: int, reasons: Iterable[str] = (), retry_after: Optional[float] = None, idempotent: bool = True) -> Optional[RetryHint]:
+    """
+    Whether a failed Google API call is worth retrying. Rate limited calls
+    were never executed and are always safe to repeat, server errors only
+    for idempotent calls since an insert may have gone through.
+    """
+    reasons = set(reasons)
+    if status == 429 or (status == 403 and reasons & RATE_LIMIT_REASONS):
+        return RetryHint('rate_limited', retry_after, project_wide='rateLimitExceeded' in reasons)
+    if status in SERVER_ERRORS and idempotent:
+        return RetryHint('server_error', retry_after)
+    return None
+
+
+class TokenBucket:
+    """
+    Allows `rate` requests per second with bursts of up to `burst`.
+    reserve() takes a token right away and returns how long the caller has
+    to wait before using it, so waiting callers line up in order instead of
+    polling. pause() holds every caller back after Google pushed back.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= tokens
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.blocked_until - now)
+
+    def pause(self, seconds: float):
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+class RequestScheduler:
+    """
+    Paces Google Calendar requests against the per-user and per-project
+    quotas, retries rate limited and failed calls with jittered exponential
+    backoff (never sooner than Retry-After asks) and lets identical reads
+    that are already in flight share one response.
+
+    Works for both providers: call() for blocking requests, acall() for
+    coroutines. Buckets and in-flight reads are keyed by the quota user,
+    any hashable naming the Google account.
+    """
+
+    def __init__(self, user_rate: float = 10, user_burst: float = 20, project_rate: float = 150, project_burst: float = 300, max_retries: int = 5, base_delay: float = 0.5, max_delay: float = 32, max_users: int = 4096):
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.project_bucket = TokenBucket(project_rate, project_burst) if project_rate > 0 else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_users = max_users
+        self._users: "OrderedDict[Hashable, TokenBucket]" = OrderedDict()
+        self._inflight: Dict[Hashable, Future] = {}
+        self._inflight_async: Dict[Hashable, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+        self.coalesced = 0
+        self.gave_up = 0
+        self.throttled_seconds = 0.0
+
+    @classmethod
+    def from_settings(cls) -> "RequestScheduler":
+        settings = get_settings()
+        return cls(
+            user_rate=settings.GOOGLE_USER_REQUESTS_PER_SECOND,
+            user_burst=settings.GOOGLE_USER_BURST,
+            project_rate=settings.GOOGLE_PROJECT_REQUESTS_PER_SECOND,
+            project_burst=settings.GOOGLE_PROJECT_BURST,
+            max_retries=settings.GOOGLE_MAX_RETRIES,
+            base_delay=settings.GOOGLE_BACKOFF_BASE_SECONDS,
+            max_delay=settings.GOOGLE_BACKOFF_MAX_SECONDS
+        )
+
+    def _user_bucket(self, user: Hashable) -> Optional[TokenBucket]:
+        if self.user_rate <= 0:
+            return None
+        with self._lock:
+            bucket = self._users.get(user)
+            if bucket is None:
+                bucket = self._users[user] = TokenBucket(self.user_rate, self.user_burst)
+                if len(self._users) > self.max_users:
+                    self._users.popitem(last=False)
+            else:
+                self._users.move_to_end(user)
+            return bucket
+
+    def _reserve(self, user: Hashable, cost: float) -> float:
+        """Take quota for one request and return how long it has to wait for it"""
+        wait = 0.0
+        for scope, bucket in (("user", self._user_bucket(user)), ("project", self.project_bucket)):
+            if bucket is None:
+                continue
+            delay = bucket.reserve(cost)
+            if delay > 0:
+                GOOGLE_THROTTLE_SECONDS.labels(scope=scope).observe(delay)
+            wait = max(wait, delay)
+        with self._lock:
+            self.requests += 1
+            self.throttled_seconds += wait
+        return wait
+
+    def retry_delay(self, user: Hashable, hint: RetryHint, attempt: int, operation: str) -> float:
+        """
+        Seconds to wait before retry number `attempt` (0 based). When Google
+        pushed back, the user's (or the whole project's) bucket is paused for
+        as long, so concurrent requests wait too instead of piling on.
+        """
+        # Full jitter keeps retries of many callers from arriving together
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if hint.retry_after is not None:
+            delay = max(delay, hint.retry_after)
+        if hint.reason == 'rate_limited':
+            bucket = self.project_bucket if hint.project_wide else self._user_bucket(user)
+            if bucket is not None:
+                bucket.pause(delay)
+        with self._lock:
+            self.retries += 1
+        GOOGLE_RETRIES.labels(operation=operation, reason=hint.reason).inc()
+        logger.info("Google %s %s, retry %d in %.2fs", operation, hint.reason, attempt + 1, delay)
+        return delay
+
+    def _give_up(self, operation: str, hint: Optional[RetryHint]):
+        if hint is not None:
+            with self._lock:
+                self.gave_up += 1
+            logger.warning("Google %s still %s after %d retries", operation, hint.reason, self.max_retries)
+
+    def call(self, user: Hashable, func: Callable[[], Any], classify: Callable[[Exception], Optional[RetryHint]], operation: str = "unknown", cost: float = 1, coalesce_key: Optional[Hashable] = None) -> Any:
+        if coalesce_key is None:
+            return self._run(user, func, classify, operation, cost)
+
+        with self._lock:
+            leader = self._inflight.get(coalesce_key)
+            if leader is None:
+                future = self._inflight[coalesce_key] = Future()
+            else:
+                self.coalesced += 1
+        if leader is not None:
+            GOOGLE_COALESCED.labels(operation=operation).inc()
+            return leader.result()
+
+        try:
+            result = self._run(user, func, classify, operation, cost)
+            future.set_result(result)
+            return result
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(coalesce_key, None)
+
+    def _run(self, user, func, classify, operation, cost):
+        attempt = 0
+        while True:
+            wait = self._reserve(user, cost)
+            if wait > 0:
+                time.sleep(wait)
+            try:
+                return func()
+            except Exception as error:
+                hint = classify(error)
+                if hint is None or attempt >= self.max_retries:
+                    self._give_up(operation, hint)
+                    raise
+                time.sleep(self.retry_delay(user, hint, attempt, operation))
+                attempt += 1
+
+    async def acall(self, user: Hashable, func: Callable[[], Awaitable[Any]], classify: Callable[[Exception], Optional[RetryHint]], operation: str = "unknown", cost: float = 1, coalesce_key: Optional[Hashable] = None) -> Any:
+        """Same as call() for a coroutine factory, waits without blocking the event loop"""
+        if coalesce_key is None:
+            return await self._arun(user, func, classify, operation, cost)
+
+        leader = self._inflight_async.get(coalesce_key)
+        if leader is not None:
+            with self._lock:
+                self.coalesced += 1
+            GOOGLE_COALESCED.labels(operation=operation).inc()
+            # shield: a cancelled follower must not cancel the leader's request
+            return await asyncio.shield(leader)
+
+        future = self._inflight_async[coalesce_key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await self._arun(user, func, classify, operation, cost)
+            future.set_result(result)
+            return result
+        except BaseException as error:
+            if isinstance(error, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(error)
+                # Mark it retrieved, there may be no follower to do so
+                future.exception()
+            raise
+        finally:
+            self._inflight_async.pop(coalesce_key, None)
+
+    async def _arun(self, user, func, classify, operation, cost):
+        attempt = 0
+        while True:
+            wait = self._reserve(user, cost)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                return await func()
+            except Exception as error:
+                hint = classify(error)
+                if hint is None or attempt >= self.max_retries:
+                    self._give_up(operation, hint)
+                    raise
+                await asyncio.sleep(self.retry_delay(user, hint, attempt, operation))
+                attempt += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "coalesced": self.coalesced,
+                "gave_up": self.gave_up,
+                "throttled_seconds": round(self.throttled_seconds, 3),
+                "users": len(self._users)
+            }
+
+
+@lru_cache(maxsize=1)
+def get_scheduler() -> RequestScheduler:
+    """The process wide scheduler, the project quota is shared by every provider"""
+    return RequestScheduler.from_settings()
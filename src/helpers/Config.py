@@ -1,3 +1,7 @@
+from datetime import tzinfo
+from functools import lru_cache
+from typing import List, Optional
+import pytz
 from pydantic_settings import BaseSettings
 
 
@@ -5,18 +9,108 @@ class Settings(BaseSettings):
     OLLAMA_MODEL_NAME: str
     OLLAMA_URL: str
     TEMPERATURE: float
+    OLLAMA_REASONING: bool = True
+    OLLAMA_NUM_CTX: Optional[int] = None
+    OLLAMA_NUM_PREDICT: Optional[int] = None
+    OLLAMA_KEEP_ALIVE: str = "30m"
+    OLLAMA_FAST_MODEL_NAME: str = ""
+    OLLAMA_FAST_REASONING: bool = False
 
     TELEGRAM_TOKEN: str
     TELEGRAM_CHAT_ID: str
+    TELEGRAM_STREAMING: bool = True
+    TELEGRAM_EDIT_INTERVAL_SECONDS: float = 1.0
+    TELEGRAM_API_URL: str = "https://api.telegram.org/bot"
+    # "polling" or "webhook"
+    TELEGRAM_MODE: str = "polling"
+    # Public address registered with Telegram, leave empty when the deployment registers it
+    TELEGRAM_WEBHOOK_URL: str = ""
+    TELEGRAM_WEBHOOK_LISTEN: str = "0.0.0.0"
+    TELEGRAM_WEBHOOK_PORT: int = 8080
+    TELEGRAM_WEBHOOK_PATH: str = "/telegram"
+    TELEGRAM_WEBHOOK_SECRET: str = ""
+    TELEGRAM_WEBHOOK_QUEUE_SIZE: int = 1000
+    TELEGRAM_WEBHOOK_WORKERS: int = 16
+    TELEGRAM_WEBHOOK_MAX_CONNECTIONS: int = 40
 
     GOOGLE_CALENDAR_CREDENTIALS_PATH: str
     GOOGLE_CALENDAR_TOKEN_PATH: str
+    # Comma separated, new events go to the first one
+    GOOGLE_CALENDAR_IDS: str = "primary"
+    GOOGLE_TOKEN_REFRESH_MARGIN_SECONDS: float = 300
     TIMEZONE: str = "UTC"
+    CALENDAR_CACHE_TTL_SECONDS: float = 30
+    GOOGLE_CALENDAR_ASYNC: bool = False
+    GOOGLE_CALENDAR_API_URL: str = "https://www.googleapis.com/calendar/v3"
+    GOOGLE_HTTP_POOL_SIZE: int = 20
+    GOOGLE_HTTP2: bool = True
+    # Per-user credentials, leave the directory empty for a single account from GOOGLE_CALENDAR_TOKEN_PATH
+    GOOGLE_CREDENTIALS_STORE_DIR: str = ""
+    GOOGLE_CREDENTIALS_KEY: str = ""
+    GOOGLE_OAUTH_REDIRECT_URI: str = "http://localhost"
+    CALENDAR_REGISTRY_SIZE: int = 256
+    # Google's default quotas, 0 turns a limit off
+    GOOGLE_USER_REQUESTS_PER_SECOND: float = 10
+    GOOGLE_USER_BURST: int = 20
+    GOOGLE_PROJECT_REQUESTS_PER_SECOND: float = 150
+    GOOGLE_PROJECT_BURST: int = 300
+    GOOGLE_MAX_RETRIES: int = 5
+    GOOGLE_BACKOFF_BASE_SECONDS: float = 0.5
+    GOOGLE_BACKOFF_MAX_SECONDS: float = 32
+
+    MAX_CONCURRENT_TURNS: int = 4
+    MAX_QUEUED_TURNS_PER_CHAT: int = 5
+
+    SESSION_MAX_SESSIONS: int = 1000
+    SESSION_TTL_SECONDS: float = 3600
+    SESSION_MAX_MESSAGES: int = 40
+    SESSION_DB_PATH: str = ""
+
+    HISTORY_TOKEN_BUDGET: int = 1500
+    HISTORY_KEEP_TURNS: int = 4
+    HISTORY_COMPACTION_MODE: str = "summarize"
+
+    FAST_PATH_ENABLED: bool = True
+    # Answers to repeated read-only questions, 0 disables the cache
+    RESPONSE_CACHE_SIZE: int = 512
+    RESPONSE_CACHE_TTL_SECONDS: float = 300
+    TOOL_MAX_WORKERS: int = 8
+    WORKING_HOURS_START: str = "09:00"
+    WORKING_HOURS_END: str = "17:00"
+
+    LOG_LEVEL: str = "INFO"
+    METRICS_PORT: int = 0
 
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
+        # Shared by the whole process, nothing may change it in place
+        frozen = True
+
+    @property
+    def tz(self) -> tzinfo:
+        return get_timezone(self.TIMEZONE)
 
+    @property
+    def calendar_ids(self) -> List[str]:
+        return [calendar_id.strip() for calendar_id in self.GOOGLE_CALENDAR_IDS.split(',') if calendar_id.strip()] or ['primary']
+
+
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
+    """
+    The process wide settings, read from the environment and .env once.
+    Call reload_settings() to pick up changes.
+    """
     return Settings()
 
+
+def reload_settings() -> Settings:
+    get_settings.cache_clear()
+    return get_settings()
+
+
+@lru_cache(maxsize=None)
+def get_timezone(name: str) -> tzinfo:
+    return pytz.timezone(name)
+
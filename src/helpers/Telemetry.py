@@ -0,0 +1,165 @@
+import contextvars
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+from uuid import UUID
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from prometheus_client import Counter, Histogram, start_http_server
+
+logger = logging.getLogger(__name__)
+
+# Correlates every span of one user turn in the logs
+current_turn: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_turn", default=None)
+
+TURN_SECONDS = Histogram(
+    "calendar_turn_seconds", "End to end time of one user turn",
+    ["path", "status"]
+)
+LLM_SECONDS = Histogram(
+    "calendar_llm_call_seconds", "Time of one LLM call",
+    ["model", "status"]
+)
+LLM_PROMPT_TOKENS = Counter("calendar_llm_prompt_tokens_total", "Prompt tokens evaluated by the LLM", ["model"])
+LLM_COMPLETION_TOKENS = Counter("calendar_llm_completion_tokens_total", "Tokens generated by the LLM", ["model"])
+TOOL_SECONDS = Histogram(
+    "calendar_tool_seconds", "Time of one agent tool invocation",
+    ["tool", "status"]
+)
+GOOGLE_SECONDS = Histogram(
+    "calendar_google_request_seconds", "Time of one Google Calendar API request",
+    ["operation", "status"]
+)
+GOOGLE_RETRIES = Counter(
+    "calendar_google_retries_total", "Google Calendar API requests retried after a rate limit or server error",
+    ["operation", "reason"]
+)
+GOOGLE_THROTTLE_SECONDS = Histogram(
+    "calendar_google_throttle_seconds", "Time a Google Calendar API request waited for quota",
+    ["scope"]
+)
+GOOGLE_COALESCED = Counter(
+    "calendar_google_coalesced_total", "Reads answered by an identical request already in flight",
+    ["operation"]
+)
+TELEGRAM_SECONDS = Histogram(
+    "calendar_telegram_send_seconds", "Time of one Telegram send or edit",
+    ["operation", "status"]
+)
+TELEGRAM_UPDATES = Counter(
+    "calendar_telegram_updates_total", "Updates received over the webhook",
+    ["status"]
+)
+TELEGRAM_QUEUE_SECONDS = Histogram(
+    "calendar_telegram_queue_seconds", "Time a webhook update waited in the inbound queue"
+)
+
+
+def configure_logging(level: str = "INFO"):
+    logging.basicConfig(
+        level=level.upper(),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+
+
+def start_metrics_server(port: int):
+    """Serve all metrics in the Prometheus text format on http://0.0.0.0:<port>/metrics"""
+    if port > 0:
+        start_http_server(port)
+        logger.info("Metrics available on port %d at /metrics", port)
+
+
+def _log_span(name: str, elapsed: float, labels: Dict[str, Any]):
+    logger.debug(
+        "span=%s turn=%s duration_ms=%.1f %s",
+        name, current_turn.get() or "-", elapsed * 1000,
+        " ".join(f"{key}={value}" for key, value in labels.items())
+    )
+
+
+@contextmanager
+def span(name: str, histogram: Optional[Histogram] = None, **labels):
+    """
+    Time the block, log it at DEBUG and record it in `histogram`. The block can
+    set labels['status'] itself; an exception records status="error".
+    """
+    labels.setdefault("status", "ok")
+    start = time.perf_counter()
+    try:
+        yield labels
+    except BaseException:
+        labels["status"] = "error"
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        if histogram is not None:
+            histogram.labels(**labels).observe(elapsed)
+        _log_span(name, elapsed, labels)
+
+
+@contextmanager
+def turn_span(path: str):
+    """Span for a whole user turn, every span inside it carries the same turn id"""
+    token = current_turn.set(current_turn.get() or uuid.uuid4().hex[:8])
+    try:
+        with span("turn", TURN_SECONDS, path=path) as labels:
+            yield labels
+    finally:
+        current_turn.reset(token)
+
+
+class TelemetryCallback(BaseCallbackHandler):
+    """Times every LLM call and tool invocation the agent makes"""
+
+    def __init__(self, model: str = "unknown"):
+        self.model = model
+        self._started: Dict[UUID, float] = {}
+        self._tools: Dict[UUID, str] = {}
+
+    def _finish(self, run_id: UUID) -> float:
+        return time.perf_counter() - self._started.pop(run_id, time.perf_counter())
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs: Any) -> None:
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs: Any) -> None:
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        elapsed = self._finish(run_id)
+        prompt_tokens = completion_tokens = 0
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                metadata = getattr(message, "response_metadata", None) or generation.generation_info or {}
+                prompt_tokens += metadata.get("prompt_eval_count") or 0
+                completion_tokens += metadata.get("eval_count") or 0
+        LLM_SECONDS.labels(model=self.model, status="ok").observe(elapsed)
+        LLM_PROMPT_TOKENS.labels(model=self.model).inc(prompt_tokens)
+        LLM_COMPLETION_TOKENS.labels(model=self.model).inc(completion_tokens)
+        _log_span("llm", elapsed, {"model": self.model, "prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens})
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        elapsed = self._finish(run_id)
+        LLM_SECONDS.labels(model=self.model, status="error").observe(elapsed)
+        _log_span("llm", elapsed, {"model": self.model, "status": "error"})
+
+    def on_tool_start(self, serialized, input_str, *, run_id: UUID, **kwargs: Any) -> None:
+        self._started[run_id] = time.perf_counter()
+        self._tools[run_id] = (serialized or {}).get("name") or kwargs.get("name") or "unknown"
+
+    def _tool_done(self, run_id: UUID, status: str):
+        elapsed = self._finish(run_id)
+        tool = self._tools.pop(run_id, "unknown")
+        TOOL_SECONDS.labels(tool=tool, status=status).observe(elapsed)
+        _log_span("tool", elapsed, {"tool": tool, "status": status})
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        # Tools report failures as text instead of raising
+        status = "error" if str(output).startswith(("❌", "Failed")) else "ok"
+        self._tool_done(run_id, status)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._tool_done(run_id, "error")
@@ -0,0 +1,18 @@
+import os
+import pytest
+from src.Benchmark.BenchmarkRunner import OFFLINE_SETTINGS
+
+# Settings are required fields, the suite never talks to Ollama, Telegram or Google
+for key, value in OFFLINE_SETTINGS.items():
+    os.environ.setdefault(key, value)
+os.environ.setdefault("GOOGLE_BACKOFF_BASE_SECONDS", "0.01")
+os.environ.setdefault("GOOGLE_BACKOFF_MAX_SECONDS", "0.05")
+
+
+@pytest.fixture(autouse=True)
+def settings(monkeypatch):
+    """Fresh settings per test, tests change them with monkeypatch.setenv and reload_settings()"""
+    from src.helpers.Config import reload_settings
+    yield reload_settings()
+    monkeypatch.undo()
+    reload_settings()
@@ -0,0 +1,132 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+import pytest
+from google.oauth2.credentials import Credentials
+from src.Benchmark.FakeGoogleCalendar import FakeCalendarApi
+from src.calenderProvider.AsyncGoogleCalendar import AsyncGoogleCalendar
+from src.calenderProvider.GoogleCalendarInterface import CalendarEvent, EventDateTime, EventFilters, EventPatch
+from src.calenderProvider.RequestScheduler import RequestScheduler
+
+START = datetime(2026, 3, 2, 9, tzinfo=timezone.utc)
+
+
+def event(title: str, start: datetime, minutes: int = 60) -> CalendarEvent:
+    return CalendarEvent(
+        title=title,
+        start_time=EventDateTime(date_time=start),
+        end_time=EventDateTime(date_time=start + timedelta(minutes=minutes))
+    )
+
+
+def run(scenario, cache_ttl_seconds: float = 0, **api_options):
+    """Runs `scenario(api, calendar)` against a fresh fake API"""
+    async def main():
+        api = FakeCalendarApi(retry_after_seconds=0.01, **api_options)
+        api._calendar('primary')
+        await api.start()
+        calendar = AsyncGoogleCalendar(base_url=api.base_url, http2=False, cache_ttl_seconds=cache_ttl_seconds)
+        calendar.credentials = Credentials(token="offline")
+        calendar.scheduler = RequestScheduler(base_delay=0.01, max_delay=0.05)
+        try:
+            return await scenario(api, calendar)
+        finally:
+            await calendar.close()
+            await api.stop()
+    return asyncio.run(main())
+
+
+def test_add_get_and_list():
+    async def scenario(api, calendar):
+        created = await calendar.add_event(event("Standup", START))
+        assert created.id and created.etag
+        assert (await calendar.get_event(created.id)).title == "Standup"
+        listed = await calendar.list_events(EventFilters(start_date=START - timedelta(hours=1), end_date=START + timedelta(hours=2)))
+        assert [item.id for item in listed] == [created.id]
+        assert await calendar.list_events(EventFilters(start_date=START + timedelta(days=1), end_date=START + timedelta(days=2))) == []
+    run(scenario)
+
+
+def test_list_pages_through_results():
+    async def scenario(api, calendar):
+        api.seed([event(f"Slot {hour}", START + timedelta(hours=hour)) for hour in range(5)])
+        calendar.MAX_PAGE_SIZE = 2
+        listed = await calendar.list_events(EventFilters(start_date=START, end_date=START + timedelta(days=1), max_results=None))
+        assert [item.title for item in listed] == [f"Slot {hour}" for hour in range(5)]
+    run(scenario)
+
+
+def test_patch_with_stale_etag_is_a_conflict():
+    async def scenario(api, calendar):
+        created = await calendar.add_event(event("Review", START))
+        patched = await calendar.patch_event(created.id, EventPatch(title="Design review"), created.etag)
+        assert patched.title == "Design review"
+        assert patched.etag != created.etag
+        with pytest.raises(Exception, match="was changed since it was last read"):
+            await calendar.patch_event(created.id, EventPatch(title="Stale"), created.etag)
+        assert (await calendar.get_event(created.id)).title == "Design review"
+    run(scenario)
+
+
+def test_delete_and_missing_event():
+    async def scenario(api, calendar):
+        created = await calendar.add_event(event("Lunch", START))
+        assert await calendar.delete_event(created.id)
+        with pytest.raises(Exception, match="Event not found"):
+            await calendar.get_event(created.id)
+        assert api.stats()['events'] == 0
+    run(scenario)
+
+
+def test_incremental_sync_picks_up_remote_changes():
+    async def scenario(api, calendar):
+        api.seed([event("Existing", START)])
+        window = EventFilters(start_date=START - timedelta(hours=1), end_date=START + timedelta(days=1))
+        assert [item.title for item in await calendar.list_events(window)] == ["Existing"]
+        api.seed([event("Added elsewhere", START + timedelta(hours=2))])
+        await asyncio.sleep(0.02)
+        assert [item.title for item in await calendar.list_events(window)] == ["Existing", "Added elsewhere"]
+        # The second list is a syncToken request for the changes only
+        assert api.calls['list'] == 2
+    run(scenario, cache_ttl_seconds=0.01)
+
+
+def test_busy_intervals_from_freebusy():
+    async def scenario(api, calendar):
+        api.seed([event("Busy", START, minutes=30)])
+        busy = await calendar.get_busy_intervals(START - timedelta(hours=1), START + timedelta(hours=2))
+        assert busy == [(START, START + timedelta(minutes=30))]
+        assert api.calls['freebusy'] == 1
+    run(scenario)
+
+
+def test_reads_retry_through_throttling_and_outages():
+    async def scenario(api, calendar):
+        api.seed([event(f"Meeting {index}", START + timedelta(hours=index)) for index in range(3)])
+        window = EventFilters(start_date=START, end_date=START + timedelta(days=1))
+        for _ in range(6):
+            assert len(await calendar.list_events(window)) == 3
+        assert api.calls['throttled'] and api.calls['unavailable']
+        assert calendar.scheduler.stats()['retries'] >= api.calls['throttled'] + api.calls['unavailable']
+    run(scenario, rate_limit_every=3, unavailable_every=4)
+
+
+def test_inserts_are_not_retried_after_a_server_error():
+    async def scenario(api, calendar):
+        with pytest.raises(Exception, match="Failed to create event"):
+            await calendar.add_event(event("Once", START))
+        assert api.calls['insert'] == 0
+        assert api.calls['unavailable'] == 1
+    run(scenario, unavailable_every=1)
+
+
+def test_conditional_patch_is_not_retried_after_a_server_error():
+    async def scenario(api, calendar):
+        created = await calendar.add_event(event("Review", START))
+        api.unavailable_every = 1
+        # A retry of a patch that went through would fail its own If-Match
+        with pytest.raises(Exception, match="Failed to patch event"):
+            await calendar.patch_event(created.id, EventPatch(title="Design review"), created.etag)
+        assert api.calls['unavailable'] == 1
+        api.unavailable_every = 0
+        assert (await calendar.patch_event(created.id, EventPatch(title="Design review"))).title == "Design review"
+    run(scenario)
@@ -0,0 +1,76 @@
+import time
+from datetime import datetime, timezone
+from src.calenderProvider.EventCache import EventCache
+
+UTC = timezone.utc
+WINDOW = (datetime(2026, 3, 1, tzinfo=UTC), datetime(2026, 3, 8, tzinfo=UTC))
+
+
+def event(event_id: str, day: int, hour: int = 9, **extra) -> dict:
+    return {
+        'id': event_id, 'summary': event_id,
+        'start': {'dateTime': f"2026-03-{day:02d}T{hour:02d}:00:00Z"},
+        'end': {'dateTime': f"2026-03-{day:02d}T{hour + 1:02d}:00:00Z"},
+        **extra
+    }
+
+
+def ids(cache: EventCache) -> list:
+    return [item['id'] for item in cache.query(*WINDOW)]
+
+
+def test_incremental_sync_applies_changes_only():
+    cache = EventCache(ttl_seconds=60)
+    cache.replace([event('a', 2), event('b', 3)], "t1", "UTC")
+    assert cache.is_fresh and cache.sync_token == "t1"
+    version = cache.version
+
+    cache.update([event('c', 4), {'id': 'a', 'status': 'cancelled'}, event('b', 5, summary='moved')], "t2", "UTC")
+    assert ids(cache) == ['c', 'b']
+    assert cache.get('b')['summary'] == 'moved'
+    assert cache.sync_token == "t2"
+    assert cache.version > version
+
+
+def test_an_empty_sync_keeps_the_version():
+    cache = EventCache(ttl_seconds=60)
+    cache.replace([event('a', 2)], "t1", "UTC")
+    version = cache.version
+    cache.update([], "t2", "UTC")
+    assert cache.version == version
+    assert cache.sync_token == "t2"
+
+
+def test_freshness_expires_with_the_ttl():
+    cache = EventCache(ttl_seconds=0.01)
+    assert not cache.is_fresh
+    cache.replace([], "t1")
+    assert cache.is_fresh
+    time.sleep(0.02)
+    assert not cache.is_fresh
+
+
+def test_a_zone_change_forces_a_full_sync():
+    cache = EventCache(ttl_seconds=60)
+    cache.replace([], "t1", "UTC")
+    cache.update([], "t2", "Asia/Riyadh")
+    assert cache.sync_token is None and not cache.is_fresh
+
+
+def test_cancelling_a_series_drops_its_exceptions():
+    cache = EventCache(ttl_seconds=60)
+    series = event('s', 2, recurrence=['RRULE:FREQ=DAILY;COUNT=3'])
+    moved = event('s_20260303T090000Z', 3, hour=14, recurringEventId='s', originalStartTime={'dateTime': '2026-03-03T09:00:00Z'})
+    cache.replace([series, moved], "t1", "UTC")
+    assert ids(cache) == ['s_20260302T090000Z', 's_20260303T090000Z', 's_20260304T090000Z']
+    cache.update([{'id': 's', 'status': 'cancelled'}], "t2", "UTC")
+    assert ids(cache) == []
+    assert len(cache) == 0
+
+
+def test_query_filters_and_limits():
+    cache = EventCache(ttl_seconds=60)
+    cache.replace([event('late', 5), event('early', 2, location='Room 4'), event('outside', 20)], "t1", "UTC")
+    assert ids(cache) == ['early', 'late']
+    assert [item['id'] for item in cache.query(*WINDOW, search_query="room")] == ['early']
+    assert [item['id'] for item in cache.query(*WINDOW, limit=1)] == ['early']
@@ -0,0 +1,47 @@
+from datetime import datetime, time, timedelta, timezone
+from src.calenderProvider.FreeBusyIndex import FreeBusyIndex, busy_from_events, merge_intervals
+
+UTC = timezone.utc
+
+
+def at(day: int, hour: int, minute: int = 0) -> datetime:
+    return datetime(2026, 3, day, hour, minute, tzinfo=UTC)
+
+
+def test_merge_joins_overlapping_and_touching_blocks():
+    merged = merge_intervals([(at(2, 10), at(2, 11)), (at(2, 9), at(2, 10)), (at(2, 10, 30), at(2, 12)), (at(2, 14), at(2, 14))])
+    assert merged == [(at(2, 9), at(2, 12))]
+
+
+def test_gaps_between_busy_blocks():
+    index = FreeBusyIndex([(at(2, 10), at(2, 11)), (at(2, 13), at(2, 14))])
+    assert list(index.gaps(at(2, 9), at(2, 17))) == [(at(2, 9), at(2, 10)), (at(2, 11), at(2, 13)), (at(2, 14), at(2, 17))]
+    # Windows starting or ending inside a busy block
+    assert list(index.gaps(at(2, 10, 30), at(2, 13, 30))) == [(at(2, 11), at(2, 13))]
+    assert list(index.gaps(at(2, 10, 15), at(2, 10, 45))) == []
+
+
+def test_is_free():
+    index = FreeBusyIndex([(at(2, 10), at(2, 11))])
+    assert index.is_free(at(2, 9), at(2, 10))
+    assert index.is_free(at(2, 11), at(2, 12))
+    assert not index.is_free(at(2, 10, 30), at(2, 12))
+    assert not index.is_free(at(2, 9), at(2, 12))
+
+
+def test_free_slots_stay_in_working_hours_and_skip_weekends():
+    # 2026-03-06 is a Friday
+    index = FreeBusyIndex([(at(6, 9), at(6, 15))])
+    slots = index.free_slots(at(6, 0), at(9, 23), timedelta(hours=1), tz="UTC", day_start=time(9), day_end=time(17))
+    assert slots == [(at(6, 15), at(6, 17)), (at(9, 9), at(9, 17))]
+    assert index.free_slots(at(6, 0), at(9, 23), timedelta(hours=3), tz="UTC") == [(at(9, 9), at(9, 17))]
+
+
+def test_transparent_and_all_day_events():
+    items = [
+        {'start': {'dateTime': '2026-03-02T10:00:00Z'}, 'end': {'dateTime': '2026-03-02T11:00:00Z'}, 'transparency': 'transparent'},
+        {'start': {'date': '2026-03-03'}, 'end': {'date': '2026-03-04'}},
+    ]
+    assert busy_from_events(items, UTC) == [(at(3, 0), at(4, 0))]
+    index = FreeBusyIndex(busy_from_events(items, UTC))
+    assert index.free_slots(at(2, 0), at(4, 0), timedelta(hours=8), tz="UTC") == [(at(2, 9), at(2, 17))]
@@ -0,0 +1,67 @@
+from datetime import date, datetime, timedelta, timezone
+import pytest
+from src.Agent.IntentRouter import IntentRouter, needs_reasoning, resolve_day
+from src.Benchmark.InMemoryCalendar import InMemoryCalendar
+from src.calenderProvider.GoogleCalendarInterface import CalendarEvent, EventDateTime
+
+# Monday
+NOW = datetime(2026, 3, 2, 8, tzinfo=timezone.utc)
+
+
+def route(message: str):
+    return IntentRouter(None, "UTC").route(message, NOW)
+
+
+@pytest.mark.parametrize("message", [
+    "Schedule lunch with Sarah tomorrow at noon",
+    "schedule dentist on friday at 3pm",
+    "My meeting tomorrow is moved to 4pm",
+    "Meetings tomorrow should be shifted by an hour",
+    "calendar: gym tomorrow 6am",
+    "Plans for dinner with Sam tomorrow at 7, put it in",
+    "Push my standup tomorrow",
+    "Can you postpone tomorrow's meetings?",
+    "I have a dentist appointment tomorrow",
+    "My next meeting should be at 5",
+    "When am I free tomorrow?",
+])
+def test_writes_and_statements_go_to_the_agent(message):
+    assert route(message) is None
+
+
+@pytest.mark.parametrize("message, intent, start", [
+    ("what's on tomorrow", "day", datetime(2026, 3, 3, tzinfo=timezone.utc)),
+    ("Any meetings on Friday?", "day", datetime(2026, 3, 6, tzinfo=timezone.utc)),
+    ("what's on my schedule today", "day", datetime(2026, 3, 2, tzinfo=timezone.utc)),
+    ("show me tomorrow's meetings", "day", datetime(2026, 3, 3, tzinfo=timezone.utc)),
+    ("my schedule this week", "week", datetime(2026, 3, 2, tzinfo=timezone.utc)),
+    ("What do I have next week?", "week", datetime(2026, 3, 9, tzinfo=timezone.utc)),
+    ("next meeting", "next", NOW),
+    ("what's my next meeting?", "next", NOW),
+])
+def test_questions_and_listing_phrases_take_the_fast_path(message, intent, start):
+    match = route(message)
+    assert match is not None and match.intent == intent
+    assert match.filters.start_date == start
+
+
+def test_resolve_day():
+    monday = date(2026, 3, 2)
+    assert resolve_day("tomorrow", "tomorrow", monday) == date(2026, 3, 3)
+    assert resolve_day("monday", "monday", monday) == monday
+    assert resolve_day("monday", "next monday", monday) == date(2026, 3, 9)
+
+
+def test_needs_reasoning():
+    assert not needs_reasoning("what's on tomorrow?")
+    assert needs_reasoning("find a free slot for a 1h review this week")
+
+
+def test_answer_lists_the_day():
+    day = datetime.now(timezone.utc).replace(hour=12, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    calendar = InMemoryCalendar([CalendarEvent(title="Dentist", start_time=EventDateTime(date_time=day), end_time=EventDateTime(date_time=day + timedelta(hours=1)))])
+    router = IntentRouter(calendar, "UTC")
+    match = router.route("What's on tomorrow?")
+    answer = router.answer(match)
+    assert "1 event(s)" in answer and "Dentist" in answer and "12:00 PM - 01:00 PM" in answer
+    assert router.stats()["hits"] == 1
@@ -0,0 +1,73 @@
+import threading
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+from cryptography.fernet import Fernet
+from google.oauth2.credentials import Credentials
+from src.Benchmark.InMemoryCalendar import InMemoryCalendar
+from src.calenderProvider.CalendarRegistry import CalendarRegistry
+from src.calenderProvider.CredentialStore import EncryptedCredentialStore
+from src.calenderProvider.GoogleCalendarInterface import EventFilters
+from src.calenderProvider.MultiCalendar import MultiCalendar
+from src.helpers.Config import reload_settings
+
+
+class GatedCalendar(InMemoryCalendar):
+    """Every listing waits until all expected listings have started"""
+    def __init__(self, gate: threading.Barrier):
+        super().__init__()
+        self.gate = gate
+        self.closed = False
+
+    def list_events(self, filters):
+        self.gate.wait(timeout=2)
+        return super().list_events(filters)
+
+    def close(self):
+        self.closed = True
+
+
+def test_fan_outs_of_concurrent_turns_do_not_queue(monkeypatch):
+    monkeypatch.setenv("MAX_CONCURRENT_TURNS", "2")
+    reload_settings()
+    # Two turns over two calendars, all four listings must run at once
+    gate = threading.Barrier(4)
+    multi = MultiCalendar([GatedCalendar(gate), GatedCalendar(gate)])
+    try:
+        with ThreadPoolExecutor(max_workers=2) as turns:
+            results = [turns.submit(multi.list_events, EventFilters()) for _ in range(2)]
+            assert [future.result(timeout=5) for future in results] == [[], []]
+        assert not gate.broken
+    finally:
+        multi.close()
+
+
+def test_close_shuts_down_the_pool_and_the_calendars():
+    calendars = [GatedCalendar(threading.Barrier(1)), GatedCalendar(threading.Barrier(1))]
+    multi = MultiCalendar(calendars, max_workers=2)
+    multi.list_events(EventFilters())
+    multi.close()
+    assert all(calendar.closed for calendar in calendars)
+    assert multi._pool._shutdown
+
+
+def test_registry_closes_evicted_providers(tmp_path):
+    store = EncryptedCredentialStore(str(tmp_path), Fernet.generate_key().decode())
+    # google-auth keeps expiries as naive UTC
+    expiry = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(hours=1)
+    for user_id in (1, 2):
+        store.save(user_id, Credentials(token="token", refresh_token="refresh", client_id="client", client_secret="secret", expiry=expiry))
+    built = {}
+
+    def factory(user_id, credentials):
+        built[user_id] = MultiCalendar([GatedCalendar(threading.Barrier(1))], max_workers=1)
+        return built[user_id]
+
+    registry = CalendarRegistry(store, max_size=1, factory=factory)
+    registry.get(1)
+    registry.get(2)
+    assert built[1]._pool._shutdown and built[1].calendars[0].closed
+    assert not built[2]._pool._shutdown
+
+    registry.evict(2)
+    assert built[2]._pool._shutdown
+    registry.close()
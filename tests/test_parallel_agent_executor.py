@@ -0,0 +1,94 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import pytest
+from langchain.agents import create_tool_calling_agent
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.tools import StructuredTool
+from src.Agent.ParallelAgentExecutor import ParallelAgentExecutor
+from src.Agent.tools import get_calendar_tools
+from src.Benchmark.FakeOllama import ScriptedChatModel
+from src.Benchmark.InMemoryCalendar import InMemoryCalendar
+
+PROMPT = ChatPromptTemplate.from_messages([("human", "{input}"), MessagesPlaceholder("agent_scratchpad")])
+
+
+class Concurrency:
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+
+    def __exit__(self, *exc):
+        with self._lock:
+            self.active -= 1
+
+
+def build_executor(tools, script, pool) -> ParallelAgentExecutor:
+    model = ScriptedChatModel(script=script)
+    agent = create_tool_calling_agent(model, tools, PROMPT)
+    return ParallelAgentExecutor(agent=agent, tools=tools, tool_executor=pool, return_intermediate_steps=True, max_iterations=3)
+
+
+def test_tool_calls_of_one_step_run_concurrently_and_return_in_order():
+    running = Concurrency()
+
+    def lookup(n: int) -> str:
+        """Look up item n"""
+        with running:
+            # Later calls finish first
+            time.sleep(0.05 * (3 - n))
+        return f"item {n}"
+
+    tools = [StructuredTool.from_function(lookup)]
+    script = {"go": [[{"name": "lookup", "args": {"n": n}} for n in range(3)], "done"]}
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        result = build_executor(tools, script, pool).invoke({"input": "go"})
+    assert result["output"] == "done"
+    assert [observation for _, observation in result["intermediate_steps"]] == ["item 0", "item 1", "item 2"]
+    assert running.peak == 3
+
+
+class TrackingCalendar(InMemoryCalendar):
+    """Records how many writes were in flight at once"""
+
+    def __init__(self, events=()):
+        super().__init__(events, latency_seconds=0.05)
+        self.writes = Concurrency()
+
+    def add_event(self, event):
+        with self.writes:
+            return super().add_event(event)
+
+
+def calendar_script():
+    start = datetime.now().replace(minute=0, second=0, microsecond=0) + timedelta(days=1)
+    adds = [
+        {"name": "add_calendar_event", "args": {"title": f"Block {n}", "start_datetime": (start + timedelta(hours=n)).isoformat(), "end_datetime": (start + timedelta(hours=n, minutes=30)).isoformat()}}
+        for n in range(3)
+    ]
+    return {"add three": [adds, "added"]}
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_mutating_tools_stay_serialized(use_async):
+    calendar = TrackingCalendar()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        tools = get_calendar_tools(calendar, executor=pool)
+        executor = build_executor(tools, calendar_script(), pool)
+        if use_async:
+            result = asyncio.run(executor.ainvoke({"input": "add three"}))
+        else:
+            result = executor.invoke({"input": "add three"})
+    assert result["output"] == "added"
+    observations = [observation for _, observation in result["intermediate_steps"]]
+    assert [f"Block {n}" in observation for n, observation in enumerate(observations)] == [True] * 3
+    assert calendar.calls["insert"] == 3
+    assert calendar.writes.peak == 1
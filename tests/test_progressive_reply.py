@@ -0,0 +1,71 @@
+import asyncio
+import pytest
+from telegram.error import BadRequest, NetworkError, RetryAfter, TimedOut
+from src.Benchmark.FakeTelegram import FakeBot, FakeMessage
+from src.TelegramInterface.ProgressiveReply import ProgressiveReply
+
+
+class FailingMessage(FakeMessage):
+    """A sent message whose edits fail with `error` (an exception or a factory)"""
+
+    def __init__(self, chat_id: int, text: str, error):
+        super().__init__(chat_id, text)
+        self.error = error
+
+    async def edit_text(self, text: str, **kwargs):
+        raise self.error() if callable(self.error) else self.error
+
+
+class UserMessage(FakeMessage):
+    """The user's message, the bot's first reply to it fails edits with `error`"""
+
+    def __init__(self, error):
+        super().__init__(chat_id=1, text="what's on tomorrow?")
+        self.error = error
+
+    async def reply_text(self, text: str, **kwargs) -> FakeMessage:
+        reply = FailingMessage(self.chat_id, text, self.error) if not self.replies else FakeMessage(self.chat_id, text)
+        self.replies.append(reply)
+        return reply
+
+
+def answer_after(error, updates=()):
+    async def main():
+        message = UserMessage(error)
+        reply = ProgressiveReply(FakeBot(), message, min_interval=0)
+        await reply.start()
+        for text in updates:
+            await reply.update(text)
+        await reply.finish("Tomorrow: dentist at 10")
+        return [sent.text for sent in message.replies]
+    return asyncio.run(main())
+
+
+@pytest.mark.parametrize("error", [
+    TimedOut(),
+    NetworkError("connection reset"),
+    BadRequest("Message to edit not found"),
+    lambda: RetryAfter(0),
+])
+def test_failed_final_edit_sends_the_answer(error):
+    assert answer_after(error) == ["…", "Tomorrow: dentist at 10"]
+
+
+def test_unchanged_message_is_not_sent_again():
+    assert answer_after(BadRequest("Message is not modified")) == ["…"]
+
+
+def test_failed_progress_edits_do_not_stop_the_answer():
+    assert answer_after(TimedOut(), updates=["Tomorrow", "Tomorrow: dentist"]) == ["…", "Tomorrow: dentist at 10"]
+
+
+def test_successful_edit_replaces_the_placeholder():
+    async def main():
+        message = FakeMessage(chat_id=1)
+        reply = ProgressiveReply(FakeBot(), message, min_interval=0)
+        await reply.start()
+        await reply.finish("Tomorrow: dentist at 10")
+        return message
+    message = asyncio.run(main())
+    assert [sent.text for sent in message.replies] == ["Tomorrow: dentist at 10"]
+    assert message.replies[0].edits == 1
@@ -0,0 +1,92 @@
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+import pytest
+from pydantic import ValidationError
+from src.Agent.ToolOutput import EventHandles, encode_event
+from src.calenderProvider.EventCache import EventCache
+from src.calenderProvider.GoogleCalendarInterface import CalendarEvent, event_interval
+
+RIYADH = ZoneInfo("Asia/Riyadh")
+
+
+def cache_with(*items, time_zone: str = "Asia/Riyadh") -> EventCache:
+    cache = EventCache(ttl_seconds=60)
+    cache.replace(items, "token", time_zone)
+    return cache
+
+
+def test_all_day_event_validates_and_is_anchored_in_the_calendar_zone():
+    holiday = CalendarEvent.model_validate({
+        'id': 'holiday', 'summary': 'National Day',
+        'start': {'date': '2026-09-23'}, 'end': {'date': '2026-09-24'}
+    })
+    assert holiday.start_time.is_all_day
+    assert holiday.start_time.day == date(2026, 9, 23)
+    start, end = event_interval(holiday, RIYADH)
+    assert start == datetime(2026, 9, 23, tzinfo=RIYADH)
+    assert end - start == timedelta(days=1)
+    assert encode_event(holiday, EventHandles(), "Asia/Riyadh") == "e1|2026-09-23/all-day|National Day"
+    # Sent back to Google the way it came
+    assert holiday.model_dump(by_alias=True, exclude_unset=True, mode='json')['start'] == {'date': '2026-09-23'}
+
+
+@pytest.mark.parametrize("start", [{}, {'date': '2026-09-23', 'dateTime': '2026-09-23T09:00:00Z'}])
+def test_event_time_needs_exactly_one_of_date_and_datetime(start):
+    with pytest.raises(ValidationError):
+        CalendarEvent.model_validate({'summary': 'Broken', 'start': start, 'end': {'date': '2026-09-24'}})
+
+
+def test_yearly_all_day_series_expands_to_valid_events():
+    birthday = {
+        'id': 'bday', 'summary': 'Birthday',
+        'start': {'date': '2024-03-10'}, 'end': {'date': '2024-03-11'},
+        'recurrence': ['RRULE:FREQ=YEARLY']
+    }
+    cache = cache_with(birthday)
+    items = cache.query(datetime(2026, 1, 1, tzinfo=timezone.utc), datetime(2028, 1, 1, tzinfo=timezone.utc))
+    events = [CalendarEvent.model_validate(item) for item in items]
+    assert [event.start_time.day for event in events] == [date(2026, 3, 10), date(2027, 3, 10)]
+    assert all(event.recurring_event_id == 'bday' and event.original_start_time.is_all_day for event in events)
+    assert event_interval(events[0], cache.day_zone)[0] == datetime(2026, 3, 10, tzinfo=RIYADH)
+    # An instance can be read back by id
+    assert CalendarEvent.model_validate(cache.get(events[0].id)).title == "Birthday"
+
+
+def test_moved_and_cancelled_instances_replace_their_occurrences():
+    standup = {
+        'id': 'standup', 'summary': 'Standup',
+        'start': {'dateTime': '2026-03-02T09:00:00', 'timeZone': 'Asia/Riyadh'},
+        'end': {'dateTime': '2026-03-02T09:15:00', 'timeZone': 'Asia/Riyadh'},
+        'recurrence': ['RRULE:FREQ=DAILY;COUNT=5']
+    }
+    moved = {
+        'id': 'standup_20260303T060000Z', 'summary': 'Standup (late)', 'recurringEventId': 'standup',
+        'originalStartTime': {'dateTime': '2026-03-03T09:00:00+03:00'},
+        'start': {'dateTime': '2026-03-03T11:00:00+03:00'}, 'end': {'dateTime': '2026-03-03T11:15:00+03:00'}
+    }
+    cancelled = {
+        'id': 'standup_20260304T060000Z', 'status': 'cancelled', 'recurringEventId': 'standup',
+        'originalStartTime': {'dateTime': '2026-03-04T09:00:00+03:00'}
+    }
+    cache = cache_with(standup, moved, cancelled)
+    items = cache.query(datetime(2026, 3, 1, tzinfo=timezone.utc), datetime(2026, 3, 10, tzinfo=timezone.utc))
+    starts = [event_interval(CalendarEvent.model_validate(item))[0].astimezone(RIYADH) for item in items]
+    assert [(start.day, start.hour) for start in starts] == [(2, 9), (3, 11), (5, 9), (6, 9)]
+    assert items[1]['summary'] == "Standup (late)"
+
+    # Deleting one more instance locally drops just that occurrence
+    cache.remove('standup_20260305T060000Z')
+    assert len(cache.query(datetime(2026, 3, 1, tzinfo=timezone.utc), datetime(2026, 3, 10, tzinfo=timezone.utc))) == 3
+
+
+def test_series_keeps_wall_time_across_dst():
+    weekly = {
+        'id': 'sync', 'summary': 'Team sync',
+        'start': {'dateTime': '2026-03-02T09:00:00', 'timeZone': 'Europe/Berlin'},
+        'end': {'dateTime': '2026-03-02T10:00:00', 'timeZone': 'Europe/Berlin'},
+        'recurrence': ['RRULE:FREQ=WEEKLY;COUNT=6']
+    }
+    items = cache_with(weekly, time_zone="Europe/Berlin").query(datetime(2026, 3, 1, tzinfo=timezone.utc), datetime(2026, 5, 1, tzinfo=timezone.utc))
+    berlin = ZoneInfo("Europe/Berlin")
+    hours = {event_interval(CalendarEvent.model_validate(item))[0].astimezone(berlin).hour for item in items}
+    assert len(items) == 6 and hours == {9}
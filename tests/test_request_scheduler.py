@@ -0,0 +1,142 @@
+import asyncio
+import threading
+import time
+import pytest
+from src.calenderProvider.RequestScheduler import RequestScheduler, parse_retry_after, retry_hint
+
+
+class ServerError(Exception):
+    def __init__(self, status: int, retry_after: float = None):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+def classify(error, idempotent=True):
+    return retry_hint(error.status, retry_after=error.retry_after, idempotent=idempotent) if isinstance(error, ServerError) else None
+
+
+def scheduler(**options) -> RequestScheduler:
+    options = dict(dict(user_rate=0, project_rate=0, max_retries=3, base_delay=0.001, max_delay=0.005), **options)
+    return RequestScheduler(**options)
+
+
+def failing(errors, result="ok"):
+    """A call that raises the given errors in turn and then returns result"""
+    calls = []
+
+    def func():
+        calls.append(time.monotonic())
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return result
+    return func, calls
+
+
+def test_retry_hints():
+    assert retry_hint(429).reason == 'rate_limited'
+    assert retry_hint(403, ['rateLimitExceeded']).project_wide
+    assert retry_hint(403, ['forbidden']) is None
+    assert retry_hint(503, retry_after=2).retry_after == 2
+    assert retry_hint(503, idempotent=False) is None
+    # Rate limited calls never ran, repeating them is always safe
+    assert retry_hint(429, idempotent=False) is not None
+    assert parse_retry_after("1.5") == 1.5
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+
+
+def test_retries_wait_at_least_retry_after():
+    requests = scheduler()
+    func, calls = failing([ServerError(429, retry_after=0.05), ServerError(503)])
+    assert requests.call("user", func, classify) == "ok"
+    assert len(calls) == 3
+    assert calls[1] - calls[0] >= 0.05
+    assert requests.stats()['retries'] == 2
+
+
+def test_gives_up_after_max_retries():
+    requests = scheduler(max_retries=2)
+    func, calls = failing([ServerError(503)] * 5)
+    with pytest.raises(ServerError):
+        requests.call("user", func, classify)
+    assert len(calls) == 3
+    assert requests.stats()['gave_up'] == 1
+
+
+def test_server_errors_of_non_idempotent_calls_are_not_retried():
+    requests = scheduler()
+    func, calls = failing([ServerError(503)])
+    with pytest.raises(ServerError):
+        requests.call("user", func, lambda error: classify(error, idempotent=False))
+    assert len(calls) == 1
+    assert requests.stats()['retries'] == 0
+
+
+def test_identical_reads_in_flight_share_one_call():
+    requests = scheduler()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def read():
+        calls.append(1)
+        started.set()
+        release.wait(timeout=2)
+        return "events"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(requests.call("user", read, classify, coalesce_key="list")))
+    leader.start()
+    started.wait(timeout=2)
+    follower = threading.Thread(target=lambda: results.append(requests.call("user", read, classify, coalesce_key="list")))
+    follower.start()
+    while requests.stats()['coalesced'] == 0:
+        time.sleep(0.001)
+    release.set()
+    leader.join()
+    follower.join()
+    assert results == ["events", "events"]
+    assert len(calls) == 1
+
+
+def test_async_reads_coalesce_and_errors_reach_every_caller():
+    requests = scheduler()
+    calls = []
+
+    async def read():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "events"
+
+    async def broken():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise ServerError(404)
+
+    async def main():
+        shared = await asyncio.gather(*(requests.acall("user", read, classify, coalesce_key="list") for _ in range(3)))
+        assert shared == ["events"] * 3
+        assert len(calls) == 1
+        # Other keys and calls after the first finished are not merged
+        await requests.acall("user", read, classify, coalesce_key="other")
+        await requests.acall("user", read, classify, coalesce_key="list")
+        assert len(calls) == 3
+        failed = await asyncio.gather(*(requests.acall("user", broken, classify, coalesce_key="get") for _ in range(2)), return_exceptions=True)
+        assert all(isinstance(error, ServerError) for error in failed)
+        assert len(calls) == 4
+
+    asyncio.run(main())
+    assert requests.stats()['coalesced'] == 3
+
+
+def test_conditional_and_insert_requests_are_not_idempotent():
+    from googleapiclient.http import HttpRequest
+    from src.calenderProvider.GoogleCalendar import is_idempotent
+
+    def request(method, headers=None):
+        return HttpRequest(None, None, "https://example.invalid/events", method=method, headers=headers)
+
+    assert is_idempotent(request('GET'))
+    assert is_idempotent(request('PATCH'))
+    assert not is_idempotent(request('PATCH', {'If-Match': '"etag"'}))
+    assert not is_idempotent(request('POST'))
@@ -0,0 +1,83 @@
+import asyncio
+from datetime import datetime, timedelta
+from src.Agent.CalendarAgent import CalendarAgent
+from src.Agent.ResponseCache import ResponseCache
+from src.Benchmark.FakeOllama import FakeOllamaLLM
+from src.Benchmark.InMemoryCalendar import InMemoryCalendar
+from src.calenderProvider.GoogleCalendarInterface import CalendarEvent, EventDateTime
+
+TOMORROW = (datetime.now() + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+LIST_TOMORROW = [{"name": "list_calendar_events", "args": {"start_date": TOMORROW.isoformat(), "end_date": (TOMORROW + timedelta(days=1)).isoformat()}}]
+SCRIPT = {
+    "Tell me about tomorrow with Sam": [LIST_TOMORROW, "Yes, a standup at 9."],
+    "Move my meetings tomorrow to 5pm": [LIST_TOMORROW, "You have a standup at 9. Shall I move it?"],
+    "Hello there": ["Hi! How can I help with your calendar?"],
+    "Add lunch tomorrow at noon": [
+        [{"name": "add_calendar_event", "args": {"title": "Lunch", "start_datetime": (TOMORROW + timedelta(hours=12)).isoformat(), "end_datetime": (TOMORROW + timedelta(hours=13)).isoformat()}}],
+        "Lunch is on your calendar."
+    ],
+}
+
+
+def build_agent() -> CalendarAgent:
+    standup = TOMORROW + timedelta(hours=9)
+    calendar = InMemoryCalendar([CalendarEvent(title="Standup", start_time=EventDateTime(date_time=standup), end_time=EventDateTime(date_time=standup + timedelta(minutes=15)))])
+    llm = FakeOllamaLLM(SCRIPT)
+    return CalendarAgent(llm=llm, calendar_provider=calendar, verbose=False, fast_llm=llm)
+
+
+def run_turns(agent: CalendarAgent, *messages: str) -> list:
+    async def main():
+        return [await agent.achat(message, session_id=1) for message in messages]
+    try:
+        return asyncio.run(main())
+    finally:
+        agent.close()
+
+
+def test_read_only_turn_is_answered_from_the_cache():
+    agent = build_agent()
+    question = "Tell me about tomorrow with Sam"
+    assert run_turns(agent, question, question) == ["Yes, a standup at 9."] * 2
+    assert agent.response_cache.stats()["hits"] == 1
+    assert agent.calendar.calls["list"] == 1
+
+
+def test_question_back_to_the_user_is_not_cached():
+    agent = build_agent()
+    run_turns(agent, "Move my meetings tomorrow to 5pm", "Move my meetings tomorrow to 5pm")
+    assert agent.response_cache.stats()["size"] == 0
+    assert agent.calendar.calls["list"] == 2
+
+
+def test_turn_without_tool_calls_is_not_cached():
+    agent = build_agent()
+    run_turns(agent, "Hello there")
+    assert agent.response_cache.stats()["size"] == 0
+
+
+def test_write_turn_invalidates_cached_answers():
+    agent = build_agent()
+    question = "Tell me about tomorrow with Sam"
+    run_turns(agent, question, "Add lunch tomorrow at noon", question)
+    assert agent.response_cache.stats()["hits"] == 0
+    assert agent.calendar.calls["list"] == 2
+
+
+def test_fast_path_answers_are_not_cached():
+    agent = build_agent()
+    answers = run_turns(agent, "What's on tomorrow?", "What's on tomorrow?")
+    assert "Standup" in answers[0]
+    assert agent.response_cache.stats()["size"] == 0
+    assert agent.router.stats()["hits"] == 2
+
+
+def test_keys_leave_out_time_and_conversation_dependent_messages():
+    cache = ResponseCache()
+    now = datetime(2026, 3, 2, 8)
+    assert cache.key("what's on tomorrow?", None, 1, now) == cache.key("What's on tomorrow, please?", None, 1, now)
+    assert cache.key("what's on tomorrow?", None, 1, now) != cache.key("what's on tomorrow?", None, 2, now)
+    assert cache.key("what's left today?", None, 1, now) is None
+    assert cache.key("move it to friday", None, 1, now) is None
+    cache.put(("k",), "Shall I move them?")
+    assert cache.get(("k",)) is None
@@ -0,0 +1,123 @@
+import asyncio
+import threading
+import time
+import pytest
+from src.TelegramInterface.TurnDispatcher import DispatcherBusyError, TurnDispatcher
+
+
+def test_turns_of_one_chat_run_in_arrival_order():
+    order = []
+
+    async def turn(index):
+        # Later turns are quicker, they would overtake without the chat lock
+        await asyncio.sleep(0.01 * (5 - index))
+        order.append(index)
+        return index
+
+    async def main():
+        dispatcher = TurnDispatcher(max_concurrency=4, max_queue_depth=5)
+        try:
+            results = await asyncio.gather(*(dispatcher.submit("chat", turn, index) for index in range(5)))
+        finally:
+            dispatcher.shutdown()
+        assert results == list(range(5))
+        assert order == list(range(5))
+        # Bookkeeping of idle chats is dropped
+        assert dispatcher.pending("chat") == 0 and not dispatcher._chat_locks
+
+    asyncio.run(main())
+
+
+def test_blocking_turns_of_different_chats_run_in_parallel():
+    gate = threading.Barrier(3)
+
+    def turn(chat_id):
+        # Only passes when all three chats are being processed at once
+        gate.wait(timeout=2)
+        return chat_id
+
+    async def main():
+        dispatcher = TurnDispatcher(max_concurrency=3)
+        try:
+            started = time.monotonic()
+            results = await asyncio.gather(*(dispatcher.submit(chat_id, turn, chat_id) for chat_id in range(3)))
+            assert time.monotonic() - started < 1
+        finally:
+            dispatcher.shutdown()
+        assert results == [0, 1, 2]
+
+    asyncio.run(main())
+
+
+def test_concurrency_limit_spans_all_chats():
+    running, peak = 0, 0
+
+    async def turn():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    async def main():
+        dispatcher = TurnDispatcher(max_concurrency=2)
+        try:
+            await asyncio.gather(*(dispatcher.submit(chat_id, turn) for chat_id in range(6)))
+        finally:
+            dispatcher.shutdown()
+
+    asyncio.run(main())
+    assert peak == 2
+
+
+def test_full_chat_queue_is_refused():
+    async def main():
+        dispatcher = TurnDispatcher(max_concurrency=2, max_queue_depth=2)
+        release = asyncio.Event()
+
+        async def turn():
+            await release.wait()
+            return "done"
+
+        try:
+            queued = [asyncio.create_task(dispatcher.submit("chat", turn)) for _ in range(2)]
+            await asyncio.sleep(0)
+            assert dispatcher.pending("chat") == 2
+            with pytest.raises(DispatcherBusyError):
+                await dispatcher.submit("chat", turn)
+            # Other chats are not affected
+            other = asyncio.create_task(dispatcher.submit("other", turn))
+            release.set()
+            assert await asyncio.gather(*queued, other) == ["done"] * 3
+            # Room again once the queue drained
+            assert await dispatcher.submit("chat", turn) == "done"
+        finally:
+            dispatcher.shutdown()
+
+    asyncio.run(main())
+
+
+def test_failed_turn_does_not_block_the_chat():
+    async def broken():
+        raise RuntimeError("boom")
+
+    async def fine():
+        return "ok"
+
+    async def main():
+        dispatcher = TurnDispatcher()
+        try:
+            with pytest.raises(RuntimeError):
+                await dispatcher.submit("chat", broken)
+            assert await dispatcher.submit("chat", fine) == "ok"
+        finally:
+            dispatcher.shutdown()
+
+    asyncio.run(main())
+
+
+def test_invalid_limits():
+    with pytest.raises(ValueError):
+        TurnDispatcher(max_concurrency=0)
+    with pytest.raises(ValueError):
+        TurnDispatcher(max_queue_depth=0)
@@ -0,0 +1,147 @@
+import asyncio
+import json
+import pytest
+from src.Benchmark.BenchmarkRunner import BenchmarkRunner
+from src.Benchmark.FakeTelegram import FakeTelegramApi
+from src.TelegramInterface.WebhookServer import WebhookServer
+
+UPDATE = FakeTelegramApi().make_update(7, "what's on tomorrow?")
+
+
+class RecordingApplication:
+    """The parts of telegram.ext.Application the server uses, updates wait for `release`"""
+
+    bot = None
+
+    def __init__(self):
+        self.processed = []
+        self.release = asyncio.Event()
+
+    async def process_update(self, update):
+        await self.release.wait()
+        self.processed.append(update.update_id)
+
+
+async def exchange(server: WebhookServer, raw: bytes, pause: float = 0.0, rest: bytes = b"") -> bytes:
+    """Send raw bytes, optionally more after `pause`, and read until the server closes or answers"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", server.bound_port)
+    try:
+        writer.write(raw)
+        await writer.drain()
+        if pause:
+            await asyncio.sleep(pause)
+            writer.write(rest)
+            await writer.drain()
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=2)
+        length = int(next(line.split(b":")[1] for line in head.split(b"\r\n") if line.lower().startswith(b"content-length")))
+        return head + await reader.readexactly(length)
+    finally:
+        writer.close()
+
+
+def status(response: bytes) -> int:
+    return int(response.split(b" ", 2)[1])
+
+
+def post(body: bytes, headers: str = "") -> bytes:
+    return f"POST /telegram HTTP/1.1\r\nHost: bot\r\nContent-Type: application/json\r\n{headers}\r\n".encode() + body
+
+
+def run(scenario, **options):
+    async def main():
+        application = RecordingApplication()
+        server = WebhookServer(application, host="127.0.0.1", port=0, drain_seconds=0.1, **options)
+        await server.start()
+        try:
+            return await scenario(server, application)
+        finally:
+            application.release.set()
+            await server.stop()
+    return asyncio.run(main())
+
+
+BODY = json.dumps(UPDATE).encode()
+
+
+def test_accepts_a_content_length_body():
+    async def scenario(server, application):
+        assert status(await exchange(server, post(BODY, f"Content-Length: {len(BODY)}\r\n"))) == 200
+        application.release.set()
+        await server.queue.join()
+        assert application.processed == [UPDATE["update_id"]]
+    run(scenario)
+
+
+def test_accepts_a_chunked_body():
+    chunked = b"".join(f"{len(part):x};ext=1\r\n".encode() + part + b"\r\n" for part in (BODY[:10], BODY[10:])) + b"0\r\nX-Trailer: 1\r\n\r\n"
+    async def scenario(server, application):
+        assert status(await exchange(server, post(chunked, "Transfer-Encoding: chunked\r\n"))) == 200
+        assert server.accepted == 1
+    run(scenario)
+
+
+@pytest.mark.parametrize("raw, expected", [
+    (b"GARBAGE\r\n\r\n", 400),
+    (post(b"{}", "Content-Length 2\r\n"), 400),
+    (post(b"{}", "Content-Length: two\r\n"), 400),
+    (post(b"{}", "Content-Length: 2\r\nContent-Length: 3\r\n"), 400),
+    (post(b"2\r\n{}\r\n0\r\n\r\n", "Content-Length: 2\r\nTransfer-Encoding: chunked\r\n"), 400),
+    (post(b"zz\r\n{}\r\n0\r\n\r\n", "Transfer-Encoding: chunked\r\n"), 400),
+    (post(b"{}", "Transfer-Encoding: gzip\r\n"), 501),
+    (post(b"not json", "Content-Length: 8\r\n"), 400),
+    (post(b"", "".join(f"X-Header-{index}: 1\r\n" for index in range(200))), 431),
+])
+def test_rejects_malformed_requests(raw, expected):
+    async def scenario(server, application):
+        assert status(await exchange(server, raw)) == expected
+        assert server.accepted == 0
+    run(scenario)
+
+
+def test_repeated_identical_content_length_is_accepted():
+    async def scenario(server, application):
+        assert status(await exchange(server, post(BODY, f"Content-Length: {len(BODY)}\r\nContent-Length: {len(BODY)}\r\n"))) == 200
+    run(scenario)
+
+
+def test_rejects_oversized_bodies_before_reading_them():
+    big = b"x" * 2048
+    async def scenario(server, application):
+        assert status(await exchange(server, post(b"", f"Content-Length: {len(big)}\r\n"))) == 413
+        chunked = b"400\r\n" + big[:1024] + b"\r\n400\r\n" + big[1024:] + b"\r\n0\r\n\r\n"
+        assert status(await exchange(server, post(chunked, "Transfer-Encoding: chunked\r\n"))) == 413
+    run(scenario, max_body_bytes=1024)
+
+
+def test_slow_body_times_out():
+    async def scenario(server, application):
+        response = await exchange(server, post(BODY[:5], f"Content-Length: {len(BODY)}\r\n"), pause=0.3, rest=BODY[5:])
+        assert status(response) == 408
+        assert server.accepted == 0
+    run(scenario, read_timeout_seconds=0.1)
+
+
+def test_full_queue_answers_503_with_retry_after():
+    async def scenario(server, application):
+        # One update in the worker, one queued, the third is refused
+        for update_id in (1, 2):
+            body = json.dumps(dict(UPDATE, update_id=update_id)).encode()
+            assert status(await exchange(server, post(body, f"Content-Length: {len(body)}\r\n"))) == 200
+            await asyncio.sleep(0.01)
+        response = await exchange(server, post(BODY, f"Content-Length: {len(BODY)}\r\n"))
+        assert status(response) == 503
+        assert b"Retry-After: 1" in response
+        assert server.stats()["rejected"] == 1
+        application.release.set()
+        await server.queue.join()
+        assert application.processed == [1, 2]
+    run(scenario, queue_size=1, workers=1)
+
+
+def test_webhook_round_trip_through_the_bot(monkeypatch):
+    # The runner points the bot at a fake Bot API through the environment
+    for key in ("TELEGRAM_API_URL", "TELEGRAM_WEBHOOK_URL", "TELEGRAM_WEBHOOK_LISTEN", "TELEGRAM_WEBHOOK_PORT", "TELEGRAM_WEBHOOK_SECRET"):
+        monkeypatch.setenv(key, "")
+    report = BenchmarkRunner(users=3, llm_delay_seconds=0, calendar_latency_seconds=0, trace_memory=False).run("webhook")
+    assert report.turns > 0
+    assert report.errors == 0